@@ -0,0 +1 @@
+'''Performance benchmarks for the Golf card game, see python -m benchmarks --help'''
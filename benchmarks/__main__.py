@@ -0,0 +1,64 @@
+'''Command line for the benchmarks: run the suite or compare two runs'''
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from benchmarks.compare import compare, format_comparison, DEFAULT_THRESHOLD
+from benchmarks.suite import run_suite
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main(argv: list = None) -> int:
+    """Entry point, returns the exit status: 1 if compare finds a regression"""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Golf card game benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run.add_argument("--out", default=None, help="JSON file to write, default print only")
+    run.add_argument("--quick", action="store_true", help="fewer games and steps")
+    run.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best one counts")
+    comp = commands.add_parser("compare", help="compare two JSON results")
+    comp.add_argument("baseline")
+    comp.add_argument("current")
+    comp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="relative slowdown that fails the comparison, default 0.10")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(quick=args.quick, repeat=args.repeat)
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "quick": args.quick,
+            },
+            "results": results,
+        }
+        for name, result in results.items():
+            print(f"{name:<36}{result['value']:>12.1f} {result['unit']}")
+        if args.out is not None:
+            with open(args.out, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)["results"]
+    rows = compare(baseline, current, args.threshold)
+    print(format_comparison(rows, baseline))
+    return 1 if any(row[4] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
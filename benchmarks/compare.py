@@ -0,0 +1,37 @@
+'''Comparison of two benchmark runs'''
+
+# Relative slowdown that counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Compares the metrics present in both runs
+
+    Args:
+        baseline (dict): results of the reference run, metric name -> {'value',
+        'unit', 'higher_is_better'}
+        current (dict): results of the new run
+        threshold (float, optional): relative slowdown allowed. Defaults to 0.10.
+
+    Returns:
+        list: (name, baseline value, current value, relative change, regression)
+        per metric, where a positive change is an improvement
+    """
+    rows = []
+    for name, base in baseline.items():
+        if name not in current or base['value'] == 0:
+            continue
+        value = current[name]['value']
+        change = (value - base['value']) / base['value']
+        if not base['higher_is_better']:
+            change = -change
+        rows.append((name, base['value'], value, change, change < -threshold))
+    return rows
+
+def format_comparison(rows: list, baseline: dict) -> str:
+    """Text table of compare() rows"""
+    lines = [f"{'metric':<36}{'baseline':>12}{'current':>12}{'change':>9}"]
+    for name, base, value, change, regression in rows:
+        unit = baseline[name]['unit']
+        lines.append(f"{name:<36}{base:>12.1f}{value:>12.1f}{change:>+9.1%} {unit}"
+                     + ("  REGRESSION" if regression else ""))
+    return "\n".join(lines)
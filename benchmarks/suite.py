@@ -0,0 +1,163 @@
+'''Benchmarks of game throughput, environment steps and player decision latency'''
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from src.game import Game, GameStatus
+from src.player.model_cache import clear_model_cache, default_model_path
+from src.player.registry import create_player
+
+# Seat compositions timed for full game throughput
+COMPOSITIONS = [
+    ["stupid", "stupid"],
+    ["advanced", "stupid"],
+    ["advanced", "advanced"],
+    ["computer", "advanced", "stupid"],
+]
+# Computer player types timed for decision latency
+DECISION_PLAYERS = ["stupid", "computer", "advanced"]
+
+def _best_rate(run, count: int, repeat: int) -> float:
+    """Best of repeat runs of count operations, operations per second"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+def bench_games(seats: list, num_games: int, repeat: int) -> float:
+    """Full games per second of a seat composition"""
+    def run():
+        random.seed(0)
+        for seed in range(num_games):
+            game = Game(seats=seats, silent_mode=True, seed=seed)
+            game.play_game()
+    return _best_rate(run, num_games, repeat)
+
+def bench_env(num_steps: int, repeat: int) -> tuple:
+    """GolfTrainEnv steps per second with random valid actions, and resets per
+    second"""
+    from src.player.golf_train_env import GolfTrainEnv
+    env = GolfTrainEnv()
+    def run_steps():
+        rng = random.Random(0)
+        random.seed(0)
+        env.reset(seed=0)
+        for _ in range(num_steps):
+            if env.phase == 1:
+                action = rng.randrange(2) if env.game.deck.played_count else 0
+            else:
+                action = rng.randrange(10)
+            _, _, done, _, _ = env.step(action)
+            if done:
+                env.reset()
+    def run_resets():
+        random.seed(0)
+        for _ in range(num_steps // 10):
+            env.reset()
+    # The environment prints at the end of each episode
+    with contextlib.redirect_stdout(io.StringIO()):
+        steps = _best_rate(run_steps, num_steps, repeat)
+        resets = _best_rate(run_resets, num_steps // 10, repeat)
+    return steps, resets
+
+def bench_vec_env(num_envs: int, num_steps: int, repeat: int) -> float:
+    """GolfVecEnv steps per second, summed over the environments, with random
+    actions"""
+    import numpy as np
+    from src.player.golf_vec_env import GolfVecEnv
+    env = GolfVecEnv(num_envs, seed=0)
+    actions = np.random.default_rng(0).integers(0, 10, size=(num_steps, num_envs))
+    def run():
+        env.reset(seed=0)
+        for step_actions in actions:
+            env.step(step_actions)
+    return _best_rate(run, num_steps * num_envs, repeat)
+
+def decision_points(num_points: int) -> list:
+    """Fixed decision points from seeded games: (engine, seat, hand card), each
+    engine a clone taken before the turn of the seat"""
+    from src.card import CARDS
+    random.seed(1)
+    rng = random.Random(1)
+    points = []
+    seed = 0
+    while len(points) < num_points:
+        game = Game(seats=["advanced", "stupid"], silent_mode=True, seed=seed)
+        seed += 1
+        game_ended = False
+        while not game_ended and len(points) < num_points:
+            seat = game.engine.to_move
+            points.append((game.engine.clone(rng=seed), seat, CARDS[rng.randrange(len(CARDS))]))
+            game.player_plays_turn(game.players[seat])
+            game_ended = game.engine.end_turn()
+    return points
+
+def bench_decisions(player, points: list, repeat: int) -> tuple:
+    """Mean microseconds per get_draw_action and get_play_action call"""
+    random.seed(2)
+    def run_draw():
+        for engine, seat, _ in points:
+            player.get_draw_action(GameStatus(engine, seat))
+    def run_play():
+        for engine, seat, hand in points:
+            player.get_play_action(GameStatus(engine, seat, hand))
+    draw = _best_rate(run_draw, len(points), repeat)
+    play = _best_rate(run_play, len(points), repeat)
+    return 1e6 / draw, 1e6 / play
+
+def _numpy_rl_player(model):
+    """RLPlayer on the NumPy export of model"""
+    from src.player.numpy_q_net import export_q_net
+    from src.player.rl_player import RLPlayer
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "agent.npz")
+        export_q_net(model, path)
+        return RLPlayer(path)
+
+def run_suite(quick: bool = False, repeat: int = 3) -> dict:
+    """Runs all benchmarks
+
+    Args:
+        quick (bool, optional): fewer games and steps, for a smoke test. Defaults
+        to False.
+        repeat (int, optional): runs of each benchmark, the best one counts.
+        Defaults to 3.
+
+    Returns:
+        dict: metric name -> {'value', 'unit', 'higher_is_better'}
+    """
+    scale = 10 if quick else 1
+    results = {}
+    def add(name, value, unit, higher_is_better):
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+    for seats in COMPOSITIONS:
+        add(f"games/{'-'.join(seats)}", bench_games(seats, 200 // scale, repeat), "games/s", True)
+
+    steps, resets = bench_env(2000 // scale, repeat)
+    add("env/step", steps, "steps/s", True)
+    add("env/reset", resets, "resets/s", True)
+    add("env/vec-step", bench_vec_env(1024, 500 // scale, repeat), "steps/s", True)
+
+    points = decision_points(500 // scale)
+    players = {name: create_player(name) for name in DECISION_PLAYERS}
+    if os.path.exists(default_model_path()):
+        clear_model_cache()
+        start = time.perf_counter()
+        players["rl"] = create_player("rl")
+        add("rl/load", (time.perf_counter() - start) * 1e3, "ms", False)
+        start = time.perf_counter()
+        create_player("rl")
+        add("rl/construct", (time.perf_counter() - start) * 1e3, "ms", False)
+        players["rl-numpy"] = _numpy_rl_player(players["rl"].model)
+    for name, player in players.items():
+        draw, play = bench_decisions(player, points, repeat)
+        add(f"decision/{name}/draw", draw, "us", False)
+        add(f"decision/{name}/play", play, "us", False)
+    return results
@@ -1,31 +1,8 @@
 '''Entry for the Golf card game'''
 
-from src.game import Game
-
-import numpy as np
-import pandas as pd
+from src.tournament import main
 
 if __name__ == '__main__':
-    results = pd.DataFrame(columns=['winner', 'turns', 'advanced'])
-    for i in range(100):
-        game = Game(2, 
-                    human_player=False, 
-                    silent_mode=False, 
-                    stupid_player=False,
-                    advanced_player=True,
-                    rl_player=False)
-        turns, score_dict, winner = game.play_game()
-        advanced = winner.startswith("Advanced")
-        new_row = pd.DataFrame(
-            {
-                'winner': [winner], 
-                'turns': [turns], 
-                'advanced': [advanced]
-            }
-        )
-        results = pd.concat([results, new_row], ignore_index=True)
-
-    print("Turns quartiles:")
-    quartiles = results['turns'].quantile([0.25, 0.5, 0.75, 1.0])
-    print(quartiles)
-    print(f"Advanced winning percentage: {results['advanced'].mean() * 100}")
+    # 100 games of AdvancedComputerPlayer against StupidComputerPlayer, see
+    # golf-tournament --help for other seat compositions
+    main(["--games", "100", "--seats", "advanced", "stupid"])
@@ -7,6 +7,9 @@ setup(
     description="RL agent training and Golf cardgame.",
     long_description=open("README.md").read(),
     url="https://github.com/SakuOrdrTab/golf_card_game",
-    packages=find_packages(where="src"),
-    package_dir={"": "src"},
+    # The modules import each other as src.*, so src itself is the package
+    packages=find_packages(include=["src", "src.*"]),
+    entry_points={
+        "console_scripts": ["golf-tournament=src.tournament:main"],
+    },
 )
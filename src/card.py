@@ -1,6 +1,7 @@
 '''Card class for the Gulf card game'''
 
 from enum import Enum
+from operator import index
 
 class Suit(Enum):
     '''Enumeration for the suits of a card'''
@@ -9,11 +10,29 @@ class Suit(Enum):
     DIAMONDS = '\U00002662'
     CLUBS = '\U00002667'
 
+# Number of values in one suit, King = 0 ... Queen = 12
+VALUES_PER_SUIT = 13
+DECK_SIZE = len(Suit) * VALUES_PER_SUIT
+# String shown for a card that is not visible to the viewer
+HIDDEN_CARD_STR = 'XX'
+
+_SUIT_INDEX = {suit: i for i, suit in enumerate(Suit)}
+# Rank of the suits when ordering cards of the same value, as in bridge
+_SUIT_RANK = {Suit.CLUBS: 0, Suit.DIAMONDS: 1, Suit.HEARTS: 2, Suit.SPADES: 3}
+
 class Card:
-    """class for card in the game of Golf. has a suite and value, can be visible or not
-    """    
-    def __init__(self, suit: Suit, value: int) -> None:
-        """Creates a card of enumerable Suit and a value. Default visibility is False
+    """class for card in the game of Golf. has a suite and value.
+
+    Cards are immutable flyweights: there are exactly 52 instances, one for each
+    suit and value, and Card(suit, value) always returns the same interned
+    instance. Each card has a stable small integer id (suit index * 13 + value),
+    which is what game states store instead of Card objects. Whether a card is
+    visible is not a property of the card, but of the table or deck holding it.
+    """
+    __slots__ = ('suit', 'value', 'id')
+
+    def __new__(cls, suit: Suit, value: int) -> 'Card':
+        """Returns the interned card of enumerable Suit and a value.
 
         Args:
             suit (Suit): SPADES, HEARTS, DIAMONDS, CLUBS
@@ -22,35 +41,75 @@ class Card:
         Raises:
             ValueError: Invalid value for card
         """
-        self.suit = suit
+        value = index(value)
         if value < 0 or value > 12:
             raise ValueError('Value must be between 0 and 12')
-        self.value = value
-        self.visible = False
+        return CARDS[_SUIT_INDEX[suit] * VALUES_PER_SUIT + value]
 
-    def __str__(self):
-        return f'{self.suit.value}{self.value}' if self.visible else 'XX'
+    @classmethod
+    def from_id(cls, card_id: int) -> 'Card':
+        """Returns the interned card with the given integer id
 
-    def __repr__(self):
-        return self.__str__()
+        Args:
+            card_id (int): 0 to 51, suit index * 13 + value
 
-    def __eq__(self, value):
-        return self.value == value
+        Returns:
+            Card: the interned card
+        """
+        return CARDS[card_id]
 
-    def __lt__(self, value):
-        return self.value < value
+    def __setattr__(self, name, value):
+        raise AttributeError('Card is immutable')
 
-    def __gt__(self, value):
-        return self.value > value
+    def __delattr__(self, name):
+        raise AttributeError('Card is immutable')
 
-    def __le__(self, value):
-        return self.value <= value
+    def __reduce__(self):
+        # Keep cards interned when pickled, e.g. when sent to worker processes
+        return (Card.from_id, (self.id,))
 
-    def __ge__(self, value):
-        return self.value >= value
+    def __copy__(self):
+        return self
 
-    def __ne__(self, value):
-        return self.value != value
+    def __deepcopy__(self, memo):
+        return self
+
+    def __str__(self):
+        return f'{self.suit.value}{self.value}'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __hash__(self):
+        return self.id
+
+    def __eq__(self, other):
+        if isinstance(other, Card):
+            return self is other
+        return NotImplemented
+
+    # Cards are ordered by value, then by suit rank, so that the ordering agrees
+    # with equality: distinct cards are never both <= and >= each other.
+    # Compare card.value to order cards against plain ints.
+    def __lt__(self, other):
+        if isinstance(other, Card):
+            return _order_key(self) < _order_key(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, Card):
+            return _order_key(self) > _order_key(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Card):
+            return _order_key(self) <= _order_key(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, Card):
+            return _order_key(self) >= _order_key(other)
+        return NotImplemented
 
     def __add__(self, value):
         if isinstance(value, Card):
@@ -68,6 +127,35 @@ class Card:
         else:
             raise ValueError('Unsupported operand type')
 
+def _order_key(card: Card) -> tuple:
+    return (card.value, _SUIT_RANK[card.suit])
+
+def _make_card(card_id: int) -> Card:
+    card = object.__new__(Card)
+    object.__setattr__(card, 'suit', list(Suit)[card_id // VALUES_PER_SUIT])
+    object.__setattr__(card, 'value', card_id % VALUES_PER_SUIT)
+    object.__setattr__(card, 'id', card_id)
+    return card
+
+# The 52 interned cards, indexed by card id
+CARDS = tuple(_make_card(card_id) for card_id in range(DECK_SIZE))
+# Card values indexed by card id, for code working on ids only
+CARD_VALUES = tuple(card.value for card in CARDS)
+# Card strings indexed by card id, e.g. '♤10'
+CARD_STRS = tuple(str(card) for card in CARDS)
+
+def card_str(card: Card, visible: bool) -> str:
+    """String of a card as seen by a viewer: the card itself if visible, otherwise 'XX'
+
+    Args:
+        card (Card): the card
+        visible (bool): whether the card is visible to the viewer
+
+    Returns:
+        str: e.g. '♤10' or 'XX'
+    """
+    return str(card) if visible else HIDDEN_CARD_STR
+
 if __name__ == '__main__':
     card1 = Card(Suit.SPADES, 10)
     card2 = Card(Suit.HEARTS, 5)
@@ -76,3 +164,4 @@ if __name__ == '__main__':
     print(card1 + card2)
     print(card1 > card2)
     print(card1 == card3)
+    print(card1 is Card(Suit.SPADES, 10), card1.id)
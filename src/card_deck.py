@@ -1,21 +1,214 @@
 '''Card deck class for the golf game'''
 
-from random import shuffle
-from .card import Card, Suit
+from array import array
+from random import Random
+from .card import Card, Suit, CARDS, DECK_SIZE
 
 class CardDeck:
     """A Card deck specific to Golf card game. Contains drawing deck and played
     card deck.
-    """    
-    def __init__(self) -> None:
-        """Initializes the deck: builds drawing deck
-        """        
-        self.drawing_deck = []
-        self.played_cards = []
-        for suit in Suit:
-            for value in range(13):
-                self.drawing_deck.append(Card(suit, value))
-        shuffle(self.drawing_deck)
+
+    The decks are stored as card ids in two preallocated int arrays: the drawing
+    deck is the part of one array after a cursor, and the played deck is a stack
+    in the other. Drawing is O(1) and reshuffling the played deck back to the
+    drawing deck happens in place. Shuffling uses the deck's own random generator,
+    so a seeded deck always produces the same sequence of cards.
+
+    The deck also remembers which drawing deck cards came back from the played
+    deck in a reshuffle: they lie at the end of the array, and unlike the cards
+    never dealt they have all been seen by the players.
+    """
+    def __init__(self, rng = None) -> None:
+        """Initializes the deck: builds drawing deck and shuffles it
+
+        Args:
+            rng (random.Random | numpy.random.Generator | int, optional): Random
+            generator used for shuffling, or an int seed for a new random.Random.
+            Defaults to None, an unseeded random.Random.
+        """
+        if rng is None or isinstance(rng, int):
+            rng = Random(rng)
+        self.rng = rng
+        self._deck = array('b', range(DECK_SIZE))
+        self._cursor = 0
+        self._played = array('b', bytes(DECK_SIZE))
+        self._played_count = 0
+        # Drawing deck array positions from this one on hold reshuffled cards
+        self._reshuffled_from = DECK_SIZE
+        self._set_numpy_view()
+        self._shuffle(0, DECK_SIZE)
+
+    def _set_numpy_view(self) -> None:
+        if isinstance(self.rng, Random):
+            self._numpy_deck = None
+        else:
+            # numpy Generator shuffles a numpy view sharing memory with the array
+            import numpy as np
+            self._numpy_deck = np.frombuffer(self._deck, dtype=np.int8)
+
+    def snapshot(self) -> tuple:
+        """State of the decks without the random generator
+
+        Returns:
+            tuple: (drawing deck array bytes, cursor, played deck array bytes,
+            played count, start of the reshuffled cards), for restore()
+        """
+        return (self._deck.tobytes(), self._cursor, self._played.tobytes(), self._played_count,
+                self._reshuffled_from)
+
+    def restore(self, state : tuple) -> None:
+        """Sets the decks to a state from snapshot(), in place
+
+        Args:
+            state (tuple): result of snapshot()
+        """
+        deck, self._cursor, played, self._played_count, self._reshuffled_from = state
+        memoryview(self._deck).cast('B')[:] = deck
+        memoryview(self._played).cast('B')[:] = played
+
+    def copy(self, rng = None) -> 'CardDeck':
+        """Returns an independent copy of the decks, without shuffling
+
+        Args:
+            rng (random.Random | numpy.random.Generator | int, optional): Random
+            generator of the copy, used when it reshuffles. Defaults to None, a new
+            unseeded random.Random, so the copy does not advance this deck's generator.
+
+        Returns:
+            CardDeck: the copy
+        """
+        deck = CardDeck.__new__(CardDeck)
+        deck.rng = Random(rng) if rng is None or isinstance(rng, int) else rng
+        deck._deck = array('b', self._deck)
+        deck._cursor = self._cursor
+        deck._played = array('b', self._played)
+        deck._played_count = self._played_count
+        deck._reshuffled_from = self._reshuffled_from
+        deck._set_numpy_view()
+        return deck
+
+    def _shuffle(self, start : int, stop : int) -> None:
+        """Shuffles the drawing deck array between start and stop in place"""
+        if self._numpy_deck is not None:
+            self.rng.shuffle(self._numpy_deck[start:stop])
+            return
+        # Fisher-Yates, same as random.shuffle but on a slice of the array
+        deck = self._deck
+        randrange = self.rng.randrange
+        for i in range(stop - 1, start, -1):
+            j = start + randrange(i - start + 1)
+            deck[i], deck[j] = deck[j], deck[i]
+
+    def _reshuffle_played(self) -> None:
+        """Moves the played cards to the end of the drawing deck array and
+        shuffles them"""
+        count = self._played_count
+        if count == 0:
+            raise ValueError('No cards in the drawing deck or the played deck')
+        start = DECK_SIZE - count
+        self._deck[start:] = self._played[:count]
+        self._cursor = start
+        self._played_count = 0
+        self._reshuffled_from = start
+        self._shuffle(start, DECK_SIZE)
+
+    @property
+    def drawing_count(self) -> int:
+        """Number of cards in the drawing deck"""
+        return DECK_SIZE - self._cursor
+
+    @property
+    def reshuffled_count(self) -> int:
+        """Number of cards in the drawing deck that came from the played deck in a
+        reshuffle. They are the last ones of drawing_ids()"""
+        return DECK_SIZE - max(self._cursor, self._reshuffled_from)
+
+    @property
+    def played_count(self) -> int:
+        """Number of cards in the played deck"""
+        return self._played_count
+
+    @property
+    def drawing_deck(self) -> list:
+        """Cards in the drawing deck, next card to draw first. This is a copy,
+        modifying it does not change the deck"""
+        return [CARDS[card_id] for card_id in self._deck[self._cursor:]]
+
+    @property
+    def played_cards(self) -> list:
+        """Cards in the played deck, top card last. This is a copy, modifying it
+        does not change the deck"""
+        return [CARDS[card_id] for card_id in self._played[:self._played_count]]
+
+    @played_cards.setter
+    def played_cards(self, cards : list) -> None:
+        self._played[:len(cards)] = array('b', [card.id for card in cards])
+        self._played_count = len(cards)
+
+    def drawing_ids(self) -> list:
+        """Ids of the cards in the drawing deck, next card to draw first"""
+        return self._deck[self._cursor:].tolist()
+
+    def set_drawing_ids(self, card_ids : list, reshuffled : int = 0) -> None:
+        """Replaces the drawing deck, for example with a reordering of it
+
+        Args:
+            card_ids (list): card ids, next card to draw first
+            reshuffled (int, optional): number of the last card ids that came from
+            the played deck in a reshuffle. Defaults to 0.
+        """
+        self._cursor = DECK_SIZE - len(card_ids)
+        self._deck[self._cursor:] = array('b', card_ids)
+        self._reshuffled_from = DECK_SIZE - reshuffled
+
+    def draw_id(self) -> int:
+        """Returns the id of a card from drawing deck. If deck is empty, the played
+        cards are returned to the drawing deck and shuffled.
+
+        Returns:
+            int: id of one card from the drawing deck
+        """
+        # If deck is empty, shuffle the played cards and use them as the deck
+        if self._cursor == DECK_SIZE:
+            self._reshuffle_played()
+        card_id = self._deck[self._cursor]
+        self._cursor += 1
+        return card_id
+
+    def draw_played_id(self) -> int:
+        """Returns the id of the last card from the played deck and removes it
+        from played deck.
+
+        Raises:
+            ValueError: No Cards in the played deck, this should not happen
+
+        Returns:
+            int: id of the card from played deck
+        """
+        if self._played_count == 0:
+            raise ValueError('No cards in the played deck')
+        self._played_count -= 1
+        return self._played[self._played_count]
+
+    def add_id_to_played(self, card_id : int) -> None:
+        """Adds a card id to the played deck
+
+        Args:
+            card_id (int): id of the card
+        """
+        self._played[self._played_count] = card_id
+        self._played_count += 1
+
+    def top_played_id(self) -> int:
+        """Returns the id of the top card of the played deck without removing it,
+        or -1 if the played deck is empty
+
+        Returns:
+            int: id of the top card or -1
+        """
+        if self._played_count == 0:
+            return -1
+        return self._played[self._played_count - 1]
 
     def draw_from_deck(self) -> Card:
         """Returns a Card from drawing deck. If deck is empty, the played cards
@@ -23,20 +216,13 @@ class CardDeck:
 
         Returns:
             Card: One card from the drawing deck
-        """        
-        # If deck is empty, shuffle the played cards and use them as the deck
-        if len(self.drawing_deck) == 0:
-            self.drawing_deck = self.played_cards
-            self.played_cards = []
-            shuffle(self.drawing_deck)
-        card = self.drawing_deck.pop(0)
-        return card
+        """
+        return CARDS[self.draw_id()]
 
     def deal_first_card(self) -> None:
         """Called by Game() constructor, adds one card to the played deck
-        """        
-        self.played_cards.append(self.draw_from_deck())
-        self.played_cards[-1].visible = True
+        """
+        self.add_id_to_played(self.draw_id())
 
     def draw_from_played(self) -> Card:
         """Returns the last Card from the played deck and removes from
@@ -47,20 +233,16 @@ class CardDeck:
 
         Returns:
             Card: Card from played deck
-        """        
-        if len(self.played_cards) == 0:
-            raise ValueError('No cards in the played deck')
-        card = self.played_cards.pop()
-        return card
+        """
+        return CARDS[self.draw_played_id()]
 
     def add_to_played(self, card: Card) -> None:
-        """Adds a card to the played deck
+        """Adds a card to the played deck. All cards in the played deck are visible
 
         Args:
             card (Card) :
-        """        
-        card.visible = True # Ensure card is always visible in played deck
-        self.played_cards.append(card)
+        """
+        self.add_id_to_played(card.id)
 
     def get_last_played_card(self) -> Card:
         """Getter to get the last played card from the played deck, but NOT
@@ -72,16 +254,16 @@ class CardDeck:
 
         Returns:
             Card: top Card in played deck
-        """        
-        if len(self.played_cards) == 0:
+        """
+        if self._played_count == 0:
             raise ValueError('No cards in the played deck')
-        return self.played_cards[-1]
+        return CARDS[self._played[self._played_count - 1]]
 
 
 if __name__ == '__main__':
-    deck = CardDeck()
+    deck = CardDeck(rng=1)
     print("Initial drawing deck", deck.drawing_deck)
-    print("Length of drawing deck befpre operations: ", len(deck.drawing_deck))
+    print("Length of drawing deck befpre operations: ", deck.drawing_count)
     deck.deal_first_card()
     print("After dealing the first card to table:\n", deck.drawing_deck)
     print("..and the played cards:\n", deck.played_cards)
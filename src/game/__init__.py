@@ -1,4 +1,16 @@
 '''Module for game mechanics'''
-from .game import Game
+from .engine import GolfEngine
+from .status import GameStatus, HIDDEN
+from .record import GameRecord, GameRecorder, read_records, replay
+from .profiler import GameProfiler
 
-__all__ = ["Game"]
+__all__ = ["Game", "GolfEngine", "GameStatus", "HIDDEN", "GameRecord", "GameRecorder",
+           "read_records", "replay", "GameProfiler"]
+
+def __getattr__(name):
+    # Game imports the players, which import the status from this package, so
+    # Game is loaded on first use
+    if name == "Game":
+        from .game import Game
+        return Game
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,333 @@
+'''Vectorized simulator for playing thousands of Golf games in lockstep with NumPy'''
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from src.card import VALUES_PER_SUIT, DECK_SIZE, CARD_VALUES
+from src.game.engine import ROWS, COLUMNS, TABLE_SIZE, DISCARD, DUMMY_CARD_ID
+
+# Value the heuristic policies assume for a nonvisible card
+HIDDEN_GUESS = 6
+# Card values of a full deck
+_DECK_VALUES = np.tile(np.arange(VALUES_PER_SUIT, dtype=np.int8), DECK_SIZE // VALUES_PER_SUIT)
+
+class BatchPolicy(ABC):
+    """Abstract vectorized player policy for BatchSimulator. A policy is called
+    with the indices of the games where its seat is acting and returns one
+    decision per game as an array.
+    """
+    def initial_flips(self, sim: 'BatchSimulator', games: np.ndarray, seat: int) -> np.ndarray:
+        """Columns of the cards to turn visible at the beginning, one per row
+
+        Returns:
+            np.ndarray: (len(games), 3) zero based columns
+        """
+        return sim.rng.integers(0, COLUMNS, size=(len(games), ROWS))
+
+    @abstractmethod
+    def draw_action(self, sim: 'BatchSimulator', games: np.ndarray, seat: int) -> np.ndarray:
+        """Whether to draw from the played deck
+
+        Returns:
+            np.ndarray: (len(games),) bool, True for played deck, False for drawing deck
+        """
+        pass
+
+    @abstractmethod
+    def play_action(self, sim: 'BatchSimulator', games: np.ndarray, seat: int,
+                    hand: np.ndarray) -> np.ndarray:
+        """Where to play the hand card
+
+        Args:
+            hand (np.ndarray): (len(games),) values of the hand cards
+
+        Returns:
+            np.ndarray: (len(games),) slots row * 3 + column, or DISCARD (-1)
+        """
+        pass
+
+class StupidBatchPolicy(BatchPolicy):
+    """Vectorized StupidComputerPlayer: random draw, random place or discard"""
+    def draw_action(self, sim, games, seat):
+        return sim.rng.random(len(games)) < 0.5
+
+    def play_action(self, sim, games, seat, hand):
+        alive = sim.alive[games, seat]
+        # The played deck or any table position of the rows in play, uniformly
+        choice = sim.rng.integers(0, 1 + COLUMNS * alive.sum(axis=1))
+        rank = (choice - 1) // COLUMNS
+        row = np.argmax(np.cumsum(alive, axis=1) > rank[:, None], axis=1)
+        slot = row * COLUMNS + (choice - 1) % COLUMNS
+        return np.where(choice == 0, DISCARD, slot)
+
+class AdvancedBatchPolicy(BatchPolicy):
+    """Vectorized AdvancedComputerPlayer, same rules and probabilities, except
+    that hidden cards are always valued HIDDEN_GUESS (6). The player values them
+    at the mean of the cards it has not seen (BeliefTracker.hidden_mean), which
+    the batch policy does not track, so their decisions differ once the mean
+    moves away from 6."""
+    def draw_action(self, sim, games, seat):
+        values, visible, alive = sim.table_view(games, seat)
+        top = sim.top_played(games)[:, None]
+        parsed = np.where(visible, values, HIDDEN_GUESS)
+
+        # Draw from played if the top card matches a visible pair in a row
+        seen = np.where(visible & alive[..., None], values, -1 - np.arange(COLUMNS))
+        first, second, third = seen[..., 0], seen[..., 1], seen[..., 2]
+        pair_match = (((first == second) | (first == third)) & (first == top)) \
+            | ((second == third) & (second == top))
+        # Otherwise compare to the worst card of the table, hidden cards as 6
+        worst = np.where(alive[..., None], parsed, -1).max(axis=(1, 2))
+        chance = np.where(sim.top_played(games) < worst, 0.98, 0.02)
+        return pair_match.any(axis=1) | (sim.rng.random(len(games)) < chance)
+
+    def play_action(self, sim, games, seat, hand):
+        values, visible, alive = sim.table_view(games, seat)
+        parsed = np.where(visible, values, HIDDEN_GUESS)
+        hand = hand[:, None, None]
+
+        # Complete a row that has two cards of the hand value
+        matches = parsed == hand
+        row_candidates = alive & (matches.sum(axis=2) == 2)
+        has_row = row_candidates.any(axis=1)
+        row = np.argmax(row_candidates, axis=1)
+        column = np.argmin(matches[np.arange(len(games)), row], axis=1)
+
+        # Otherwise the first good enough position in row-major order
+        chance = sim.rng.random((len(games), ROWS, COLUMNS))
+        good = np.where(visible, (parsed - hand >= 4) & (chance < 0.95),
+                        (hand < HIDDEN_GUESS) & (chance < 0.9)) & alive[..., None]
+        good = good.reshape(len(games), TABLE_SIZE)
+        has_good = good.any(axis=1)
+        first_good = np.argmax(good, axis=1)
+        return np.where(has_row, row * COLUMNS + column, np.where(has_good, first_good, DISCARD))
+
+POLICIES = {
+    "stupid": StupidBatchPolicy,
+    "advanced": AdvancedBatchPolicy,
+}
+
+class BatchSimulator():
+    """Plays N games of Golf in lockstep. The tables of all games are held in
+    (N, players, 3, 3) arrays and every rule is applied as an array operation
+    over the games where the same seat is acting. Finished games are masked out.
+
+    Only card values matter for the rules, so the decks hold values, not card ids.
+    Removed rows stay in the arrays and are masked with `alive`. In rl training
+    mode they are replaced like in GolfEngine: the rows after them shift up and
+    a row of nonvisible kings is added to the end. The seating order is random
+    per game, like Game shuffling its players.
+    """
+    def __init__(self, num_games: int, policies: list, seed: int = None,
+                 rl_training_mode: bool = False) -> None:
+        """Deals the games and turns the initial cards
+
+        Args:
+            num_games (int): number of games to play
+            policies (list): BatchPolicy instances or names ('stupid', 'advanced'),
+            one per seat, 2-3 seats
+            seed (int, optional): seed for the numpy random generator. Defaults to None.
+            rl_training_mode (bool, optional): Replace removed rows with nonvisible
+            kings, so every table stays 3x3. Defaults to False.
+
+        Raises:
+            ValueError: Invalid number of players
+        """
+        if len(policies) < 2 or len(policies) > 3:
+            raise ValueError('Number of players must be 2-3')
+        self.policies = [POLICIES[policy]() if isinstance(policy, str) else policy
+                         for policy in policies]
+        self.num_games = num_games
+        self.num_players = len(policies)
+        self.rl_training_mode = rl_training_mode
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_games, self.num_players, ROWS, COLUMNS)
+        self.deck = np.zeros((num_games, DECK_SIZE), dtype=np.int8)
+        self.cursor = np.zeros(num_games, dtype=np.int64)
+        self.played = np.zeros((num_games, DECK_SIZE), dtype=np.int8)
+        self.played_count = np.zeros(num_games, dtype=np.int64)
+        self.values = np.zeros(shape, dtype=np.int8)
+        self.visible = np.zeros(shape, dtype=bool)
+        self.alive = np.ones(shape[:3], dtype=bool)
+        self.finished = np.zeros((num_games, self.num_players), dtype=bool)
+        self.first_seat = np.zeros(num_games, dtype=np.int64)
+        self.turns = np.zeros(num_games, dtype=np.int64)
+        self.last_round = np.zeros(num_games, dtype=bool)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.deal(np.arange(num_games))
+
+    def deal(self, games: np.ndarray) -> None:
+        """Starts new games in place of the given ones: shuffles their decks, deals
+        9 cards for every seat, turns the initial cards and the first played card
+
+        Args:
+            games (np.ndarray): indices of the games
+        """
+        self.deck[games] = self.rng.permuted(np.tile(_DECK_VALUES, (len(games), 1)), axis=1)
+        self.first_seat[games] = self.rng.integers(0, self.num_players, size=len(games))
+        dealt = self.num_players * TABLE_SIZE
+        self.values[games] = self.deck[games, :dealt].reshape((len(games),) + self.values.shape[1:])
+        self.visible[games] = False
+        self.alive[games] = True
+        self.finished[games] = False
+        self.cursor[games] = dealt
+        self.played_count[games] = 0
+        self.turns[games] = 0
+        self.last_round[games] = False
+        self.done[games] = False
+        rows = np.arange(ROWS)
+        for seat, policy in enumerate(self.policies):
+            columns = policy.initial_flips(self, games, seat)
+            self.visible[games[:, None], seat, rows, columns] = True
+        self._push_played(games, self._draw_deck(games))
+
+    def table_view(self, games: np.ndarray, seat: int) -> tuple:
+        """Table of a seat in the given games
+
+        Returns:
+            tuple: values (k, 3, 3), visible (k, 3, 3), alive rows (k, 3)
+        """
+        return self.values[games, seat], self.visible[games, seat], self.alive[games, seat]
+
+    def top_played(self, games: np.ndarray) -> np.ndarray:
+        """Values of the top cards of the played decks in the given games"""
+        return self.played[games, self.played_count[games] - 1]
+
+    def _draw_deck(self, games: np.ndarray) -> np.ndarray:
+        """Draws from the drawing decks, reshuffling played decks into empty ones
+
+        Raises:
+            ValueError: a game has no cards in the drawing deck or the played deck
+        """
+        empty = games[self.cursor[games] == DECK_SIZE]
+        if (self.played_count[empty] == 0).any():
+            raise ValueError('No cards in the drawing deck or the played deck')
+        for game in empty:
+            count = self.played_count[game]
+            self.deck[game, DECK_SIZE - count:] = self.rng.permutation(self.played[game, :count])
+            self.cursor[game] = DECK_SIZE - count
+            self.played_count[game] = 0
+        cards = self.deck[games, self.cursor[games]]
+        self.cursor[games] += 1
+        return cards
+
+    def _draw_played(self, games: np.ndarray) -> np.ndarray:
+        """Draws the top cards of the played decks
+
+        Raises:
+            ValueError: a game has no cards in the played deck
+        """
+        if (self.played_count[games] == 0).any():
+            raise ValueError('No cards in the played deck')
+        self.played_count[games] -= 1
+        return self.played[games, self.played_count[games]]
+
+    def _push_played(self, games: np.ndarray, values: np.ndarray) -> None:
+        self.played[games, self.played_count[games]] = values
+        self.played_count[games] += 1
+
+    def play_turn(self, games: np.ndarray, seat: int) -> None:
+        """Plays one turn of the seat in the given games with the policy of the
+        seat: draw, place, remove full rows and check if the seat has all cards
+        visible"""
+        if len(games) == 0:
+            return
+        policy = self.policies[seat]
+        hand = self.draw(games, policy.draw_action(self, games, seat))
+        self.place(games, seat, hand, policy.play_action(self, games, seat, hand))
+
+    def draw(self, games: np.ndarray, from_played: np.ndarray) -> np.ndarray:
+        """Draws the hand cards of the player in turn in the given games
+
+        Args:
+            games (np.ndarray): indices of the games
+            from_played (np.ndarray): (len(games),) bool, True to draw from the
+            played deck
+
+        Returns:
+            np.ndarray: (len(games),) values of the hand cards
+
+        Raises:
+            ValueError: a game has no card to draw from the chosen deck
+        """
+        hand = np.empty(len(games), dtype=np.int8)
+        hand[from_played] = self._draw_played(games[from_played])
+        hand[~from_played] = self._draw_deck(games[~from_played])
+        return hand
+
+    def place(self, games: np.ndarray, seat: int, hand: np.ndarray, slots: np.ndarray) -> None:
+        """Plays the hand cards of the seat in the given games, removes full rows
+        and checks if the seat has all cards visible
+
+        Args:
+            games (np.ndarray): indices of the games
+            seat (int): seat index of the player
+            hand (np.ndarray): (len(games),) values of the hand cards
+            slots (np.ndarray): (len(games),) slots row * 3 + column, or DISCARD
+        """
+        discard = slots == DISCARD
+        self._push_played(games[discard], hand[discard])
+        placed = games[~discard]
+        rows, columns = np.divmod(slots[~discard], COLUMNS)
+        self._push_played(placed, self.values[placed, seat, rows, columns])
+        self.values[placed, seat, rows, columns] = hand[~discard]
+        self.visible[placed, seat, rows, columns] = True
+
+        values, visible, alive = self.table_view(games, seat)
+        full = visible.all(axis=2) & (values[..., 0] == values[..., 1]) & (values[..., 1] == values[..., 2])
+        if self.rl_training_mode:
+            if full.any():
+                # Rows in play first in their order, then the removed rows as kings
+                order = np.argsort(full, axis=1, kind='stable')[..., None]
+                values = np.take_along_axis(values, order, axis=1)
+                visible = np.take_along_axis(visible, order, axis=1)
+                removed = np.take_along_axis(full, order[..., 0], axis=1)
+                values[removed] = CARD_VALUES[DUMMY_CARD_ID]
+                visible[removed] = False
+                self.values[games, seat] = values
+                self.visible[games, seat] = visible
+        else:
+            alive &= ~full
+            self.alive[games, seat] = alive
+        self.finished[games, seat] = (visible | ~alive[..., None]).all(axis=(1, 2))
+
+    def run(self, max_turns: int = None) -> dict:
+        """Plays all games to the end. Like Game.play_game, the round in which some
+        player gets all cards visible is completed and then the game is over.
+
+        Args:
+            max_turns (int, optional): stop games after this many rounds. Defaults
+            to None, no limit.
+
+        Returns:
+            dict: 'turns' (N,), 'scores' (N, players), 'winner' (N,) seat index
+        """
+        active = np.flatnonzero(~self.done)
+        while len(active) > 0:
+            self.turns[active] += 1
+            seat_to_play = self.first_seat[active]
+            for _ in range(self.num_players):
+                for seat in range(self.num_players):
+                    self.play_turn(active[seat_to_play == seat], seat)
+                seat_to_play = (seat_to_play + 1) % self.num_players
+            self.last_round[active] |= self.finished[active].any(axis=1)
+            self.done[active] |= self.last_round[active]
+            if max_turns is not None:
+                self.done[active] |= self.turns[active] >= max_turns
+            # Only the games still going are stepped on the next round
+            active = active[~self.done[active]]
+        return {'turns': self.turns, 'scores': self.scores(), 'winner': self.winners()}
+
+    def scores(self) -> np.ndarray:
+        """Sum of the values of the table cards in play, (N, players)"""
+        in_play = np.where(self.alive[..., None], self.values, 0)
+        return in_play.sum(axis=(2, 3), dtype=np.int64)
+
+    def winners(self) -> np.ndarray:
+        """Seat with the lowest score in each game, ties go to the first one in
+        turn order"""
+        order = (self.first_seat[:, None] + np.arange(self.num_players)) % self.num_players
+        in_turn_order = np.take_along_axis(self.scores(), order, axis=1)
+        return order[np.arange(self.num_games), np.argmin(in_turn_order, axis=1)]
@@ -0,0 +1,129 @@
+'''Card counting of the unseen cards, for the estimates of the heuristic players'''
+
+from src.card import VALUES_PER_SUIT, DECK_SIZE
+from src.game.status import HIDDEN
+
+# Cards of each value in the deck
+_CARDS_PER_VALUE = DECK_SIZE // VALUES_PER_SUIT
+# Mean card value of the full deck, 6
+DECK_MEAN = (VALUES_PER_SUIT - 1) / 2
+
+class BeliefTracker():
+    """Counts by value of the cards a player has not seen: the nonvisible table
+    cards and the drawing deck cards never dealt, which are equally likely to
+    be any of them. Also counts the played deck and, once it is reshuffled to
+    the drawing deck, the reshuffled cards left there. The reshuffled cards
+    have all been seen, so they are not in the unseen counts: a nonvisible table
+    card is never one of them. The played deck is reshuffled only to an empty
+    drawing deck, so after the first reshuffle the drawing deck holds only
+    reshuffled cards, and when they run out the played deck is reshuffled next.
+
+    The counts are updated on each event the player sees, in O(1), and the
+    queries are O(1) too. Game keeps the trackers of its players up to date:
+    a player that has a BeliefTracker as its belief attribute is told of every
+    card that is revealed, drawn from the drawing deck, discarded or taken from
+    the played deck and of the reshuffles. Cards of removed rows need no
+    update, they have been seen and do not come back.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Sets the counts of a new game: every card unseen"""
+        self.unseen = [_CARDS_PER_VALUE] * VALUES_PER_SUIT
+        self.played = [0] * VALUES_PER_SUIT
+        self.reshuffled = [0] * VALUES_PER_SUIT
+        self.unseen_count = DECK_SIZE
+        self.unseen_sum = _CARDS_PER_VALUE * sum(range(VALUES_PER_SUIT))
+        self.reshuffled_count = 0
+        self.reshuffles = 0
+
+    def reveal(self, value: int) -> None:
+        """A card the player had not seen becomes visible to it: a table card is
+        turned or replaced. Cards beyond the deck, like the nonvisible kings of
+        rl training mode, are ignored."""
+        if self.unseen[value] > 0:
+            self.unseen[value] -= 1
+            self.unseen_count -= 1
+            self.unseen_sum -= value
+
+    def draw(self, value: int) -> None:
+        """A card drawn from the drawing deck is seen, by the player who drew it
+        or by the others when it is played. It is one of the reshuffled cards
+        after a reshuffle, otherwise a card not seen before."""
+        if self.reshuffles:
+            if self.reshuffled[value] > 0:
+                self.reshuffled[value] -= 1
+                self.reshuffled_count -= 1
+        else:
+            self.reveal(value)
+
+    def discard(self, value: int) -> None:
+        """A visible card goes to the played deck"""
+        self.played[value] += 1
+
+    def take_played(self, value: int) -> None:
+        """The top card of the played deck is drawn"""
+        if self.played[value] > 0:
+            self.played[value] -= 1
+
+    def reshuffle(self) -> None:
+        """The played deck is shuffled to the drawing deck. Its cards have been
+        seen, they are counted as reshuffled, not as unseen."""
+        for value, count in enumerate(self.played):
+            self.reshuffled[value] += count
+            self.reshuffled_count += count
+        self.played = [0] * VALUES_PER_SUIT
+        self.reshuffles += 1
+
+    def hidden_mean(self) -> float:
+        """Expected value of a nonvisible table card, DECK_MEAN if every card is
+        seen"""
+        if self.unseen_count == 0:
+            return DECK_MEAN
+        return self.unseen_sum / self.unseen_count
+
+    def probability(self, value: int) -> float:
+        """Probability that the next card of the drawing deck has the value"""
+        counts, total = self._drawing_pool()
+        if total == 0:
+            return 0.0
+        return counts[value] / total
+
+    def row_completion(self, row_values) -> float:
+        """Probability that the next cards drawn from the drawing deck complete a
+        row: the cards of its most common visible value missing from it, or
+        three of a kind for a row without visible cards
+
+        Args:
+            row_values (list): three card values, HIDDEN for nonvisible cards, like
+            a row of GameStatus.own_values
+
+        Returns:
+            float: the probability, of the best value if several are as common
+        """
+        visible = [value for value in row_values if value != HIDDEN]
+        if not visible:
+            return sum(self._all_drawn(value, len(row_values)) for value in range(VALUES_PER_SUIT))
+        most = max(visible.count(value) for value in visible)
+        return max(self._all_drawn(value, len(row_values) - most)
+                   for value in set(visible) if visible.count(value) == most)
+
+    def _drawing_pool(self) -> tuple:
+        """(counts by value, count) of the cards the next draws come from"""
+        if not self.reshuffles:
+            return self.unseen, self.unseen_count
+        if self.reshuffled_count > 0:
+            return self.reshuffled, self.reshuffled_count
+        # The drawing deck is empty, the next draw reshuffles the played deck
+        return self.played, sum(self.played)
+
+    def _all_drawn(self, value: int, draws: int) -> float:
+        """Probability that the next draws cards all have the value"""
+        counts, total = self._drawing_pool()
+        probability = 1.0
+        for drawn in range(draws):
+            if total <= drawn:
+                return 0.0
+            probability *= max(0, counts[value] - drawn) / (total - drawn)
+        return probability
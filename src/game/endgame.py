@@ -0,0 +1,376 @@
+'''Exact expectimax solver of the last round of a game'''
+
+import math
+from collections import OrderedDict
+from math import comb
+
+import numpy as np
+
+from src.card import CARD_VALUES, VALUES_PER_SUIT
+from src.game.engine import COLUMNS, TABLE_SIZE
+
+# Code of a nonvisible card in the canonical rows, the card values are 0-12
+HIDDEN_CODE = VALUES_PER_SUIT
+
+def canonical_state(engine) -> tuple:
+    """Public state of the last round in a canonical form, equal for positions
+    that differ only in the order of rows or the cards within rows, or in the
+    tables of the players that do not move any more.
+
+    All cards nobody can see, the nonvisible table cards and the drawing deck,
+    are one pool known by its count of each value, also after a reshuffle (see
+    EndgameSolver). The played deck matters only by its top card, as each turn
+    ends with a card on it.
+
+    Args:
+        engine (GolfEngine): engine of the game, the player in turn deciding
+    Returns:
+        tuple: (top, counts, seats). top is the value of the played deck top card,
+        -1 if it is empty. counts is the number of unseen cards of each value.
+        seats has for each player that has moved already (visible sum, nonvisible
+        count), for the player in turn and the ones after it the sorted tuple of
+        rows, each a sorted tuple of card values and HIDDEN_CODEs.
+    """
+    # The unseen cards are all cards but the visible ones and the removed rows,
+    # which every player knows. They are counted from where they lie.
+    counts = [0] * VALUES_PER_SUIT
+    for card_id in engine.deck.drawing_ids():
+        counts[CARD_VALUES[card_id]] += 1
+    seats = []
+    for seat in range(engine.num_players):
+        base = seat * TABLE_SIZE
+        rows = []
+        for start in range(base, base + engine.row_count[seat] * COLUMNS, COLUMNS):
+            row = []
+            for index in range(start, start + COLUMNS):
+                if engine.visible[index]:
+                    row.append(CARD_VALUES[engine.table[index]])
+                else:
+                    counts[CARD_VALUES[engine.table[index]]] += 1
+                    row.append(HIDDEN_CODE)
+            rows.append(tuple(sorted(row)))
+        rows = tuple(sorted(rows))
+        seats.append(rows if seat >= engine.to_move else _summary(rows))
+    top_id = engine.deck.top_played_id()
+    return (-1 if top_id < 0 else CARD_VALUES[top_id]), tuple(counts), tuple(seats)
+
+def _summary(rows: tuple) -> tuple:
+    """(visible sum, nonvisible count) of canonical rows"""
+    visible = 0
+    hidden = 0
+    for row in rows:
+        for code in row:
+            if code == HIDDEN_CODE:
+                hidden += 1
+            else:
+                visible += code
+    return visible, hidden
+
+def _without(counts: tuple, value: int) -> tuple:
+    """Counts with one card of the value less"""
+    return counts[:value] + (counts[value] - 1,) + counts[value + 1:]
+
+class TranspositionTable():
+    """Bounded least recently used table of solved positions. Counts hits,
+    misses and evictions like PolicyCache."""
+    def __init__(self, max_entries: int = 1 << 20) -> None:
+        """
+        Args:
+            max_entries (int, optional): positions at most. Defaults to 1048576.
+
+        Raises:
+            ValueError: max_entries below 1
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be positive')
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        """Value of a position, None on a miss"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: tuple, value) -> None:
+        """Stores the value of a position, evicting the least recently used one
+        if the table is full"""
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drops all positions, the counters are kept"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Counters and size
+
+        Returns:
+            dict: 'hits', 'misses', 'evictions', 'size' and 'hit_rate'
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+class EndgameSolver():
+    """Exact play of the last round. Once a player has all cards visible, the
+    players after it in the round have one turn each. The solver runs
+    expectimax over these turns: the drawn deck card and a nonvisible card
+    replaced on the table are chance events over the unseen cards, and each
+    player in turn takes the action with the lowest expected value of its own
+    margin, the final score minus the best final score of the others, like
+    the search players of src.game.rollout. The nonvisible cards left at the
+    end count with their exact distribution, not a guess.
+
+    Positions are kept in a TranspositionTable under canonical_state(), so a
+    position reached by different actions or row orders is solved once, also
+    across decisions and games.
+
+    The unseen cards are taken as equally likely anywhere, as a player who
+    does not remember reshuffled played decks sees them. Games of 2-3 players
+    whose drawing deck does not run out during the round are solved.
+    """
+    def __init__(self, max_entries: int = 1 << 20) -> None:
+        """
+        Args:
+            max_entries (int, optional): size of the transposition table. Defaults
+            to 1048576.
+        """
+        self.table = TranspositionTable(max_entries)
+        # Sum distributions of nonvisible cards by (counts, number of cards)
+        self._sums = {}
+        self._num_players = 0
+        # Positions solved, the misses of the table
+        self.nodes = 0
+
+    def solvable(self, engine, hand_id: int = None) -> bool:
+        """True if the engine is in the last round and the solver can play the
+        player in turn: 2-3 players, not rl training mode and enough cards in the
+        drawing deck for the remaining turns
+
+        Args:
+            engine (GolfEngine): engine of the game
+            hand_id (int, optional): hand card in the place phase. Defaults to None.
+        """
+        if engine.rl_training_mode or not engine.last_round or not 2 <= engine.num_players <= 3:
+            return False
+        draws = engine.num_players - engine.to_move - (hand_id is not None)
+        return engine.deck.drawing_count >= draws
+
+    def draw_values(self, engine) -> tuple:
+        """Expected margins of the player in turn for its draw actions, with exact
+        play after them
+
+        Args:
+            engine (GolfEngine): engine of the game in the draw phase
+
+        Raises:
+            ValueError: the position is not solvable()
+
+        Returns:
+            tuple: (drawing deck, played deck), the played deck None if it is empty
+        """
+        self._check(engine, None)
+        top, counts, seats = canonical_state(engine)
+        mover = engine.to_move
+        played = None
+        if top >= 0:
+            played = self._best_place(mover, top, counts, seats)[mover]
+        return self._deck_value(mover, counts, seats)[mover], played
+
+    def place_values(self, engine, hand_id: int) -> list:
+        """Expected margins of the player in turn for its place actions, with exact
+        play after them
+
+        Args:
+            engine (GolfEngine): engine of the game in the place phase
+            hand_id (int): id of the hand card
+
+        Raises:
+            ValueError: the position is not solvable()
+
+        Returns:
+            list: values in the order of src.game.rollout.place_targets(), the
+            played deck first and then the slots in play
+        """
+        self._check(engine, hand_id)
+        _, counts, seats = canonical_state(engine)
+        mover = engine.to_move
+        hand = CARD_VALUES[hand_id]
+        values = {None: self._after_place(mover, hand, counts, seats, None, None)[mover]}
+        base = mover * TABLE_SIZE
+        result = [values[None]]
+        for start in range(base, base + engine.row_count[mover] * COLUMNS, COLUMNS):
+            row = tuple(sorted(CARD_VALUES[engine.table[index]] if engine.visible[index] else HIDDEN_CODE
+                               for index in range(start, start + COLUMNS)))
+            for index in range(start, start + COLUMNS):
+                code = CARD_VALUES[engine.table[index]] if engine.visible[index] else HIDDEN_CODE
+                if (row, code) not in values:
+                    values[(row, code)] = self._after_place(mover, hand, counts, seats, row, code)[mover]
+                result.append(values[(row, code)])
+        return result
+
+    def stats(self) -> dict:
+        """Transposition table counters and the number of positions solved"""
+        return dict(self.table.stats(), nodes=self.nodes)
+
+    def _check(self, engine, hand_id: int) -> None:
+        if not self.solvable(engine, hand_id):
+            raise ValueError('The endgame solver needs the last round of a 2-3 player game '
+                             'with cards left in the drawing deck for it')
+        if engine.num_players != self._num_players:
+            self._num_players = engine.num_players
+            self.table.clear()
+
+    def _turn(self, mover: int, top: int, counts: tuple, seats: tuple) -> tuple:
+        """Expected margins of all players from the draw of the mover, or the end
+        of the game when every player has moved"""
+        key = (mover, top, counts, seats)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if mover == self._num_players:
+            value = self._final(counts, seats)
+        else:
+            value = self._deck_value(mover, counts, seats)
+            if top >= 0:
+                played = self._best_place(mover, top, counts, seats)
+                if played[mover] < value[mover]:
+                    value = played
+        self.table.put(key, value)
+        self.nodes += 1
+        return value
+
+    def _deck_value(self, mover: int, counts: tuple, seats: tuple) -> tuple:
+        """Expected margins after drawing from the deck, over the unseen cards"""
+        total = sum(counts)
+        value = [0.0] * self._num_players
+        for card, count in enumerate(counts):
+            if count:
+                outcome = self._best_place(mover, card, _without(counts, card), seats)
+                for seat in range(self._num_players):
+                    value[seat] += count * outcome[seat]
+        return tuple(margin / total for margin in value)
+
+    def _best_place(self, mover: int, hand: int, counts: tuple, seats: tuple) -> tuple:
+        """Expected margins of the best place of the hand card for the mover"""
+        best = self._after_place(mover, hand, counts, seats, None, None)
+        for row in set(seats[mover]):
+            for code in set(row):
+                value = self._after_place(mover, hand, counts, seats, row, code)
+                if value[mover] < best[mover]:
+                    best = value
+        return best
+
+    def _after_place(self, mover: int, hand: int, counts: tuple, seats: tuple, row: tuple,
+                     code: int) -> tuple:
+        """Expected margins after the mover places the hand card over a card of
+        the code in the row, or discards it if row is None"""
+        rows = seats[mover]
+        if row is None:
+            after = seats[:mover] + (_summary(rows),) + seats[mover + 1:]
+            return self._turn(mover + 1, hand, counts, after)
+        rows = list(rows)
+        rows.remove(row)
+        new_row = list(row)
+        new_row.remove(code)
+        new_row.append(hand)
+        # A row of three visible cards of the same value is removed
+        if new_row.count(hand) != COLUMNS:
+            rows.append(new_row)
+        visible, hidden = _summary(rows)
+        after = seats[:mover] + ((visible, hidden),) + seats[mover + 1:]
+        if code != HIDDEN_CODE:
+            return self._turn(mover + 1, code, counts, after)
+        # The replaced card is turned to the played deck
+        total = sum(counts)
+        value = [0.0] * self._num_players
+        for card, count in enumerate(counts):
+            if count:
+                outcome = self._turn(mover + 1, card, _without(counts, card), after)
+                for seat in range(self._num_players):
+                    value[seat] += count * outcome[seat]
+        return tuple(margin / total for margin in value)
+
+    def _final(self, counts: tuple, seats: tuple) -> tuple:
+        """Expected margins at the end of the game. A player with nonvisible cards
+        gets the sum of that many cards drawn from the unseen ones. The margin of a
+        player is NaN if more than one other player has nonvisible cards, which
+        does not happen to the players moving in the last round of 2-3 players."""
+        total = sum(counts)
+        mean = sum(value * count for value, count in enumerate(counts)) / total if total else 0.0
+        margins = []
+        for seat, (visible, hidden) in enumerate(seats):
+            known = math.inf
+            unknown = []
+            for other, (other_visible, other_hidden) in enumerate(seats):
+                if other == seat:
+                    continue
+                if other_hidden:
+                    unknown.append((other_visible, other_hidden))
+                else:
+                    known = min(known, other_visible)
+            if len(unknown) > 1:
+                margins.append(math.nan)
+                continue
+            if not unknown:
+                best_other = known
+            else:
+                other_visible, other_hidden = unknown[0]
+                best_other = other_visible + self._expected_min(counts, other_hidden, known - other_visible, mean)
+            margins.append(visible + hidden * mean - best_other)
+        return tuple(margins)
+
+    def _expected_min(self, counts: tuple, hidden: int, bound: float, mean: float) -> float:
+        """Expected value of min(bound, sum of hidden cards drawn from the unseen
+        ones)"""
+        if bound <= 0:
+            return bound
+        if bound > (VALUES_PER_SUIT - 1) * hidden:
+            return hidden * mean
+        key = (counts, hidden)
+        sums = self._sums.get(key)
+        if sums is None:
+            if len(self._sums) >= self.table.max_entries:
+                self._sums.clear()
+            sums = self._sums[key] = _sum_distribution(counts, hidden)
+        below, weighted = sums
+        # E[min(b, X)] = b - E[(b - X)+]
+        return bound - (bound * below[bound - 1] - weighted[bound - 1])
+
+def _sum_distribution(counts: tuple, draws: int) -> tuple:
+    """Distribution of the sum of draws cards drawn without replacement from the
+    counts of each value
+
+    Returns:
+        tuple: cumulative lists P(X <= x) and E[X; X <= x] for x = 0 ... 12 * draws
+    """
+    size = (VALUES_PER_SUIT - 1) * draws + 1
+    # ways[k, x]: number of ways to pick k cards with the sum x
+    ways = np.zeros((draws + 1, size))
+    ways[0, 0] = 1.0
+    for value, count in enumerate(counts):
+        if count == 0:
+            continue
+        new = ways.copy()
+        for taken in range(1, min(count, draws) + 1):
+            shift = taken * value
+            if shift >= size:
+                break
+            new[taken:, shift:] += comb(count, taken) * ways[:draws + 1 - taken, :size - shift]
+        ways = new
+    probabilities = ways[draws] / comb(sum(counts), draws)
+    return (np.cumsum(probabilities).tolist(),
+            np.cumsum(probabilities * np.arange(size)).tolist())
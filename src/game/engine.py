@@ -0,0 +1,361 @@
+'''Headless rules engine for card game "Golf"'''
+
+from array import array
+
+from src.card import CARD_VALUES
+from src.card_deck import CardDeck
+
+ROWS = 3
+COLUMNS = 3
+TABLE_SIZE = ROWS * COLUMNS
+
+# Draw sources
+DRAW_DECK = 0
+DRAW_PLAYED = 1
+# Place target for putting the hand card straight to the played deck
+DISCARD = -1
+# Card id of the nonvisible kings that fill removed rows in rl training mode
+DUMMY_CARD_ID = 0
+# Public value of a nonvisible table card
+HIDDEN = -1
+
+class GolfEngine():
+    """Rules of 'Golf' on a table held as small integer arrays. No players, no
+    output: the caller decides the actions and the engine applies them.
+
+    Each player has 9 table slots in row-major order holding card ids, and a
+    visibility flag for each slot. Rows are kept compacted like in a list: the
+    first row_count[player] rows are in play and removing a row shifts the rows
+    after it up. Slots are addressed as row * 3 + column, zero based.
+
+    The score and the number of nonvisible cards of each player are kept up to
+    date on every change of the table, so scoring and game over checks are O(1).
+    So are the public values of the slots, the card value if visible and HIDDEN
+    if not, which are what the players see of the tables.
+
+    The whole rules state (decks, tables, player in turn and the last round flag)
+    is a few small arrays, so snapshot(), restore() and clone() are cheap enough
+    for search players that copy the state thousands of times per move.
+    """
+    def __init__(self, num_players: int, deck: CardDeck = None,
+                 rl_training_mode: bool = False) -> None:
+        """Creates an empty table for the players
+
+        Args:
+            num_players (int): number of players
+            deck (CardDeck, optional): deck to deal from. Defaults to a new deck.
+            rl_training_mode (bool, optional): Replace removed rows with nonvisible
+            kings, so every table stays 3x3. Defaults to False.
+        """
+        self.num_players = num_players
+        self.deck = deck if deck is not None else CardDeck()
+        self.rl_training_mode = rl_training_mode
+        self.table = array('b', bytes(num_players * TABLE_SIZE))
+        self.visible = array('b', bytes(num_players * TABLE_SIZE))
+        self.public_values = array('b', [HIDDEN] * (num_players * TABLE_SIZE))
+        self.row_count = array('b', [ROWS] * num_players)
+        self.table_score = array('h', bytes(2 * num_players))
+        self.hidden_count = array('b', [TABLE_SIZE] * num_players)
+        self.to_move = 0
+        self.last_round = False
+
+    def deal(self, player: int) -> None:
+        """Deals 9 nonvisible cards from the drawing deck to the player's table
+
+        Args:
+            player (int): seat index of the player
+        """
+        base = player * TABLE_SIZE
+        for slot in range(TABLE_SIZE):
+            self.table[base + slot] = self.deck.draw_id()
+            self.visible[base + slot] = 0
+            self.public_values[base + slot] = HIDDEN
+        self.row_count[player] = ROWS
+        self._recount(player)
+
+    def deal_first_card(self) -> None:
+        """Turns the first card from the drawing deck to the played deck"""
+        self.deck.deal_first_card()
+
+    def reveal(self, player: int, slot: int) -> None:
+        """Turns a table card visible
+
+        Args:
+            player (int): seat index of the player
+            slot (int): row * 3 + column
+        """
+        index = player * TABLE_SIZE + slot
+        if not self.visible[index]:
+            self.visible[index] = 1
+            self.public_values[index] = CARD_VALUES[self.table[index]]
+            self.hidden_count[player] -= 1
+
+    def set_table(self, player: int, card_ids: list, visible: list = None) -> None:
+        """Sets the table of a player directly, for tests and analysis. The cards
+        are not taken from the deck.
+
+        Args:
+            player (int): seat index of the player
+            card_ids (list): card ids in row-major order, a multiple of 3 of them
+            visible (list, optional): visibility flags for card_ids. Defaults to all
+            visible.
+        """
+        if len(card_ids) % COLUMNS != 0 or len(card_ids) > TABLE_SIZE:
+            raise ValueError('Table must have 0-3 full rows')
+        if visible is None:
+            visible = [1] * len(card_ids)
+        base = player * TABLE_SIZE
+        for slot, (card_id, is_visible) in enumerate(zip(card_ids, visible)):
+            self.table[base + slot] = card_id
+            self.visible[base + slot] = 1 if is_visible else 0
+            self.public_values[base + slot] = CARD_VALUES[card_id] if is_visible else HIDDEN
+        self.row_count[player] = len(card_ids) // COLUMNS
+        self._recount(player)
+
+    def _recount(self, player: int) -> None:
+        """Recomputes the score and the nonvisible card count of a player from
+        the table"""
+        base = player * TABLE_SIZE
+        end = base + self.row_count[player] * COLUMNS
+        self.table_score[player] = sum(CARD_VALUES[card_id] for card_id in self.table[base:end])
+        self.hidden_count[player] = (end - base) - sum(self.visible[base:end])
+
+    def slot(self, player: int, row: int, column: int) -> int:
+        """Converts a zero based (row, column) of the rows in play to a slot.
+        Negative indices count from the end, like list indices.
+
+        Raises:
+            IndexError: no such row or column
+
+        Returns:
+            int: row * 3 + column
+        """
+        rows = self.row_count[player]
+        if row < 0:
+            row += rows
+        if column < 0:
+            column += COLUMNS
+        if not 0 <= row < rows or not 0 <= column < COLUMNS:
+            raise IndexError('Table position out of range')
+        return row * COLUMNS + column
+
+    def draw(self, source: int) -> int:
+        """Draws a card to hand
+
+        Args:
+            source (int): DRAW_DECK or DRAW_PLAYED
+
+        Raises:
+            ValueError: invalid source or no cards in the played deck
+
+        Returns:
+            int: id of the drawn card
+        """
+        if source == DRAW_DECK:
+            return self.deck.draw_id()
+        if source == DRAW_PLAYED:
+            return self.deck.draw_played_id()
+        raise ValueError('Invalid draw source')
+
+    def place(self, player: int, card_id: int, slot: int) -> int:
+        """Plays the hand card either to the played deck or to the table, in which
+        case the replaced table card goes to the played deck. The placed card is
+        visible.
+
+        Args:
+            player (int): seat index of the player
+            card_id (int): id of the hand card
+            slot (int): DISCARD, or row * 3 + column of a row in play
+
+        Returns:
+            int: id of the card that went to the played deck
+        """
+        if slot == DISCARD:
+            self.deck.add_id_to_played(card_id)
+            return card_id
+        index = player * TABLE_SIZE + slot
+        replaced = self.table[index]
+        self.deck.add_id_to_played(replaced)
+        self.table[index] = card_id
+        self.public_values[index] = CARD_VALUES[card_id]
+        self.table_score[player] += CARD_VALUES[card_id] - CARD_VALUES[replaced]
+        if not self.visible[index]:
+            self.visible[index] = 1
+            self.hidden_count[player] -= 1
+        return replaced
+
+    def check_full_rows(self, player: int) -> int:
+        """Removes rows of three visible cards of the same value
+
+        Args:
+            player (int): seat index of the player
+
+        Returns:
+            int: number of rows removed
+        """
+        removed = 0
+        base = player * TABLE_SIZE
+        values = self.public_values
+        row = 0
+        while row < self.row_count[player]:
+            index = base + row * COLUMNS
+            value = values[index]
+            if value != HIDDEN and value == values[index + 1] == values[index + 2]:
+                # The rows after it shift up, so the same row index is checked again
+                self._remove_row(player, row)
+                removed += 1
+            else:
+                row += 1
+        return removed
+
+    def _remove_row(self, player: int, row: int) -> None:
+        """Removes a row and shifts the rows after it up. In rl training mode
+        a row of nonvisible kings is added to the end."""
+        base = player * TABLE_SIZE
+        rows = self.row_count[player]
+        start = base + row * COLUMNS
+        end = base + rows * COLUMNS
+        for index in range(start, start + COLUMNS):
+            self.table_score[player] -= CARD_VALUES[self.table[index]]
+            self.hidden_count[player] -= 1 - self.visible[index]
+        self.table[start:end - COLUMNS] = self.table[start + COLUMNS:end]
+        self.visible[start:end - COLUMNS] = self.visible[start + COLUMNS:end]
+        self.public_values[start:end - COLUMNS] = self.public_values[start + COLUMNS:end]
+        if self.rl_training_mode:
+            for index in range(end - COLUMNS, end):
+                self.table[index] = DUMMY_CARD_ID
+                self.visible[index] = 0
+                self.public_values[index] = HIDDEN
+            self.table_score[player] += COLUMNS * CARD_VALUES[DUMMY_CARD_ID]
+            self.hidden_count[player] += COLUMNS
+        else:
+            self.row_count[player] = rows - 1
+
+    def end_turn(self) -> bool:
+        """Passes the turn to the next player. The round in which some player gets
+        all table cards visible is the last one.
+
+        Returns:
+            bool: True if the game ended with this turn
+        """
+        if not self.last_round and self.game_over():
+            self.last_round = True
+        self.to_move += 1
+        if self.to_move == self.num_players:
+            self.to_move = 0
+            return self.last_round and self.game_over()
+        return False
+
+    def is_finished(self, player: int) -> bool:
+        """Returns True if all the table cards of the player are visible"""
+        return self.hidden_count[player] == 0
+
+    def game_over(self) -> bool:
+        """Checks if game over condition is reached. (All cards of one player
+        visible on table)"""
+        return 0 in self.hidden_count
+
+    def score(self, player: int) -> int:
+        """Sum of the values of the player's table cards, visible or not"""
+        return self.table_score[player]
+
+    def winner(self) -> int:
+        """Seat index of the player with the lowest score, the first one on ties"""
+        return self.table_score.index(min(self.table_score))
+
+    def rows(self, player: int) -> list:
+        """Table of the player as a list of rows of (card id, visible) pairs"""
+        base = player * TABLE_SIZE
+        return [[(self.table[index], bool(self.visible[index]))
+                 for index in range(base + row * COLUMNS, base + (row + 1) * COLUMNS)]
+                for row in range(self.row_count[player])]
+
+    def snapshot(self) -> tuple:
+        """Copy of the rules state: decks, tables, player in turn and the last
+        round flag. The random generator of the deck is not included.
+
+        Returns:
+            tuple: state for restore()
+        """
+        return (self.deck.snapshot(), self.table.tobytes(), self.visible.tobytes(),
+                self.public_values.tobytes(), self.row_count.tobytes(), self.table_score.tobytes(), self.hidden_count.tobytes(),
+                self.to_move, self.last_round)
+
+    def restore(self, state: tuple) -> None:
+        """Sets the rules state from snapshot() of this engine or one with the same
+        number of players, in place
+
+        Args:
+            state (tuple): result of snapshot()
+        """
+        (deck, table, visible, public_values, row_count, table_score, hidden_count,
+         self.to_move, self.last_round) = state
+        self.deck.restore(deck)
+        memoryview(self.table).cast('B')[:] = table
+        memoryview(self.visible).cast('B')[:] = visible
+        memoryview(self.public_values).cast('B')[:] = public_values
+        memoryview(self.row_count).cast('B')[:] = row_count
+        memoryview(self.table_score).cast('B')[:] = table_score
+        memoryview(self.hidden_count).cast('B')[:] = hidden_count
+
+    def clone(self, rng=None) -> 'GolfEngine':
+        """Returns an independent copy of the rules state
+
+        Args:
+            rng (random.Random | numpy.random.Generator | int, optional): Random
+            generator for the reshuffles of the copy. Defaults to None, a new
+            unseeded random.Random.
+
+        Returns:
+            GolfEngine: the copy
+        """
+        engine = GolfEngine.__new__(GolfEngine)
+        engine.num_players = self.num_players
+        engine.deck = self.deck.copy(rng)
+        engine.rl_training_mode = self.rl_training_mode
+        engine.table = array('b', self.table)
+        engine.visible = array('b', self.visible)
+        engine.public_values = array('b', self.public_values)
+        engine.row_count = array('b', self.row_count)
+        engine.table_score = array('h', self.table_score)
+        engine.hidden_count = array('b', self.hidden_count)
+        engine.to_move = self.to_move
+        engine.last_round = self.last_round
+        return engine
+
+    def resample_hidden(self, rng=None) -> None:
+        """Deals the cards no player can see again. The nonvisible table cards of
+        all players and the drawing deck cards never dealt are shuffled together
+        and redistributed: all cards that went to the played deck have been
+        visible, so in Golf every player observes the same information and the
+        sample fits any of them. Drawing deck cards that came back from the
+        played deck in a reshuffle have been seen and can not be on a table, they
+        are only shuffled among themselves. Use on a clone to make a determinized
+        copy of the game.
+
+        Args:
+            rng (random.Random | numpy.random.Generator, optional): Random generator
+            for the shuffle. Defaults to None, the generator of the deck.
+
+        Raises:
+            ValueError: rl training mode, where the dummy rows are not real cards
+        """
+        if self.rl_training_mode:
+            raise ValueError('Hidden cards can not be resampled in rl training mode')
+        rng = self.deck.rng if rng is None else rng
+        hidden_slots = [player * TABLE_SIZE + slot
+                        for player in range(self.num_players)
+                        for slot in range(self.row_count[player] * COLUMNS)
+                        if not self.visible[player * TABLE_SIZE + slot]]
+        drawing = self.deck.drawing_ids()
+        reshuffled = self.deck.reshuffled_count
+        fresh = len(drawing) - reshuffled
+        unseen = [self.table[index] for index in hidden_slots] + drawing[:fresh]
+        seen = drawing[fresh:]
+        rng.shuffle(unseen)
+        rng.shuffle(seen)
+        for index, card_id in zip(hidden_slots, unseen):
+            self.table[index] = card_id
+        self.deck.set_drawing_ids(unseen[len(hidden_slots):] + seen, reshuffled)
+        for player in range(self.num_players):
+            self._recount(player)
@@ -1,49 +1,96 @@
 '''Game controller for card game "Golf"'''
 
-from random import shuffle
-
-from src.card_deck import CardDeck, Card, Suit
-from src.player import HumanPlayer, ComputerPlayer, AdvancedComputerPlayer, Player, RLPlayer, StupidComputerPlayer
+import os
+from random import Random
+
+from src.card_deck import CardDeck, Card
+from src.card import CARDS, CARD_VALUES
+from src.game.engine import GolfEngine, TABLE_SIZE, DRAW_DECK, DRAW_PLAYED, DISCARD
+from src.game.status import GameStatus, table_strs
+from src.game.record import GameRecorder
+from src.game.profiler import GameProfiler
+from src.player.player import Player
+from src.player.human_player import HumanPlayer
+from src.player.registry import create_player
 from src.view import View
 
+# Rounds after which play_game stops a game that does not end
+MAX_TURNS = 1000
+
 class Game():
-    """class for the game logic or 'controller' of card game 'Golf'
+    """class for the game logic or 'controller' of card game 'Golf'. The rules and
+    the table state are in GolfEngine, this class connects the engine to the
+    players and the view.
 
     Raises:
         ValueError: Number of players must be 2-4
         ValueError: Invalid return of internal game logic at player action
     """
-    def __init__(self, num_players: int, 
+    def __init__(self, num_players: int = None,
                  human_player: bool = True,
                  rl_player: bool = False,
                  stupid_player:bool = False,
                  advanced_player:bool  = False,
                  rl_training_mode:bool = False,
-                 silent_mode: bool = False) -> None:
+                 silent_mode: bool = False,
+                 seed: int = None,
+                 players: list = None,
+                 shuffle_players: bool = True,
+                 recorder: GameRecorder = None,
+                 profiler: GameProfiler = None,
+                 seats: list = None) -> None:
         """instantiates a golf card game. Sets players, turns initial cards
         and deals the first card to the table
 
         Args:
-            num_players (int): number of players, 2-3
+            num_players (int, optional): number of players, 2-3. Defaults to the
+            number of seats or players.
             human_player (bool, optional): Check to True to add a human player. Defaults to True.
+            seed (int, optional): Seed for the deck and the seating order, same seed
+            gives the same deal. Defaults to None, random.
+            players (list, optional): Player instances to seat, used instead of the
+            player flags. Defaults to None.
+            shuffle_players (bool, optional): Shuffle the seating order, otherwise the
+            first player starts. Defaults to True.
+            recorder (GameRecorder, optional): Records the game when it is played
+            with play_game. Defaults to None.
+            profiler (GameProfiler, optional): Times the phases of the turns of this
+            game. Defaults to None, no instrumentation.
+            seats (list, optional): Player type names to seat, for example
+            ["advanced", "stupid"], used instead of the player flags. The classes
+            are imported on first use, see src.player.registry. Defaults to None.
 
         Raises:
             ValueError: Invalid number of players
         """        
-        self.deck = CardDeck()
+        if seed is None:
+            # A random seed that is known, so the game can be recorded and replayed
+            seed = int.from_bytes(os.urandom(8), 'little')
+        self.seed = seed
+        self.shuffle_players = shuffle_players
+        self._recorder = recorder
+        self.rng = Random(seed)
+        self.deck = CardDeck(self.rng)
         self._silent_mode = silent_mode
         self.view = View(self, silent_mode=self._silent_mode)
         self.rl_training_mode = rl_training_mode
         
-        self.players = []
-        if human_player:
-            self.players.append(HumanPlayer())
-        if rl_player:
-            self.players.append(RLPlayer())
-        if advanced_player:
-            self.players.append(AdvancedComputerPlayer())
-        if stupid_player:
-            self.players.append(StupidComputerPlayer())
+        if players is not None:
+            self.players = list(players)
+        elif seats is not None:
+            self.players = [create_player(seat) for seat in seats]
+        else:
+            self.players = []
+            if human_player:
+                self.players.append(create_player("human"))
+            if rl_player:
+                self.players.append(create_player("rl"))
+            if advanced_player:
+                self.players.append(create_player("advanced"))
+            if stupid_player:
+                self.players.append(create_player("stupid"))
+        if num_players is None:
+            num_players = len(self.players)
 
         if len(self.players) > num_players:
             raise ValueError('Too many players from constructor arguments')
@@ -51,31 +98,57 @@ class Game():
             raise ValueError('Number of players must be 2-3')
         if len(self.players) < num_players:
             for _ in range(len(self.players), num_players):
-                self.players.append(StupidComputerPlayer()) # In this phase of training use RLPlayer
-        for player in self.players:
+                self.players.append(create_player("stupid")) # In this phase of training use RLPlayer
+        if shuffle_players:
+            self.rng.shuffle(self.players)
+        self.engine = GolfEngine(len(self.players), self.deck, rl_training_mode)
+        # Card counting trackers of the players, (seat, BeliefTracker), told of
+        # every card event of the game
+        self._trackers = [(seat, player.belief) for seat, player in enumerate(self.players)
+                          if getattr(player, 'belief', None) is not None]
+        for _, tracker in self._trackers:
+            tracker.reset()
+        # Source of the hand card, DRAW_DECK or DRAW_PLAYED
+        self._hand_source = None
+        for seat, player in enumerate(self.players):
             # Deal 9 cards for each player and place them in shape of 3x3
-            table_cards = self.deal_initial_cards()
-            for i in range(len(table_cards)//3):
-                player.table_cards.append(table_cards[i*3:(i+1)*3])
-            turned_cards = player.turn_initial_cards(player.table_cards)
+            self.engine.deal(seat)
+            turned_cards = player.turn_initial_cards(self.table_cards_strs(player))
             if not isinstance(player, HumanPlayer):
                 self.view.output(f"{player.name} turns the initial cards visible.")
             for row, column in turned_cards:
-                player.table_cards[row-1][column-1].visible = True
+                slot = self.engine.slot(seat, row-1, column-1)
+                self.engine.reveal(seat, slot)
+                for _, tracker in self._trackers:
+                    tracker.reveal(CARD_VALUES[self.engine.table[seat * TABLE_SIZE + slot]])
         # Turn initial card from the drawing deck to the played cards
-        self.deck.deal_first_card()
-        shuffle(self.players)
-        self.view.output(f"Players shuffled, player {self.players[0].name} starts...")
+        self.engine.deal_first_card()
+        for _, tracker in self._trackers:
+            first_value = CARD_VALUES[self.engine.deck.top_played_id()]
+            tracker.draw(first_value)
+            tracker.discard(first_value)
+        self.view.output(f"Players seated, player {self.players[0].name} starts...")
         self.turn = 0
+        # Set by play_game if the game was stopped at max_turns
+        self.truncated = False
+        if profiler is not None:
+            profiler.attach(self)
         self.view.output("Complete init")
 
-    def deal_initial_cards(self) -> list:
-        """Deals initial 9 cards from the drawing deck
+    def seat_of(self, player: Player) -> int:
+        """Returns the seat index of the player in the engine
+
+        Args:
+            player (Player): human or other player in this game
 
         Returns:
-            list: nine Card instances in a list
+            int: index of the player in self.players
         """
-        return [self.deck.draw_from_deck() for _ in range(9)]
+        # Usually asked of the player in turn
+        seat = self.engine.to_move
+        if self.players[seat] is player:
+            return seat
+        return self.players.index(player)
 
     def player_gets_card(self, player: Player) -> Card:
         """Passes control to corresponding controller, a computer or human
@@ -92,15 +165,29 @@ class Game():
             Card: The drawn card from either deck
         """
         action = player.get_draw_action(self.get_game_status_for_player(player))
+        if self._recorder is not None and action in ("d", "p"):
+            self._recorder.draw(DRAW_DECK if action == "d" else DRAW_PLAYED)
         if action == "d": # d is drawing deck
-            card = self.deck.draw_from_deck()
-            card.visible = True
-            self.view.output(f"{player.name} draws from the drawing deck.")
+            reshuffle = self.engine.deck.drawing_count == 0
+            card = CARDS[self.engine.draw(DRAW_DECK)]
+            self._hand_source = DRAW_DECK
+            if self._trackers:
+                seat = self.seat_of(player)
+                for tracker_seat, tracker in self._trackers:
+                    if reshuffle:
+                        tracker.reshuffle()
+                    if tracker_seat == seat:
+                        tracker.draw(card.value)
+            if not self._silent_mode:
+                self.view.output(f"{player.name} draws from the drawing deck.")
             return card
         elif action == "p": # p is played cards deck
-            card = self.deck.draw_from_played()
-            card.visible = True
-            self.view.output(f"{player.name} draws {card} from the played deck.")
+            card = CARDS[self.engine.draw(DRAW_PLAYED)]
+            self._hand_source = DRAW_PLAYED
+            for _, tracker in self._trackers:
+                tracker.take_played(card.value)
+            if not self._silent_mode:
+                self.view.output(f"{player.name} draws {card} from the played deck.")
             return card
         else:
             raise ValueError("Got invalid return from Player.get_draw_action()")
@@ -115,15 +202,45 @@ class Game():
             hand_card (Card): the current hand card to be played
         """        
         action = player.get_play_action(self.get_game_status_for_player(player, hand_card))
+        seat = self.seat_of(player)
         if action[0] == "p": # p means play card away from hand to played deck
-            self.view.output(f"{hand_card} is placed in the played deck by {player.name}.")
-            self.deck.add_to_played(hand_card)
+            if self._recorder is not None:
+                self._recorder.play(DISCARD)
+            self.engine.place(seat, hand_card.id, DISCARD)
+            if self._trackers:
+                self._inform_trackers(seat, hand_card, hand_card, False)
+            if not self._silent_mode:
+                self.view.output(f"{hand_card} is placed in the played deck by {player.name}.")
         else: # should be a tuple (row, column) for play to table
-            self.deck.add_to_played(player.table_cards[action[0]-1][action[1]-1])
-            print_later = f"{player.table_cards[action[0]-1][action[1]-1]} is placed on the played deck from the table by {player.name}"
-            player.table_cards[action[0]-1][action[1]-1] = hand_card
-            self.view.output(f"{player.name} puts {hand_card} on the table at {action[0]}. row, {action[1]}. place")
-            self.view.output(print_later)
+            slot = self.engine.slot(seat, action[0]-1, action[1]-1)
+            if self._recorder is not None:
+                self._recorder.play(slot)
+            was_hidden = not self.engine.visible[seat * TABLE_SIZE + slot]
+            replaced_card = CARDS[self.engine.place(seat, hand_card.id, slot)]
+            if self._trackers:
+                self._inform_trackers(seat, hand_card, replaced_card, was_hidden)
+            if not self._silent_mode:
+                self.view.output(f"{player.name} puts {hand_card} on the table at {action[0]}. row, {action[1]}. place")
+                self.view.output(f"{replaced_card} is placed on the played deck from the table by {player.name}")
+        self._hand_source = None
+
+    def _inform_trackers(self, seat: int, hand_card: Card, played_card: Card, was_hidden: bool) -> None:
+        """Tells the card counting trackers of the players what they saw of a
+        played card
+
+        Args:
+            seat (int): seat of the player who played
+            hand_card (Card): the hand card, seen by the others now if it came from
+            the drawing deck
+            played_card (Card): card that went to the played deck
+            was_hidden (bool): played_card was a nonvisible table card
+        """
+        for tracker_seat, tracker in self._trackers:
+            if self._hand_source == DRAW_DECK and tracker_seat != seat:
+                tracker.draw(hand_card.value)
+            if was_hidden:
+                tracker.reveal(played_card.value)
+            tracker.discard(played_card.value)
 
     def player_plays_turn(self, player: Player) -> None:
         """Completes the drawing and playing of for one player, which constitutes
@@ -133,10 +250,11 @@ class Game():
         Args:
             player (Player): human or other Player
         """        
-        if isinstance(player, HumanPlayer):
+        human = isinstance(player, HumanPlayer)
+        if human:
             self.view.show_for_player(player)
         hand_card = self.player_gets_card(player)
-        if isinstance(player, HumanPlayer):
+        if human:
             self.view.output(f"You got the card: {hand_card}")
         self.player_plays_card(player, hand_card)
         self.check_full_rows(player)
@@ -147,18 +265,10 @@ class Game():
         Args:
             player (Player): Player whose turn it is
         """
-        for row in player.table_cards:
-            if all([card.visible for card in row]) and len(set([card.value for card in row])) == 1:
-                self.view.output(f"{player.name}'s row of cards is complete and is removed.\n{row}")
-                player.table_cards.remove(row)
-                # Add a dummy row for RLPlayer, so table_cards.shape is always (3,3)
-                if self.rl_training_mode:
-                    player.table_cards.append([
-                        Card(Suit.SPADES, 0),
-                        Card(Suit.SPADES, 0),
-                        Card(Suit.SPADES, 0)
-                    ])
-                    
+        # In rl training mode the engine adds a dummy row for RLPlayer, so the
+        # table shape is always (3,3)
+        if self.engine.check_full_rows(self.seat_of(player)):
+            self.view.output(f"{player.name}'s row of cards is complete and is removed.")
 
     def check_game_over(self) -> bool:
         """Checks if game over condition is reached. (All cards of one player visible on table)
@@ -166,11 +276,7 @@ class Game():
         Returns:
             bool: Game over conditions met
         """        
-        for player in self.players:
-            all_visible = all([card.visible for row in player.table_cards for card in row])
-            if all_visible:
-                return True
-        return False
+        return self.engine.game_over()
 
     def player_score(self, player: Player) -> int:
         """Returns the player's score of card values in the table
@@ -181,48 +287,60 @@ class Game():
         Returns:
             int: Sum of table Card values
         """
-        return sum([card.value for row in player.table_cards for card in row])
+        return self.engine.score(self.seat_of(player))
 
-    def play_game(self) -> tuple:
+    def play_game(self, max_turns: int = MAX_TURNS) -> tuple:
         """Runner for the golf game. Runs the turns until victory conditions are met
         Returns some data that might be needed for reinforcement learning or other
         purposes.
 
+        Args:
+            max_turns (int, optional): rounds after which a game that has not ended
+            is stopped, for players that never finish their tables. The game is
+            then truncated and scored as it stands. Defaults to MAX_TURNS.
+
         Returns:
-            tuple: (turns played, scores dict, winner_name)
+            tuple: (turns played, scores dict, winner_name). self.truncated tells
+            whether the game was stopped at max_turns.
         """
-        last_round = False  # Flag to indicate whether the extra round is active
+        if self._recorder is not None:
+            self._recorder.start(self)
 
-        while not last_round or not self.check_game_over():
+        # The engine keeps the player in turn and the last round flag: the round
+        # in which game over conditions are met is completed
+        game_ended = False
+        while not game_ended and self.turn < max_turns:
             self.turn += 1
 
 
-            self.view.output('------------')
-            self.view.output(f'Turn {self.turn}:')
+            if not self._silent_mode:
+                self.view.output('------------')
+                self.view.output(f'Turn {self.turn}:')
 
             for player in self.players:
                 self.player_plays_turn(player)
+                game_ended = self.engine.end_turn()
 
-                if not last_round and self.check_game_over():
-                    # Start the extra round once game-over conditions are met
-                    last_round = True
-
-            if last_round and self.check_game_over():
-                break  # Exit the loop after completing the extra round
-
-        print(f"Game over in {self.turn} rounds!")
-        print("Scores:")
+        self.truncated = not game_ended
+        if self._recorder is not None:
+            self._recorder.finish()
+        if self.truncated:
+            self.view.output(f"Game stopped unfinished after {self.turn} rounds!")
+        else:
+            self.view.output(f"Game over in {self.turn} rounds!")
+        self.view.output("Scores:")
         scores = {}
         for player in self.players:
-            print(f'{player.name}: {self.player_score(player)}')
             scores[player.name] = self.player_score(player)
+            if not self._silent_mode:
+                self.view.output(f'{player.name}: {scores[player.name]}')
         winner_name = list(scores.keys())[0]
         for name in scores.keys():
             if scores[name] < scores[winner_name]:
                 winner_name = name
         return (self.turn, scores, winner_name)
 
-    def get_game_status_for_player(self, player : Player, hand_card = None) -> dict:
+    def get_game_status_for_player(self, player : Player, hand_card = None) -> GameStatus:
         """Getter method for the game status. This can and will be passed to each player,
         so player can assess the situation for the right action. The game status does not
         reveal any information that is not available through the game's rules (nonvisible
@@ -234,32 +352,22 @@ class Game():
             play a card, this should have the hand card. Defaults to None.
 
         Returns:
-            dict: _game_status = dict({
-                                'other_players' = [table_cards1, table_cards2 ...],
-                                'player' = [table_cards],
-                                'played_top_card' = Card,
-                                <'hand_card' = Card>
-                                })
-        """        
-        def table_cards_list(pl : Player) -> list:
-            # helper function for getting only visible information to pass
-            res = []
-            for row in pl.table_cards:
-                res.append(list(map(lambda x: str(x), row)))
-            return res
-        game_status = {}
-        game_status['player'] = list(table_cards_list(player))
-        game_status['other_players'] = []
-        for iter_player in self.players:
-            if iter_player is player:
-                continue
-            else:
-                game_status['other_players'].append(table_cards_list(iter_player))
-        if hand_card:
-            game_status['hand_card'] = hand_card
-
-        if len(self.deck.played_cards) > 0:
-            game_status['played_top_card'] = self.deck.get_last_played_card()
-        else:
-            game_status['played_top_card'] = None
-        return game_status
+            GameStatus: read-only view of the game for the player. Its fields are
+            read from the table on first access.
+        """
+        return GameStatus(self.engine, self.seat_of(player), hand_card)
+
+    def table_cards_strs(self, player : Player) -> list:
+        """Table cards of a player as they can be seen by everyone: visible cards
+        as strings like '♤10', nonvisible cards as 'XX'
+
+        Args:
+            player (Player): human or other player
+
+        Returns:
+            list: 2d list of card strings
+        """
+        return self._table_strs(self.seat_of(player))
+
+    def _table_strs(self, seat : int) -> list:
+        return table_strs(self.engine, seat)
@@ -0,0 +1,133 @@
+'''Opt-in timing and counters for games'''
+
+import json
+from time import perf_counter
+
+# Counters of GameProfiler, in report order
+COUNTERS = ('games', 'rounds', 'turns', 'reshuffles', 'row_removals')
+
+class GameProfiler():
+    """Collects wall time per phase and player class, and counters of turns,
+    reshuffles and removed rows, over any number of games. The phases are
+    get_game_status_for_player, get_draw_action, get_play_action,
+    check_full_rows and check_game_over.
+
+    A game is instrumented by attach(), which Game and GolfTrainEnv call when they
+    are given a profiler. It replaces the timed methods of that game, its engine,
+    deck and players with timing wrappers on the instances, so games without a
+    profiler run the plain methods and pay nothing. GameStatus fields are read
+    lazily, so most of the cost of reading the table shows up in the decisions.
+    """
+    def __init__(self) -> None:
+        # (phase, player class name) -> [calls, seconds]
+        self.timings = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def attach(self, game) -> None:
+        """Instruments a game. Its players must not be instrumented by another
+        game already.
+
+        Args:
+            game (Game): game to time
+        """
+        engine = game.engine
+        seat_class = [type(player).__name__ for player in game.players]
+        self.counters['games'] += 1
+
+        game.get_game_status_for_player = self._timed(
+            game.get_game_status_for_player, 'get_game_status_for_player',
+            lambda player, *args, **kwargs: type(player).__name__)
+        for player in game.players:
+            name = type(player).__name__
+            player.get_draw_action = self._timed(player.get_draw_action, 'get_draw_action',
+                                                 lambda *args, name=name: name)
+            player.get_play_action = self._timed(player.get_play_action, 'get_play_action',
+                                                 lambda *args, name=name: name)
+
+        check_full_rows = self._timed(engine.check_full_rows, 'check_full_rows',
+                                      lambda seat: seat_class[seat])
+        def counted_check_full_rows(seat):
+            removed = check_full_rows(seat)
+            self.counters['row_removals'] += removed
+            return removed
+        engine.check_full_rows = counted_check_full_rows
+        engine.game_over = self._timed(engine.game_over, 'check_game_over', lambda: 'all')
+
+        end_turn = engine.end_turn
+        def counted_end_turn():
+            self.counters['turns'] += 1
+            if engine.to_move == engine.num_players - 1:
+                self.counters['rounds'] += 1
+            return end_turn()
+        engine.end_turn = counted_end_turn
+
+        reshuffle = engine.deck._reshuffle_played
+        def counted_reshuffle():
+            self.counters['reshuffles'] += 1
+            reshuffle()
+        engine.deck._reshuffle_played = counted_reshuffle
+
+    def _timed(self, method, phase: str, player_class):
+        """Wraps method to add its wall time to the phase of the player class
+        given by player_class(*args)"""
+        timings = self.timings
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            result = method(*args, **kwargs)
+            elapsed = perf_counter() - start
+            key = (phase, player_class(*args, **kwargs))
+            entry = timings.get(key)
+            if entry is None:
+                timings[key] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+            return result
+        return timed
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Adds to a counter, for turns played outside of the engine methods"""
+        self.counters[counter] += amount
+
+    def report(self) -> dict:
+        """Machine readable report
+
+        Returns:
+            dict: 'counters' {name: count} and 'timings' [{'phase', 'player',
+            'calls', 'seconds', 'mean_us'}], slowest first
+        """
+        timings = [{'phase': phase, 'player': player, 'calls': calls, 'seconds': seconds,
+                    'mean_us': seconds / calls * 1e6}
+                   for (phase, player), (calls, seconds) in self.timings.items()]
+        timings.sort(key=lambda entry: entry['seconds'], reverse=True)
+        return {'counters': dict(self.counters), 'timings': timings}
+
+    def merge_report(self, report: dict) -> None:
+        """Adds the timings and counters of a report, for example from another
+        process
+
+        Args:
+            report (dict): result of report()
+        """
+        for name, count in report['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + count
+        for entry in report['timings']:
+            key = (entry['phase'], entry['player'])
+            calls, seconds = self.timings.get(key, (0, 0.0))
+            self.timings[key] = [calls + entry['calls'], seconds + entry['seconds']]
+
+    def to_json(self) -> str:
+        """The report as JSON"""
+        return json.dumps(self.report(), indent=2)
+
+    def summary(self) -> str:
+        """Text table of the timings, slowest first, and the counters"""
+        report = self.report()
+        total = sum(entry['seconds'] for entry in report['timings']) or 1.0
+        lines = [f"{'phase':<28}{'player':<24}{'calls':>10}{'total s':>10}{'mean us':>10}{'share':>8}"]
+        for entry in report['timings']:
+            lines.append(f"{entry['phase']:<28}{entry['player']:<24}{entry['calls']:>10}"
+                         f"{entry['seconds']:>10.3f}{entry['mean_us']:>10.1f}"
+                         f"{entry['seconds'] / total:>8.1%}")
+        lines.append(", ".join(f"{name}: {count}" for name, count in report['counters'].items()))
+        return "\n".join(lines)
@@ -0,0 +1,235 @@
+'''Compact binary game records and replay'''
+
+import struct
+from random import Random
+from typing import NamedTuple
+
+from src.card_deck import CardDeck
+from src.game.engine import GolfEngine, TABLE_SIZE, DRAW_DECK, DRAW_PLAYED, DISCARD
+
+# Record layout, little endian:
+#   u16 length of the rest of the record
+#   u8 format version
+#   u8 flags: bits 0-1 number of players, bit 2 rl training mode, bit 3 seats shuffled
+#   u64 seed of the game
+#   9 card ids per seat, the initial deal
+#   u8 card id of the first played card
+#   u16 per seat, mask of the cards turned visible at the beginning
+#   one byte per player turn: bit 7 drawn from the played deck, bits 0-3 the
+#   slot the card was placed to, or 15 for the played deck
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<HBBQ')
+_FLAG_RL_TRAINING_MODE = 0x04
+_FLAG_SHUFFLED = 0x08
+_ACTION_PLAYED = 0x80
+_ACTION_DISCARD = 0x0F
+# Records are buffered and written to the file in blocks of about this size
+_WRITE_BUFFER_SIZE = 1 << 16
+
+class GameRecord(NamedTuple):
+    """One recorded game"""
+    seed: int
+    num_players: int
+    rl_training_mode: bool
+    shuffled: bool
+    deal: bytes
+    first_card: int
+    initial_visible: tuple
+    actions: bytes
+
+    @property
+    def turns(self) -> int:
+        """Number of rounds played"""
+        return -(-len(self.actions) // self.num_players)
+
+    def to_bytes(self) -> bytes:
+        """Encodes the record, length prefix included"""
+        flags = self.num_players
+        if self.rl_training_mode:
+            flags |= _FLAG_RL_TRAINING_MODE
+        if self.shuffled:
+            flags |= _FLAG_SHUFFLED
+        body = (bytes(self.deal) + bytes([self.first_card])
+                + struct.pack(f'<{self.num_players}H', *self.initial_visible) + bytes(self.actions))
+        return _HEADER.pack(_HEADER.size - 2 + len(body), FORMAT_VERSION, flags, self.seed) + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameRecord':
+        """Decodes one record, length prefix included
+
+        Raises:
+            ValueError: unknown format version or a truncated record
+        """
+        length, version, flags, seed = _HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f'Unknown game record version {version}')
+        if len(data) < length + 2:
+            raise ValueError('Truncated game record')
+        num_players = flags & 0x03
+        offset = _HEADER.size
+        deal = bytes(data[offset:offset + num_players * TABLE_SIZE])
+        offset += num_players * TABLE_SIZE
+        first_card = data[offset]
+        offset += 1
+        initial_visible = struct.unpack_from(f'<{num_players}H', data, offset)
+        offset += 2 * num_players
+        return cls(seed, num_players, bool(flags & _FLAG_RL_TRAINING_MODE), bool(flags & _FLAG_SHUFFLED),
+                   deal, first_card, initial_visible, bytes(data[offset:length + 2]))
+
+class GameRecorder():
+    """Appends a compact record of every game it is given to a file. Pass it to
+    Game as recorder, Game.play_game then calls start, draw, play and finish.
+
+    A record is the seed and the initial deal of the game and one byte per player
+    turn, around 60 bytes for a two player game. The file is only appended to and
+    only whole records are written at a time, so several recorders, also in
+    different processes, can write to the same file.
+    """
+    def __init__(self, path: str) -> None:
+        """Opens the file for appending
+
+        Args:
+            path (str): file to append the records to
+        """
+        self.path = path
+        self._file = open(path, 'ab', buffering=0)
+        self._buffer = bytearray()
+        self._header = None
+        self._actions = bytearray()
+        self._draw = 0
+        self.games = 0
+
+    def start(self, game) -> None:
+        """Reads the seed and the deal of a game that is about to be played
+
+        Args:
+            game (Game): a dealt game with no turns played yet
+
+        Raises:
+            ValueError: the seed does not fit in the record
+        """
+        if not 0 <= game.seed < 2 ** 64:
+            raise ValueError('Seed of a recorded game must be in range 0 ... 2**64 - 1')
+        engine = game.engine
+        initial_visible = []
+        for seat in range(engine.num_players):
+            base = seat * TABLE_SIZE
+            initial_visible.append(sum(1 << slot for slot in range(TABLE_SIZE) if engine.visible[base + slot]))
+        self._header = (game.seed, engine.num_players, engine.rl_training_mode, game.shuffle_players,
+                        engine.table.tobytes(), engine.deck.top_played_id(), tuple(initial_visible))
+        self._actions = bytearray()
+
+    def draw(self, source: int) -> None:
+        """Records the draw of the player in turn
+
+        Args:
+            source (int): DRAW_DECK or DRAW_PLAYED
+        """
+        self._draw = _ACTION_PLAYED if source == DRAW_PLAYED else 0
+
+    def play(self, slot: int) -> None:
+        """Records where the player in turn put the hand card, completing the turn
+
+        Args:
+            slot (int): DISCARD or row * 3 + column
+        """
+        self._actions.append(self._draw | (_ACTION_DISCARD if slot == DISCARD else slot))
+
+    def finish(self) -> GameRecord:
+        """Appends the record of the game to the file
+
+        Returns:
+            GameRecord: the record
+        """
+        record = GameRecord(*self._header, bytes(self._actions))
+        self._buffer += record.to_bytes()
+        if len(self._buffer) >= _WRITE_BUFFER_SIZE:
+            self.flush()
+        self._header = None
+        self.games += 1
+        return record
+
+    def flush(self) -> None:
+        """Writes the buffered records to the file. An unbuffered write may write
+        only a part of the buffer, the rest is written until all of it is."""
+        if self._buffer:
+            data = memoryview(self._buffer)
+            while data:
+                data = data[self._file.write(data):]
+            data.release()
+            self._buffer = bytearray()
+
+    def close(self) -> None:
+        """Flushes and closes the file"""
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> 'GameRecorder':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def read_records(path: str):
+    """Reads the game records of a file one by one
+
+    Args:
+        path (str): file written by GameRecorder
+
+    Raises:
+        ValueError: the file ends in the middle of a record
+
+    Yields:
+        GameRecord: the records in the order they were written
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        if offset + 2 > len(data):
+            raise ValueError('Truncated game record')
+        length = view[offset] | view[offset + 1] << 8
+        yield GameRecord.from_bytes(view[offset:offset + 2 + length])
+        offset += 2 + length
+
+def replay(record: GameRecord, player_turns: int = None) -> GolfEngine:
+    """Rebuilds a recorded game: deals the same cards with the same seed and
+    applies the recorded actions, reshuffles included
+
+    Args:
+        record (GameRecord): the game
+        player_turns (int, optional): number of player turns to apply, for looking
+        at the table before a given decision. Defaults to None, all of them.
+
+    Raises:
+        ValueError: the seed does not give the recorded deal
+
+    Returns:
+        GolfEngine: the engine after the turns. The player in turn is
+        player_turns % num_players.
+    """
+    rng = Random(record.seed)
+    deck = CardDeck(rng)
+    if record.shuffled:
+        # Game shuffles the seats with the same generator before dealing
+        rng.shuffle([None] * record.num_players)
+    engine = GolfEngine(record.num_players, deck, record.rl_training_mode)
+    for seat in range(record.num_players):
+        engine.deal(seat)
+        for slot in range(TABLE_SIZE):
+            if record.initial_visible[seat] >> slot & 1:
+                engine.reveal(seat, slot)
+    engine.deal_first_card()
+    if engine.table.tobytes() != record.deal or deck.top_played_id() != record.first_card:
+        raise ValueError('Seed does not reproduce the recorded deal')
+
+    actions = record.actions if player_turns is None else record.actions[:player_turns]
+    for index, action in enumerate(actions):
+        seat = index % record.num_players
+        card_id = engine.draw(DRAW_PLAYED if action & _ACTION_PLAYED else DRAW_DECK)
+        slot = action & 0x0F
+        engine.place(seat, card_id, DISCARD if slot == _ACTION_DISCARD else slot)
+        engine.check_full_rows(seat)
+        engine.end_turn()
+    return engine
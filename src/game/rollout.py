@@ -0,0 +1,101 @@
+'''Fast default policy and playouts of single games on a GolfEngine, for search players'''
+
+from src.card import CARD_VALUES
+from src.game.engine import COLUMNS, TABLE_SIZE, DRAW_DECK, DRAW_PLAYED, DISCARD
+
+# Value the default policy assumes for a nonvisible card
+HIDDEN_GUESS = 6
+# Score drop a placement must give to be worth it, otherwise the card is discarded
+MIN_GAIN = 2
+# Score drop the played deck top card must give to be drawn instead of a new card
+DRAW_GAIN = 4
+# Turns after which a playout stops and the game is scored as it is
+MAX_PLAYOUT_TURNS = 300
+
+def search_engine(game_status):
+    """Engine of a GameStatus given by Game, for players that search copies of it
+
+    Raises:
+        ValueError: a status without the engine, like an old style dict, or rl
+        training mode, where the hidden cards can not be dealt again
+
+    Returns:
+        GolfEngine: the engine of the game, not to be modified
+    """
+    engine = game_status.engine
+    if engine is None:
+        raise ValueError('Search players need the GameStatus given by Game, not a dict')
+    if engine.rl_training_mode:
+        raise ValueError('Search players can not be used in rl training mode')
+    return engine
+
+def place_targets(engine, seat: int) -> list:
+    """Legal places for the hand card: DISCARD and the slots of the rows in play"""
+    return [DISCARD] + list(range(engine.row_count[seat] * COLUMNS))
+
+def best_place(engine, seat: int, value: int) -> tuple:
+    """Where a card of the value drops the score of the seat most, nonvisible
+    cards counted as HIDDEN_GUESS and a completed row counted as removed
+
+    Returns:
+        tuple: (slot, gain), (DISCARD, 0) if no slot gains MIN_GAIN points
+    """
+    table = engine.table
+    visible = engine.visible
+    base = seat * TABLE_SIZE
+    best_slot = DISCARD
+    best_gain = MIN_GAIN - 1
+    for start in range(base, base + engine.row_count[seat] * COLUMNS, COLUMNS):
+        matching = [visible[index] and CARD_VALUES[table[index]] == value
+                    for index in range(start, start + COLUMNS)]
+        for column in range(COLUMNS):
+            index = start + column
+            current = CARD_VALUES[table[index]] if visible[index] else HIDDEN_GUESS
+            if sum(matching) - matching[column] == COLUMNS - 1:
+                # The row is completed and removed with the placed card
+                gain = current + (COLUMNS - 1) * value
+            else:
+                gain = current - value
+            if gain > best_gain:
+                best_slot = index - base
+                best_gain = gain
+    if best_slot == DISCARD:
+        return DISCARD, 0
+    return best_slot, best_gain
+
+def greedy_draw(engine, seat: int) -> int:
+    """Draws the played deck top card if it drops the score by DRAW_GAIN points
+
+    Returns:
+        int: DRAW_DECK or DRAW_PLAYED
+    """
+    top_id = engine.deck.top_played_id()
+    if top_id >= 0 and best_place(engine, seat, CARD_VALUES[top_id])[1] >= DRAW_GAIN:
+        return DRAW_PLAYED
+    return DRAW_DECK
+
+def finish_turn(engine, seat: int, card_id: int, slot: int) -> bool:
+    """Places the hand card, removes completed rows and ends the turn
+
+    Returns:
+        bool: True if the game ended
+    """
+    engine.place(seat, card_id, slot)
+    engine.check_full_rows(seat)
+    return engine.end_turn()
+
+def playout(engine, max_turns: int = MAX_PLAYOUT_TURNS) -> None:
+    """Plays the game to the end with the default policy for every seat, starting
+    from the draw of the player in turn, or stops after max_turns turns"""
+    for _ in range(max_turns):
+        seat = engine.to_move
+        card_id = engine.draw(greedy_draw(engine, seat))
+        if finish_turn(engine, seat, card_id, best_place(engine, seat, CARD_VALUES[card_id])[0]):
+            return
+
+def margin(engine, seat: int) -> int:
+    """Score of the seat minus the best score of the other seats, negative when
+    the seat is winning"""
+    scores = list(engine.table_score)
+    own = scores.pop(seat)
+    return own - min(scores)
@@ -0,0 +1,210 @@
+'''Read-only view of the game for one player'''
+
+from array import array
+from collections.abc import Mapping
+
+from src.card import CARDS, CARD_VALUES, CARD_STRS, HIDDEN_CARD_STR
+# HIDDEN, the value of a nonvisible card in the value arrays of GameStatus, is
+# the public value of a nonvisible slot in the engine
+from src.game.engine import TABLE_SIZE, COLUMNS, HIDDEN
+
+_KEYS = ('player', 'other_players', 'played_top_card')
+
+class GameStatus(Mapping):
+    """What one player can see of the game: card values of the own table and the
+    other players' tables, the played deck top card and the hand card.
+
+    The tables are flat arrays of card values in row-major order over the rows in
+    play, with HIDDEN for nonvisible cards. Fields are read from the engine on
+    first access, so a status should be used before the game goes on.
+
+    For the players written against the old dict status, GameStatus is also a
+    read-only mapping with the keys 'player' and 'other_players' (2d lists of card
+    strings, 'XX' for nonvisible), 'played_top_card' and 'hand_card' (only if
+    there is a hand card).
+    """
+    __slots__ = ('_engine', '_seat', '_source', '_hand_card', '_own', '_others', '_strs')
+
+    def __init__(self, engine, seat: int, hand_card=None) -> None:
+        """Creates the status of a seat, nothing is read from the engine yet
+
+        Args:
+            engine (GolfEngine): engine of the game
+            seat (int): seat index of the player
+            hand_card (Card, optional): the card to be played, if any. Defaults to None.
+        """
+        self._engine = engine
+        self._seat = seat
+        self._source = None
+        self._hand_card = hand_card
+        self._own = None
+        self._others = None
+        self._strs = {}
+
+    @classmethod
+    def from_dict(cls, game_status: dict) -> 'GameStatus':
+        """Wraps an old style dict status. The card strings are parsed on first
+        access to the value fields.
+
+        Args:
+            game_status (dict): status with the keys described in Player
+
+        Returns:
+            GameStatus: the status
+        """
+        status = cls(None, 0, game_status.get('hand_card'))
+        status._source = game_status
+        return status
+
+    @property
+    def engine(self):
+        """Engine the status reads from, None for a status wrapping a dict"""
+        return self._engine
+
+    @property
+    def seat(self) -> int:
+        """Seat index of the player"""
+        return self._seat
+
+    @property
+    def hand_card(self):
+        """The hand card, None in the draw phase"""
+        return self._hand_card
+
+    @property
+    def hand_value(self):
+        """Value of the hand card, None in the draw phase"""
+        return None if self._hand_card is None else self._hand_card.value
+
+    @property
+    def played_top_card(self):
+        """Top card of the played deck, None if the played deck is empty"""
+        if self._source is not None:
+            return self._source.get('played_top_card')
+        top_id = self._engine.deck.top_played_id()
+        return CARDS[top_id] if top_id >= 0 else None
+
+    @property
+    def top_value(self):
+        """Value of the played deck top card, None if the played deck is empty"""
+        if self._source is not None:
+            top_card = self._source.get('played_top_card')
+            return None if top_card is None else top_card.value
+        top_id = self._engine.deck.top_played_id()
+        return CARD_VALUES[top_id] if top_id >= 0 else None
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows in play on the own table"""
+        if self._source is not None:
+            return len(self._source['player'])
+        return self._engine.row_count[self._seat]
+
+    @property
+    def own_values(self) -> array:
+        """Own table card values, HIDDEN for nonvisible cards"""
+        if self._own is None:
+            if self._source is not None:
+                self._own = _parse_table(self._source['player'])
+            else:
+                self._own = self._table_values(self._seat)
+        return self._own
+
+    @property
+    def other_values(self) -> list:
+        """Table card values of the other players in seat order, HIDDEN for
+        nonvisible cards"""
+        if self._others is None:
+            if self._source is not None:
+                self._others = [_parse_table(table) for table in self._source['other_players']]
+            else:
+                self._others = [self._table_values(seat) for seat in range(self._engine.num_players)
+                                if seat != self._seat]
+        return self._others
+
+    def _table_values(self, seat: int) -> array:
+        # The engine keeps the public values of the tables, this is a copy
+        engine = self._engine
+        base = seat * TABLE_SIZE
+        return engine.public_values[base:base + engine.row_count[seat] * COLUMNS]
+
+    def _table_strs(self, seat: int) -> list:
+        if seat not in self._strs:
+            self._strs[seat] = table_strs(self._engine, seat)
+        return self._strs[seat]
+
+    def __getitem__(self, key: str):
+        if self._source is not None:
+            return self._source[key]
+        if key == 'player':
+            return self._table_strs(self._seat)
+        if key == 'other_players':
+            return [self._table_strs(seat) for seat in range(self._engine.num_players)
+                    if seat != self._seat]
+        if key == 'played_top_card':
+            return self.played_top_card
+        if key == 'hand_card' and self._hand_card is not None:
+            return self._hand_card
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self._source is not None:
+            return iter(self._source)
+        if self._hand_card is not None:
+            return iter(_KEYS + ('hand_card',))
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        if self._source is not None:
+            return len(self._source)
+        return len(_KEYS) + (self._hand_card is not None)
+
+def table_strs(engine, seat: int) -> list:
+    """Table of a seat as it can be seen by everyone: visible cards as strings
+    like '♤10', nonvisible cards as 'XX'
+
+    Args:
+        engine (GolfEngine): engine of the game
+        seat (int): seat index of the player
+
+    Returns:
+        list: 2d list of card strings
+    """
+    table = engine.table
+    visible = engine.visible
+    base = seat * TABLE_SIZE
+    return [[CARD_STRS[table[index]] if visible[index] else HIDDEN_CARD_STR
+             for index in range(row_start, row_start + COLUMNS)]
+            for row_start in range(base, base + engine.row_count[seat] * COLUMNS, COLUMNS)]
+
+def as_game_status(game_status) -> GameStatus:
+    """Returns game_status as a GameStatus, wrapping old style dicts
+
+    Args:
+        game_status (GameStatus | dict): status given to a player
+
+    Returns:
+        GameStatus: the status
+    """
+    # The exact type first, isinstance of a Mapping subclass is a slow ABC check
+    if type(game_status) is GameStatus or isinstance(game_status, GameStatus):
+        return game_status
+    return GameStatus.from_dict(game_status)
+
+def _parse_table(table_cards: list) -> array:
+    """Card values of a 2d list of card strings or Cards, HIDDEN for 'XX'"""
+    values = array('b')
+    for row in table_cards:
+        for card in row:
+            values.append(_parse_card(card))
+    return values
+
+def _parse_card(card) -> int:
+    if not isinstance(card, str):
+        return card.value
+    if card.startswith('X'):
+        return HIDDEN
+    try:
+        return int(card[1:])
+    except ValueError:
+        return HIDDEN
@@ -1,10 +1,18 @@
 from .human_player import HumanPlayer
 from .computer_player import ComputerPlayer
 from .advanced_computer_player import AdvancedComputerPlayer
-from .rl_player import RLPlayer
 from .stupid_computer_player import StupidComputerPlayer
 from .player import Player
+from .registry import player_types, register_player, get_player_class, create_player
 
 
 __all__ = ["HumanPlayer", "ComputerPlayer", "Player", "AdvancedComputerPlayer", "RLPlayer",
-           "StupidComputerPlayer"]
+           "StupidComputerPlayer", "player_types", "register_player", "get_player_class",
+           "create_player"]
+
+def __getattr__(name):
+    # RLPlayer needs stable_baselines3 and torch, which take seconds to import
+    if name == "RLPlayer":
+        from .rl_player import RLPlayer
+        return RLPlayer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
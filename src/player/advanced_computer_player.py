@@ -1,7 +1,9 @@
 '''Advanced computer player class'''
 
 from random import choice, randint, random
-from collections import Counter
+from src.game.status import as_game_status, HIDDEN
+from src.game.belief import BeliefTracker, DECK_MEAN
+from src.game.engine import COLUMNS
 from .player import Player
 
 class AdvancedComputerPlayer(Player):
@@ -11,6 +13,8 @@ class AdvancedComputerPlayer(Player):
     """
 
     def __init__(self):
+        # Counts of the unseen cards, kept up to date by Game
+        self.belief = BeliefTracker()
         super().__init__()
 
     def get_player_name(self) -> str:
@@ -31,18 +35,20 @@ class AdvancedComputerPlayer(Player):
           - Otherwise, we usually pick from the deck (d).
           - We also add some random factor to keep it from being fully predictable.
         """
-        played_top_value = game_status['played_top_card'].value
-
-        # See if there are own pairs already and if so, draw from played
-        if self._pair_in_own_tablecards(game_status['player']):
-            own_pair_values = self._pairs_in_own_tablecards(game_status['player'])
-            flat_pair_values = [value for sublist in own_pair_values for value in sublist]  # Flatten the list
-            if str(played_top_value) in flat_pair_values:
-                # print("HOPING TO SEE A TRIPLE!")
-                return "p"
+        game_status = as_game_status(game_status)
+        played_top_value = game_status.top_value
+        own_values = game_status.own_values
+
+        # See if there are own pairs already and if so, draw from played.
+        # A pair of the top card value needs two of them on the table.
+        if own_values.count(played_top_value) >= 2:
+            for pair_values in self._pairs_in_own_tablecards(own_values):
+                if played_top_value in pair_values:
+                    # print("HOPING TO SEE A TRIPLE!")
+                    return "p"
 
         # Get worst card value from the table (i.e. the largest or unknown).
-        worst_card_value = self._get_worst_table_card_value(game_status['player'])
+        worst_card_value = self._get_worst_table_card_value(own_values)
 
         # If the played top card is significantly better than the worst card on the table,
         # we are more likely to pick it.
@@ -79,57 +85,54 @@ class AdvancedComputerPlayer(Player):
             we replace it with some probability.
           - If we don't find any great replacement, we discard to the pile.
         """
-        hand_card = game_status['hand_card']
-        hand_value = hand_card.value
-
-        # If there are pairs in own cards, place the card there
-        if self._pair_in_own_tablecards:
-            for row_index, row in enumerate(game_status['player']):
-                # Extract card values (ignore suits)
-                card_values = list(map(lambda x: self._parse_value(x), row))
-                
-                # Check if there are duplicates of the hand_value
-                if Counter(card_values)[hand_value] > 1:
-                    # Find the index where the card value is NOT equal to hand_value
-                    non_matching_index = [col for col, card in enumerate(card_values) if card != hand_value]
-                    
-                    # If exactly one card does not match, process it
-                    if len(non_matching_index) == 1:
-                        non_matching_index = non_matching_index[0]  # Extract the single index
-                        # print("PLACING A SMART ROW!")
-                        # print(row_index, non_matching_index)
-                        return (row_index + 1, non_matching_index + 1)
-                    
+        game_status = as_game_status(game_status)
+        hand_value = game_status.hand_value
+        own_values = game_status.own_values
+        # Hidden cards are valued at the mean of the cards not seen yet
+        hidden_mean = self.belief.hidden_mean()
+        # A hidden card is replaced by any hand card below this. It is at least
+        # the mean of the full deck: late in a game the few unseen cards can all
+        # be low, and if no hand card were ever below their mean, no hidden card
+        # would be turned and the game would never end.
+        hidden_bound = max(hidden_mean, DECK_MEAN)
+
+        # If there are pairs in own cards, place the card there. Hidden cards
+        # match the hand only if their mean happens to equal it.
+        if hidden_mean == hand_value or own_values.count(hand_value) >= 2:
+            for row_start in range(0, len(own_values), COLUMNS):
+                # Card values of the row, hidden cards as their expected value
+                card_values = [hidden_mean if value == HIDDEN else value
+                               for value in own_values[row_start:row_start + COLUMNS]]
+
+                # If exactly two cards have the hand value, replace the third one
+                if card_values.count(hand_value) == 2:
+                    for column, card_value in enumerate(card_values):
+                        if card_value != hand_value:
+                            # print("PLACING A SMART ROW!")
+                            return (row_start // COLUMNS + 1, column + 1)
+
         # We'll loop over the table cards in row-major order
         # to find a suitable spot to play. 
         # The first "good enough" spot we find, we play.
-        for r, row in enumerate(game_status['player']):
-            for c, card_str in enumerate(row):
-                table_value = self._parse_value(card_str)
-
-                # If the card is hidden (unknown), we approximate 
-                # it with some average or mid-range value.
-                # parse_value above handles that, but let's keep it in a var
-                # to do some logic around it.
-                is_hidden = card_str.startswith("X")
-
-                # A simple logic:
-                #   - If hidden, we consider that it's "probably" around 6.
-                #   - If our hand_value is significantly better (like 3 or less),
-                #     we might want to replace it. 
-                #   - If the card is known and the hand card is significantly better,
-                #     we might also replace it.
-                # We'll add some random chance to not be too predictable.
-                if is_hidden:
-                    # random factor & condition that our hand is decently small
-                    if hand_value < 6 and random() < 0.9:
-                        return (r + 1, c + 1)
-                else:
-                    # The card is known
-                    # If our hand card is better (lower) by at least 2 or 3 points,
-                    # we are fairly likely to replace it. (Add some randomness.)
-                    if (table_value - hand_value) >= 4 and random() < 0.95:
-                        return (r + 1, c + 1)
+        for slot, card_value in enumerate(own_values):
+            # A simple logic:
+            #   - If hidden, we consider that it's "probably" around the mean of
+            #     the cards we have not seen.
+            #   - If our hand_value is significantly better (like 3 or less),
+            #     we might want to replace it. 
+            #   - If the card is known and the hand card is significantly better,
+            #     we might also replace it.
+            # We'll add some random chance to not be too predictable.
+            if card_value == HIDDEN:
+                # random factor & condition that our hand is decently small
+                if hand_value < hidden_bound and random() < 0.9:
+                    return (slot // COLUMNS + 1, slot % COLUMNS + 1)
+            else:
+                # The card is known
+                # If our hand card is better (lower) by at least 2 or 3 points,
+                # we are fairly likely to replace it. (Add some randomness.)
+                if (card_value - hand_value) >= 4 and random() < 0.95:
+                    return (slot // COLUMNS + 1, slot % COLUMNS + 1)
 
         # If we haven't found any good replacements, discard the card to the pile
         return ("p", None)
@@ -149,65 +152,52 @@ class AdvancedComputerPlayer(Player):
         # print(f"{self.name} turns the initial cards visible.")
         return result
 
-    def _get_worst_table_card_value(self, table_cards) -> int:
+    def _get_worst_table_card_value(self, table_values) -> float:
         """
         Helper to find the worst card value (highest) on our table.
-        For unknown (hidden) cards, assume a mid-range (e.g., 6).
+        For unknown (hidden) cards, assume the expected value of the unseen cards.
         """
-        worst_value = -1
-        for row in table_cards:
-            for card_str in row:
-                val = self._parse_value(card_str)
-                if val > worst_value:
-                    worst_value = val
+        if not table_values:
+            return -1
+        worst_value = max(table_values)
+        if HIDDEN in table_values:
+            worst_value = max(worst_value, self.belief.hidden_mean())
         return worst_value
 
-    def _parse_value(self, card_str) -> int:
+    def _parse_value(self, card_value) -> float:
         """
-        Safely parse card values.
-        If the card is unknown (like 'XX'), we treat it as ~6.
-        You could adjust that to a random guess in [4..7], or something else.
+        Value of a table card.
+        If the card is unknown (HIDDEN), we take the expected value of the
+        cards not seen yet, 6 at the start of the game.
         """
-        # If it's hidden or we can't parse it, approximate
-        if card_str.startswith("XX"):
-            return 6  # assume average card
-        try:
-            return int(card_str[1:])
-        except ValueError:
-            # If anything goes wrong, return ~6
-            return 6
-        
-    def _pair_in_own_tablecards(self, table_cards : list) -> bool:
-        # discard suit:
-        iterable = []
-        for row in table_cards:
-            new_row = []
-            for column in row:
-                new_row.append(column[1:])
-            iterable.append(new_row)
-
-        for row in iterable:
-            strs = [item for item in row if item != "X"]
-            counts = Counter(strs)
-            if [item for item, count in counts.items() if count > 1] != []:
+        if card_value == HIDDEN:
+            return self.belief.hidden_mean()
+        return card_value
+
+    def _pair_in_own_tablecards(self, table_values) -> bool:
+        for pairs in self._pairs_in_own_tablecards(table_values):
+            if pairs != []:
                 return True
         return False
-    
+
     def _pairs_in_others_tablecards(self, others : list) -> list:
         res = []
-        for player in others:
-            for row in player:
-                strs = [item[1:] for item in row if item != "XX"]
-                counts = Counter(strs)
-                res.append([item for item, count in counts.items() if count > 1])
+        for table_values in others:
+            res.extend(self._pairs_in_own_tablecards(table_values))
         return res
 
-    def _pairs_in_own_tablecards(self, table_cards : list) -> list:
+    def _pairs_in_own_tablecards(self, table_values) -> list:
+        """Values that are visible at least twice in a row, for each row"""
         res = []
-        for row in table_cards:
-            strs = [item[1:] for item in row if item != "XX"]
-            counts = Counter(strs)
-            res.append([item for item, count in counts.items() if count > 1])
+        for row_start in range(0, len(table_values), COLUMNS):
+            # Three cards have at most one value twice
+            first, second, third = table_values[row_start:row_start + COLUMNS]
+            if first != HIDDEN and (first == second or first == third):
+                res.append([first])
+            elif second != HIDDEN and second == third:
+                res.append([second])
+            else:
+                res.append([])
         return res
     
     def inform_game_result(self, win: bool, relative_score: int) -> None:
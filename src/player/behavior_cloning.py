@@ -0,0 +1,99 @@
+'''Behavior cloning pretraining of DQN agents on heuristic datasets'''
+
+import argparse
+import time
+
+import numpy as np
+import torch as th
+from torch.nn import functional as F
+
+from src.player.heuristic_dataset import ShardDataset
+from src.player.observation import PHASE_OBSERVATION_SIZE
+
+def pretrain(model, dataset: ShardDataset, epochs: int = 1, batch_size: int = 1024,
+             learning_rate: float = 1e-3, value_coef: float = 0.1, seed: int = None) -> list:
+    """Warm-starts the Q-network of a DQN by imitating the teacher of a dataset.
+    The Q-values are trained as logits of the teacher action with cross entropy,
+    and the Q-value of the teacher action towards the return from the step with
+    a Huber loss weighted by value_coef, so the values start on the scale of the
+    rewards. The target network gets the trained weights.
+
+    Args:
+        model (stable_baselines3.DQN): model of GolfTrainEnv, with or without
+        action masking
+        dataset (ShardDataset): dataset of heuristic_dataset.generate_dataset
+        epochs (int, optional): passes over the dataset. Defaults to 1.
+        batch_size (int, optional): rows per gradient step. Defaults to 1024.
+        learning_rate (float, optional): Adam learning rate. Defaults to 1e-3.
+        value_coef (float, optional): weight of the return loss. Defaults to 0.1.
+        seed (int, optional): seed of the batch order. Defaults to None.
+
+    Returns:
+        list: per epoch {'loss', 'accuracy'}, the mean loss and the share of the
+        rows where the greedy action is the teacher action
+    """
+    q_net = model.q_net
+    phase_observation = model.observation_space.shape[0] == PHASE_OBSERVATION_SIZE
+    optimizer = th.optim.Adam(q_net.parameters(), lr=learning_rate)
+    rng = np.random.default_rng(seed)
+    history = []
+    model.policy.set_training_mode(True)
+    for _ in range(epochs):
+        loss_sum = 0.0
+        correct = 0
+        rows = 0
+        for batch in dataset.batches(batch_size, rng=rng):
+            observations = batch['obs']
+            if phase_observation:
+                observations = np.concatenate([observations, batch['phase'][:, None] - 1], axis=1)
+            observations = th.as_tensor(observations, device=model.device)
+            actions = th.as_tensor(batch['action'], device=model.device).long()
+            returns = th.as_tensor(batch['return'], device=model.device)
+
+            q_values = q_net(observations)
+            taken = q_values.gather(1, actions[:, None]).squeeze(1)
+            loss = F.cross_entropy(q_values, actions) + value_coef * F.smooth_l1_loss(taken, returns)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+
+            loss_sum += loss.item() * len(actions)
+            correct += (q_values.argmax(dim=1) == actions).sum().item()
+            rows += len(actions)
+        history.append({'loss': loss_sum / max(1, rows), 'accuracy': correct / max(1, rows)})
+    model.policy.set_training_mode(False)
+    model.q_net_target.load_state_dict(q_net.state_dict())
+    return history
+
+def main(argv: list = None) -> None:
+    """Command line: python -m src.player.behavior_cloning DATASET OUT.zip"""
+    parser = argparse.ArgumentParser(description="Pretrain a DQN agent on a heuristic dataset")
+    parser.add_argument("dataset", help="directory of heuristic_dataset")
+    parser.add_argument("out", help="file to save the model to")
+    parser.add_argument("--model", default=None, help="DQN model to start from, default a new one")
+    parser.add_argument("--action-masking", action="store_true",
+                        help="new model with the phase in the observation")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--learning-rate", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from stable_baselines3 import DQN
+    from src.player.golf_train_env import GolfTrainEnv
+    if args.model is not None:
+        model = DQN.load(args.model, device="cpu")
+    else:
+        model = DQN("MlpPolicy", GolfTrainEnv(action_masking=args.action_masking), device="cpu",
+                    seed=args.seed)
+    dataset = ShardDataset(args.dataset)
+    start = time.perf_counter()
+    for epoch, result in enumerate(pretrain(model, dataset, args.epochs, args.batch_size,
+                                            args.learning_rate, seed=args.seed)):
+        print(f"Epoch {epoch + 1}: loss {result['loss']:.4f}, teacher action accuracy "
+              f"{result['accuracy']:.1%}")
+    print(f"Pretrained on {len(dataset)} steps x {args.epochs} in {time.perf_counter() - start:.1f} s")
+    model.save(args.out)
+
+if __name__ == '__main__':
+    main()
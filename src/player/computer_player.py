@@ -5,6 +5,9 @@
 # not to be seen during the game.
 
 from random import choice, randint, random
+from src.game.status import as_game_status, HIDDEN
+from src.game.belief import BeliefTracker, DECK_MEAN
+from src.game.engine import COLUMNS
 from .player import Player
 
 class ComputerPlayer(Player):
@@ -14,6 +17,8 @@ class ComputerPlayer(Player):
     """
 
     def __init__(self):
+        # Counts of the unseen cards, kept up to date by Game
+        self.belief = BeliefTracker()
         super().__init__()
 
     def get_player_name(self) -> str:
@@ -34,10 +39,11 @@ class ComputerPlayer(Player):
           - Otherwise, we usually pick from the deck (d).
           - We also add some random factor to keep it from being fully predictable.
         """
-        played_top_value = game_status['played_top_card'].value
+        game_status = as_game_status(game_status)
+        played_top_value = game_status.top_value
 
         # Get worst card value from the table (i.e. the largest or unknown).
-        worst_card_value = self._get_worst_table_card_value(game_status['player'])
+        worst_card_value = self._get_worst_table_card_value(game_status.own_values)
 
         # If the played top card is significantly better than the worst card on the table,
         # we are more likely to pick it.
@@ -74,47 +80,51 @@ class ComputerPlayer(Player):
             we replace it with some probability.
           - If we don't find any great replacement, we discard to the pile.
         """
-        hand_card = game_status['hand_card']
-        hand_value = hand_card.value
+        game_status = as_game_status(game_status)
+        hand_value = game_status.hand_value
 
         # We'll loop over the table cards in row-major order
         # to find a suitable spot to play. 
         # The first "good enough" spot we find, we play.
-        for r, row in enumerate(game_status['player']):
-            for c, card_str in enumerate(row):
-                table_value = self._parse_value(card_str)
-
-                # If the card is hidden (unknown), we approximate 
-                # it with some average or mid-range value.
-                # parse_value above handles that, but let's keep it in a var
-                # to do some logic around it.
-                is_hidden = card_str.startswith("X")
-
-                # A simple logic:
-                #   - If hidden, we consider that it's "probably" around 6.
-                #   - If our hand_value is significantly better (like 3 or less),
-                #     we might want to replace it. 
-                #   - If the card is known and the hand card is significantly better,
-                #     we might also replace it.
-                # We'll add some random chance to not be too predictable.
-                if is_hidden:
-                    # random factor & condition that our hand is decently small
-                    if hand_value < 7 and random() < 0.9:
-                        # print(
-                        #     f"{self.name} plays the card {hand_card} "
-                        #     f"on a hidden card at row={r+1}, col={c+1}."
-                        # )
-                        return (r + 1, c + 1)
-                else:
-                    # The card is known
-                    # If our hand card is better (lower) by at least 2 or 3 points,
-                    # we are fairly likely to replace it. (Add some randomness.)
-                    if (table_value - hand_value) >= 2 and random() < 0.9:
-                        # print(
-                        #     f"{self.name} replaces a known card (val={table_value}) with "
-                        #     f"{hand_card} at row={r+1}, col={c+1}."
-                        # )
-                        return (r + 1, c + 1)
+        for slot, card_value in enumerate(game_status.own_values):
+            r, c = divmod(slot, COLUMNS)
+            table_value = self._parse_value(card_value)
+
+            # If the card is hidden (unknown), we approximate 
+            # it with some average or mid-range value.
+            # parse_value above handles that, but let's keep it in a var
+            # to do some logic around it.
+            is_hidden = card_value == HIDDEN
+
+            # A simple logic:
+            #   - If hidden, we consider that it's "probably" around the mean of
+            #     the cards we have not seen.
+            #   - If our hand_value is significantly better (like 3 or less),
+            #     we might want to replace it. 
+            #   - If the card is known and the hand card is significantly better,
+            #     we might also replace it.
+            # We'll add some random chance to not be too predictable.
+            if is_hidden:
+                # random factor & condition that our hand is decently small.
+                # The bound is at least that of the full deck mean, so that the
+                # hidden cards are turned even when the few unseen cards left
+                # are all low, otherwise the game might never end.
+                if hand_value < max(table_value, DECK_MEAN) + 1 and random() < 0.9:
+                    # print(
+                    #     f"{self.name} plays the card {hand_card} "
+                    #     f"on a hidden card at row={r+1}, col={c+1}."
+                    # )
+                    return (r + 1, c + 1)
+            else:
+                # The card is known
+                # If our hand card is better (lower) by at least 2 or 3 points,
+                # we are fairly likely to replace it. (Add some randomness.)
+                if (table_value - hand_value) >= 2 and random() < 0.9:
+                    # print(
+                    #     f"{self.name} replaces a known card (val={table_value}) with "
+                    #     f"{hand_card} at row={r+1}, col={c+1}."
+                    # )
+                    return (r + 1, c + 1)
 
         # If we haven't found any good replacements, discard the card to the pile
         # print(
@@ -137,33 +147,27 @@ class ComputerPlayer(Player):
         # print(f"{self.name} turns the initial cards visible.")
         return result
 
-    def _get_worst_table_card_value(self, table_cards) -> int:
+    def _get_worst_table_card_value(self, table_values) -> float:
         """
         Helper to find the worst card value (highest) on our table.
-        For unknown (hidden) cards, assume a mid-range (e.g., 6).
+        For unknown (hidden) cards, assume the expected value of the unseen cards.
         """
         worst_value = -1
-        for row in table_cards:
-            for card_str in row:
-                val = self._parse_value(card_str)
-                if val > worst_value:
-                    worst_value = val
+        for card_value in table_values:
+            val = self._parse_value(card_value)
+            if val > worst_value:
+                worst_value = val
         return worst_value
 
-    def _parse_value(self, card_str) -> int:
+    def _parse_value(self, card_value) -> float:
         """
-        Safely parse card values.
-        If the card is unknown (like 'XX'), we treat it as ~6.
-        You could adjust that to a random guess in [4..7], or something else.
+        Value of a table card.
+        If the card is unknown (HIDDEN), we take the expected value of the
+        cards not seen yet, 6 at the start of the game.
         """
-        # If it's hidden or we can't parse it, approximate
-        if card_str.startswith("XX"):
-            return 6  # assume average card
-        try:
-            return int(card_str[1:])
-        except ValueError:
-            # If anything goes wrong, return ~6
-            return 6
+        if card_value == HIDDEN:
+            return self.belief.hidden_mean()
+        return card_value
         
     def inform_game_result(self, win: bool, relative_score: int) -> None:
         """
@@ -0,0 +1,151 @@
+'''Player playing the last round exactly, and the statistics of the points other players lose in it'''
+
+import argparse
+import random
+import time
+
+from src.game import Game
+from src.game.endgame import EndgameSolver
+from src.game.engine import COLUMNS, DISCARD
+from src.game.status import as_game_status
+from .player import Player
+from .registry import create_player, player_types
+
+# Loss below which a decision counts as optimal, for rounding of the expectations
+_TOLERANCE = 1e-9
+
+class EndgamePlayer(Player):
+    """Wraps another player and plays the last round of the game, once some
+    player has all cards visible, with EndgameSolver. Before that, and in the
+    rare last rounds the solver can not handle, the wrapped player decides.
+
+    With audit=True the wrapped player decides also in the last round, and
+    the expected points its decisions lose against exact play are counted.
+    """
+    def __init__(self, player: Player = None, audit: bool = False, solver: EndgameSolver = None) -> None:
+        """
+        Args:
+            player (Player, optional): player for the rest of the game. Defaults to
+            a new AdvancedComputerPlayer.
+            audit (bool, optional): only measure the last round decisions of player.
+            Defaults to False.
+            solver (EndgameSolver, optional): solver, can be shared by players to
+            share its transposition table. Defaults to a new one.
+        """
+        self.player = player if player is not None else create_player("advanced")
+        self.audit = audit
+        self.solver = solver if solver is not None else EndgameSolver()
+        # Game updates the card counting of the wrapped player through this
+        self.belief = getattr(self.player, 'belief', None)
+        super().__init__()
+        # Last round decisions solved, the ones worse than exact play and the sum
+        # of the expected margin lost by them. Only counted with audit.
+        self.final_round_decisions = 0
+        self.suboptimal_decisions = 0
+        self.final_round_loss = 0.0
+
+    def get_player_name(self) -> str:
+        return f"{self.player.name} + endgame"
+
+    def get_draw_action(self, game_status) -> str:
+        game_status = as_game_status(game_status)
+        engine = game_status.engine
+        if engine is None or not self.solver.solvable(engine):
+            return self.player.get_draw_action(game_status)
+        values = [value for value in self.solver.draw_values(engine) if value is not None]
+        if not self.audit:
+            return "dp"[values.index(min(values))]
+        action = self.player.get_draw_action(game_status)
+        self._record(values, 0 if action == "d" else 1)
+        return action
+
+    def get_play_action(self, game_status) -> tuple:
+        game_status = as_game_status(game_status)
+        engine = game_status.engine
+        hand_id = game_status.hand_card.id
+        if engine is None or not self.solver.solvable(engine, hand_id):
+            return self.player.get_play_action(game_status)
+        values = self.solver.place_values(engine, hand_id)
+        if not self.audit:
+            slot = values.index(min(values)) - 1
+            if slot == DISCARD:
+                return ("p", None)
+            row, column = divmod(slot, COLUMNS)
+            return (row + 1, column + 1)
+        action = self.player.get_play_action(game_status)
+        self._record(values, 0 if action[0] == "p" else 1 + (action[0] - 1) * COLUMNS + action[1] - 1)
+        return action
+
+    def _record(self, values: list, chosen: int) -> None:
+        loss = values[chosen] - min(values)
+        self.final_round_decisions += 1
+        if loss > _TOLERANCE:
+            self.suboptimal_decisions += 1
+            self.final_round_loss += loss
+
+    def turn_initial_cards(self, initial_table_cards):
+        return self.player.turn_initial_cards(initial_table_cards)
+
+    def inform_game_result(self, win: bool, relative_score: int) -> None:
+        return self.player.inform_game_result(win, relative_score)
+
+def final_round_loss(seats: list, num_games: int, seed: int = None, max_entries: int = 1 << 20) -> dict:
+    """Plays games between player types and measures how many points their last
+    round decisions lose against exact play. The loss of a decision is the
+    expected margin of the chosen action minus that of the best one, both with
+    exact play after it, so the losses of a game add up to its expected loss.
+
+    Args:
+        seats (list): player type names, one per seat, 2-3 of them
+        num_games (int): number of games
+        seed (int, optional): seed for reproducible games. Defaults to None.
+        max_entries (int, optional): size of the transposition table of the solver
+        shared by all players. Defaults to 1048576.
+
+    Returns:
+        dict: for each player type 'games' (games times seats of the type),
+        'final_rounds' (games with a last round decision), 'decisions',
+        'suboptimal', 'loss', 'loss_per_game' and 'loss_per_final_round'
+    """
+    solver = EndgameSolver(max_entries)
+    stats = {seat: {'games': 0, 'final_rounds': 0, 'decisions': 0, 'suboptimal': 0, 'loss': 0.0}
+             for seat in seats}
+    for game_index in range(num_games):
+        game_seed = None if seed is None else seed * 1_000_003 + game_index
+        if game_seed is not None:
+            random.seed(game_seed)
+        players = [EndgamePlayer(create_player(seat), audit=True, solver=solver) for seat in seats]
+        Game(players=players, silent_mode=True, seed=game_seed).play_game()
+        for seat, player in zip(seats, players):
+            entry = stats[seat]
+            entry['games'] += 1
+            entry['final_rounds'] += player.final_round_decisions > 0
+            entry['decisions'] += player.final_round_decisions
+            entry['suboptimal'] += player.suboptimal_decisions
+            entry['loss'] += player.final_round_loss
+    for entry in stats.values():
+        entry['loss_per_game'] = entry['loss'] / entry['games']
+        entry['loss_per_final_round'] = entry['loss'] / entry['final_rounds'] if entry['final_rounds'] else 0.0
+    return stats
+
+def main(argv: list = None) -> None:
+    """Command line: python -m src.player.endgame_player --games N --seats advanced computer"""
+    parser = argparse.ArgumentParser(description="Measure the points players lose in the last round of Golf")
+    parser.add_argument("--games", type=int, default=1000, help="number of games")
+    parser.add_argument("--seats", nargs="+", default=["advanced", "advanced"],
+                        choices=[name for name in player_types() if name != "human"],
+                        help="player types, 2-3 seats")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible games")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = final_round_loss(args.seats, args.games, args.seed)
+    print(f"{args.games} games in {time.perf_counter() - start:.1f} s")
+    for seat, entry in stats.items():
+        share = entry['suboptimal'] / entry['decisions'] if entry['decisions'] else 0.0
+        print(f"{seat}: {entry['loss_per_game']:.3f} points lost per game, "
+              f"{entry['loss_per_final_round']:.3f} per last round played, "
+              f"{share:.0%} of {entry['decisions']} decisions suboptimal")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,35 @@
 '''Gymnasium training environment for the reinforcement learning agent.'''
 
-import numpy as np
 import gymnasium as gym
+import numpy as np
 from gymnasium import spaces
 
-from src.game import Game
-from src.card_deck import Card
-from src.player import AdvancedComputerPlayer, ComputerPlayer, RLPlayer
+from src.game import Game, GameProfiler
+from src.game.engine import DRAW_DECK, DRAW_PLAYED, DISCARD
+from src.card import CARDS
+from src.player.observation import encode_observation, encode_status
+
+# Actions of the draw phase
+_DRAW_DECK_ACTION = 0
+_DRAW_PLAYED_ACTION = 1
 
 class GolfTrainEnv(gym.Env):
-    """Gymnasium environment to train RL agent to play 'Golf' card game. """    
-    def __init__(self):
+    """Gymnasium environment to train RL agent to play 'Golf' card game.
+
+    action_masks() gives the valid actions of the current phase for maskable
+    policies. With action_masking the observation ends with the phase and the
+    invalid actions raise a ValueError instead of being read as a draw from the
+    played deck.
+    """    
+    def __init__(self, profiler: GameProfiler = None, action_masking: bool = False):
+        """
+        Args:
+            profiler (GameProfiler, optional): times the phases of every game of
+            the environment. Defaults to None, no instrumentation.
+            action_masking (bool, optional): add the phase to the observation and
+            reject actions outside action_masks(). Defaults to False, the 20 value
+            observation of the existing models.
+        """
         super().__init__()
         
         # The golf card game play turn has two distinct steps, or phases in each
@@ -27,7 +46,9 @@ class GolfTrainEnv(gym.Env):
         # The observation space consists of all information available to the player;
         # possible hand card, played deck top card, visible table cards of the 
         # player and others. Thus, with two players, 20 variables from 1 to 22
-        self.observation_space = spaces.MultiDiscrete([22]*20)
+        # With action masking the phase follows, 0 for draw and 1 for place
+        self.action_masking = action_masking
+        self.observation_space = spaces.MultiDiscrete([22]*20 + ([2] if action_masking else []))
 
         self.game = None
         self.phase = 1
@@ -35,6 +56,7 @@ class GolfTrainEnv(gym.Env):
         self.num_players = 2  # Train with two players, seat [0] will be the trainee RL
 
         self._last_drawn_card = None
+        self.profiler = profiler
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -48,7 +70,8 @@ class GolfTrainEnv(gym.Env):
                          rl_player=False,   # RL player opponent seems to screw environment
                          stupid_player=True,
                          rl_training_mode=True, # never discard rows
-                         silent_mode=True)
+                         silent_mode=True,
+                         profiler=self.profiler)
         
         # for i, p in enumerate(self.game.players):
         #     print(f"Seat {i}: {p.name}, type = {type(p)}")
@@ -78,8 +101,13 @@ class GolfTrainEnv(gym.Env):
             # If the episode is over, we can either raise or return the same
             return self._get_observation(), 0.0, True, {}, {}
 
+        if self.action_masking and not self.action_masks()[action]:
+            raise ValueError(f'Action {action} is not valid in phase {self.phase}')
+
+        engine = self.game.engine
+
         # Intermediate reward: the change of own score
-        last_turn_score = self.game.player_score(self.game.players[0])
+        last_turn_score = engine.score(0)
 
         # We'll track reward separately for final
         reward = 0.0
@@ -95,11 +123,9 @@ class GolfTrainEnv(gym.Env):
                 draw_choice = "p"
 
             if draw_choice == "d":
-                self._last_drawn_card = self.game.deck.draw_from_deck()
-                self._last_drawn_card.visible = True
+                self._last_drawn_card = CARDS[engine.draw(DRAW_DECK)]
             else:
-                self._last_drawn_card = self.game.deck.draw_from_played()
-                self._last_drawn_card.visible = True
+                self._last_drawn_card = CARDS[engine.draw(DRAW_PLAYED)]
 
             self.phase = 2
             obs = self._get_observation()
@@ -109,22 +135,21 @@ class GolfTrainEnv(gym.Env):
         elif self.phase == 2:
             if action == 9:
                 # discard to played deck
-                self.game.deck.add_to_played(self._last_drawn_card)
+                engine.place(0, self._last_drawn_card.id, DISCARD)
             else:
-                row = action // 3 + 1
-                col = action % 3 + 1
                 # place card on own table and discard what was there
-                replaced_card = self.game.players[0].table_cards[row-1][col-1]
-                self.game.deck.add_to_played(replaced_card)
-                self.game.players[0].table_cards[row-1][col-1] = self._last_drawn_card
+                engine.place(0, self._last_drawn_card.id, engine.slot(0, action // 3, action % 3))
 
-            self.game.check_full_rows(self.game.players[0])
+            engine.check_full_rows(0)
 
             # Other players play their turn
             for i in range(1, self.num_players):
                 self.game.player_plays_turn(self.game.players[i])
+            if self.profiler is not None:
+                self.profiler.count('turns', self.num_players)
+                self.profiler.count('rounds')
 
-            if self.game.check_game_over():
+            if engine.game_over():
                 self.done = True
 
             if self.done:
@@ -136,7 +161,7 @@ class GolfTrainEnv(gym.Env):
                 # reward = 1.0 if self.game.player_score(self.game.players[0]) < self.game.player_score(self.game.players[1]) else 0.0
                 # relative score
                 print("Complete at ", self.turn, " turns.")
-                reward = -self.game.player_score(self.game.players[0]) + self.game.player_score(self.game.players[1])
+                reward = -engine.score(0) + engine.score(1)
                 
                 if reward > 0.0:
                     print(f"REWARD: {reward}!")
@@ -146,7 +171,7 @@ class GolfTrainEnv(gym.Env):
                 self.phase = 1
 
             # Calculate the intermediate reward
-            current_turn_score = self.game.player_score(self.game.players[0])
+            current_turn_score = engine.score(0)
             intermediate_reward = (-last_turn_score + current_turn_score) / 10
 
             reward += intermediate_reward
@@ -157,83 +182,37 @@ class GolfTrainEnv(gym.Env):
         
     def _get_observation(self):
         """
-        Build the RL seat's observation by calling 
-        self.game.get_game_status_for_player(...),
-        then encode with 'game_status_to_multidiscrete'.
+        Encode the RL seat's observation straight from the engine with the
+        encoder shared with RLPlayer. A new array every time, the callers keep
+        the observations.
         """
-        rl_player = self.game.players[0]
-
         if self.phase == 2 and self._last_drawn_card is not None:
-            hand_card = self._last_drawn_card
+            hand_value = self._last_drawn_card.value
         else:
-            hand_card = None
-
-        game_status = self.game.get_game_status_for_player(
-            rl_player, 
-            hand_card=hand_card
-        )
+            hand_value = None
+        return encode_observation(self.game.engine, 0, hand_value,
+                                  phase=self.phase if self.action_masking else None)
+
+    def action_masks(self) -> np.ndarray:
+        """Valid actions of the current phase, for maskable policies such as
+        MaskablePPO of sb3_contrib. In the draw phase they are the drawing deck
+        and, if it has cards, the played deck. In the place phase all ten are
+        valid, the nonvisible kings of removed rows can be replaced too.
+
+        Returns:
+            np.ndarray: (10,) bool array, True for the valid actions
+        """
+        if self.phase == 2:
+            return np.ones(self.action_space.n, dtype=bool)
+        mask = np.zeros(self.action_space.n, dtype=bool)
+        mask[_DRAW_DECK_ACTION] = True
+        mask[_DRAW_PLAYED_ACTION] = self.game.engine.deck.played_count > 0
+        return mask
 
-        obs = game_status_to_multidiscrete(game_status)
-        return obs    
-        
 
-def game_status_to_multidiscrete(game_status : dict):
+def game_status_to_multidiscrete(game_status):
     """
-    Convert game status to an array-like object.
-    Then produce a MultiDiscrete or np.array of the appropriate length.
+    Convert game status to the 20-value observation, see
+    observation.encode_status.
     """
-    def conv_value(card_str : str) -> int:
-        # Convert card string to numeric value.
-        if card_str.startswith("X"):
-            return 20 # nonvisible card
-        else:
-            return int(card_str[1:]) # omit suit and convert
-
-    def table_cards_to_list(table_cards : list) -> list:
-        """
-        Convert (3,3) table cards to a flat list
-        """
-        rows_missing = 3 - len(table_cards)
-        res = []
-        for row in table_cards:
-            # row is a list of card strings
-            res.extend([conv_value(card) for card in row])
-        # For any removed rows, just fill with 3 zeroes each
-        for _ in range(rows_missing):
-            print("Filling rows inside table_cards_to_list, this should not happen!")
-            res.extend([0, 0, 0])
-        return res
-
-    observation_array = []
-
-    # 1) Hand card (if any)
-    if "hand_card" in game_status and game_status['hand_card'] is not None:
-        observation_array.append(game_status['hand_card'].value)
-    else:
-        observation_array.append(20) # no hand card
-
-    # 2) Top of discard (played_top_card)
-    #  Missing top card, can happen in some strange situations, when card is 
-    # taken from played deck when it has only one and no other card has yet been placed to it.
-    top_card_value = 20
-    if "played_top_card" in game_status and game_status['played_top_card'] is not None:
-        top_card_value = game_status['played_top_card'].value
-    observation_array.append(top_card_value)
-
-    # 3) Current player's table cards
-    observation_array.extend(table_cards_to_list(game_status['player']))
-
-    # 4) Opponent's table (assuming exactly 1 opponent for training)
-    if len(game_status['other_players']) > 0:
-        observation_array.extend(table_cards_to_list(game_status['other_players'][0]))
-    else:
-        print("No other player, this should not happen!")
-        observation_array.extend([0]*9)
-
-    # Shift all values +1 so they become strictly positive => 1 .. 21
-    # MultiDiscrete requires [1..n] in this case
-    observation_array = [val + 1 for val in observation_array]
-
-    # return as numpy array
-    # print(f"OBSERVATION ARRAY:{observation_array}")
-    return np.array(observation_array, dtype=np.int32)
\ No newline at end of file
+    return encode_status(game_status)
@@ -0,0 +1,169 @@
+'''Vectorized gymnasium environment stepping many training games with NumPy'''
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from src.game.batch import BatchSimulator, StupidBatchPolicy, POLICIES
+from src.game.engine import DISCARD
+from src.game.status import HIDDEN
+from src.player.observation import encode_batch
+
+# Place action for putting the hand card to the played deck
+_DISCARD_ACTION = 9
+# Actions of the draw phase
+_DRAW_DECK_ACTION = 0
+_DRAW_PLAYED_ACTION = 1
+
+class GolfVecEnv(VectorEnv):
+    """GolfTrainEnv for num_envs games at once. The games are held in the arrays
+    of a BatchSimulator in rl training mode and every step is a few array
+    operations over all of them, so the throughput does not depend on Python code
+    per game.
+
+    The semantics are those of GolfTrainEnv: seat 0 is the agent and every turn
+    is two steps, the draw (action 0 draws from the drawing deck, any other from
+    the played deck) and the place (0-8 a table position in row-major order, 9
+    the played deck). After the place the opponent plays its whole turn. The
+    game ends when some player has all table cards visible. The reward of a
+    place step is the change of the own score divided by 10, plus the score of
+    the opponent minus the own score at the end of the game. The observation is
+    the same 20 values from 1 to 21.
+
+    Finished games are reset on the next step, whose action is ignored, like the
+    default autoreset of gymnasium vector environments. action_masks() and
+    action_masking work like in GolfTrainEnv.
+    """
+    def __init__(self, num_envs: int, opponent: str = "stupid", seed: int = None,
+                 max_turns: int = None, action_masking: bool = False) -> None:
+        """
+        Args:
+            num_envs (int): number of games
+            opponent (str | BatchPolicy, optional): vectorized opponent, 'stupid' or
+            'advanced', or a BatchPolicy. Defaults to "stupid".
+            seed (int, optional): seed of the games. Defaults to None.
+            max_turns (int, optional): truncate games after this many turns of the
+            agent. Defaults to None, no limit like GolfTrainEnv.
+            action_masking (bool, optional): add the phase to the observations and
+            reject actions outside action_masks(). Defaults to False.
+        """
+        self.num_envs = num_envs
+        self.action_masking = action_masking
+        self.single_observation_space = spaces.MultiDiscrete([22] * 20 + ([2] if action_masking else []))
+        self.single_action_space = spaces.Discrete(10)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.max_turns = max_turns
+
+        opponent = POLICIES[opponent]() if isinstance(opponent, str) else opponent
+        # The policy of seat 0 only turns the initial cards, like the
+        # StupidComputerPlayer in the seat of the agent in GolfTrainEnv
+        self.sim = BatchSimulator(num_envs, [StupidBatchPolicy(), opponent], seed=seed,
+                                  rl_training_mode=True)
+        self.phase = np.ones(num_envs, dtype=np.int8)
+        self.hand = np.zeros(num_envs, dtype=np.int8)
+        self.agent_turns = np.zeros(num_envs, dtype=np.int64)
+        self._autoreset = np.zeros(num_envs, dtype=bool)
+        self._all = np.arange(num_envs)
+
+    def reset(self, *, seed=None, options=None):
+        """Deals new games in all environments
+
+        Returns:
+            tuple: observations (num_envs, 20), or (num_envs, 21) with action
+            masking, and an empty info dict
+        """
+        if seed is not None:
+            self.sim.rng = np.random.default_rng(seed)
+        self._start(self._all)
+        return self._observations(), {}
+
+    def _start(self, games: np.ndarray) -> None:
+        self.sim.deal(games)
+        self.phase[games] = 1
+        self.agent_turns[games] = 0
+        self._autoreset[games] = False
+
+    def step(self, actions):
+        """One sub-action of the agent in every game
+
+        Args:
+            actions (array_like): (num_envs,) actions 0-9
+
+        Raises:
+            ValueError: with action masking, an action outside action_masks() in a
+            game that is not being reset
+
+        Returns:
+            tuple: observations, rewards, terminations, truncations and an empty
+            info dict
+        """
+        actions = np.asarray(actions)
+        if self.action_masking:
+            valid = self.action_masks()[self._all, actions] | self._autoreset
+            if not valid.all():
+                raise ValueError(f'Invalid actions in games {np.flatnonzero(~valid).tolist()}')
+        sim = self.sim
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        terminations = np.zeros(self.num_envs, dtype=bool)
+        truncations = np.zeros(self.num_envs, dtype=bool)
+
+        resetting = self._autoreset.copy()
+        if resetting.any():
+            self._start(np.flatnonzero(resetting))
+            stepping = ~resetting
+        else:
+            stepping = np.ones(self.num_envs, dtype=bool)
+
+        drawing = np.flatnonzero(stepping & (self.phase == 1))
+        placing = np.flatnonzero(stepping & (self.phase == 2))
+        if len(drawing):
+            self.hand[drawing] = sim.draw(drawing, actions[drawing] != 0)
+            self.phase[drawing] = 2
+        if len(placing):
+            score_before = self._scores(placing, 0)
+            slots = actions[placing].astype(np.int64)
+            slots[slots == _DISCARD_ACTION] = DISCARD
+            sim.place(placing, 0, self.hand[placing], slots)
+            own_score = self._scores(placing, 0)
+            sim.play_turn(placing, 1)
+            self.agent_turns[placing] += 1
+
+            done = sim.finished[placing].any(axis=1)
+            rewards[placing] = (own_score - score_before) / 10 \
+                + np.where(done, self._scores(placing, 1) - own_score, 0)
+            terminations[placing] = done
+            if self.max_turns is not None:
+                truncations[placing] = ~done & (self.agent_turns[placing] >= self.max_turns)
+            # The final observation keeps the hand card, like GolfTrainEnv
+            self.phase[placing[~done]] = 1
+
+        self._autoreset = terminations | truncations
+        return self._observations(), rewards, terminations, truncations, {}
+
+    def action_masks(self) -> np.ndarray:
+        """Valid actions of every game, see GolfTrainEnv.action_masks. The games
+        to be reset on the next step have all actions valid, they are ignored.
+
+        Returns:
+            np.ndarray: (num_envs, 10) bool array
+        """
+        masks = np.zeros((self.num_envs, self.single_action_space.n), dtype=bool)
+        masks[self.phase == 2] = True
+        masks[self._autoreset] = True
+        masks[:, _DRAW_DECK_ACTION] = True
+        masks[:, _DRAW_PLAYED_ACTION] |= self.sim.played_count > 0
+        return masks
+
+    def _scores(self, games: np.ndarray, seat: int) -> np.ndarray:
+        """Sum of the table values of a seat, dummy rows included as kings"""
+        return self.sim.values[games, seat].sum(axis=(1, 2), dtype=np.int64)
+
+    def _observations(self) -> np.ndarray:
+        """Observations of all games, a new array"""
+        sim = self.sim
+        top = np.where(sim.played_count > 0, sim.played[self._all, np.maximum(sim.played_count - 1, 0)],
+                       HIDDEN)
+        return encode_batch(np.where(self.phase == 2, self.hand, HIDDEN), top, sim.values, sim.visible,
+                            phase=self.phase if self.action_masking else None)
@@ -0,0 +1,328 @@
+'''Datasets of heuristic play in the GolfTrainEnv encoding for behavior cloning'''
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from src.game.batch import POLICIES
+from src.game.engine import DISCARD
+from src.player.golf_vec_env import GolfVecEnv
+from src.player.observation import OBSERVATION_SIZE
+
+INDEX_FILE = "index.json"
+# Columns of a dataset: dtype and shape of one row
+FIELDS = {
+    'obs': (np.uint8, (OBSERVATION_SIZE,)),
+    'phase': (np.uint8, ()),
+    'action': (np.uint8, ()),
+    'return': (np.float32, ()),
+}
+# Place action for putting the hand card to the played deck
+_DISCARD_ACTION = 9
+
+class ShardWriter():
+    """Collects rows into shards of shard_size rows and writes every full shard
+    as one .npy file per column. The rows of a shard are shuffled before writing,
+    so contiguous slices of a shard are usable training batches.
+    """
+    def __init__(self, path: str, prefix: str, shard_size: int, rng: np.random.Generator) -> None:
+        """
+        Args:
+            path (str): dataset directory
+            prefix (str): name of the shards, numbered from it
+            shard_size (int): rows per shard, the last one may have less
+            rng (np.random.Generator): generator for shuffling the rows
+        """
+        self.path = path
+        self.prefix = prefix
+        self.shard_size = shard_size
+        self.rng = rng
+        self.shards = []
+        self._buffers = {field: np.empty((shard_size,) + shape, dtype=dtype)
+                         for field, (dtype, shape) in FIELDS.items()}
+        self._rows = 0
+
+    def add(self, columns: dict) -> None:
+        """Appends rows, writing the shards that get full
+
+        Args:
+            columns (dict): array of the rows for each field of FIELDS
+        """
+        count = len(columns['action'])
+        start = 0
+        while start < count:
+            taken = min(count - start, self.shard_size - self._rows)
+            for field, buffer in self._buffers.items():
+                buffer[self._rows:self._rows + taken] = columns[field][start:start + taken]
+            self._rows += taken
+            start += taken
+            if self._rows == self.shard_size:
+                self._write()
+
+    def _write(self) -> None:
+        name = f"{self.prefix}-{len(self.shards):04d}"
+        order = self.rng.permutation(self._rows)
+        for field, buffer in self._buffers.items():
+            np.save(os.path.join(self.path, f"{name}.{field}.npy"), buffer[:self._rows][order])
+        self.shards.append({'name': name, 'rows': self._rows})
+        self._rows = 0
+
+    def close(self) -> list:
+        """Writes the last, partial shard
+
+        Returns:
+            list: {'name', 'rows'} of the written shards
+        """
+        if self._rows:
+            self._write()
+        return self.shards
+
+class ShardDataset():
+    """Dataset written by generate_dataset. The shards are memory mapped, a batch
+    is a slice of the arrays of one shard, so reading does not copy anything
+    until the rows are used.
+    """
+    def __init__(self, path: str) -> None:
+        """Opens the shards listed in the index
+
+        Args:
+            path (str): dataset directory
+
+        Raises:
+            ValueError: a shard does not match the index
+        """
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as file:
+            self.index = json.load(file)
+        self.shards = []
+        for shard in self.index['shards']:
+            # Copy-on-write maps are writable views, which torch.from_numpy wants
+            arrays = {field: np.load(os.path.join(path, f"{shard['name']}.{field}.npy"), mmap_mode='c')
+                      for field in FIELDS}
+            if any(len(array) != shard['rows'] for array in arrays.values()):
+                raise ValueError(f"Shard {shard['name']} does not match the index of {path}")
+            self.shards.append(arrays)
+
+    def __len__(self) -> int:
+        return sum(len(shard['action']) for shard in self.shards)
+
+    def batches(self, batch_size: int, shuffle: bool = True, rng: np.random.Generator = None):
+        """Iterates over the dataset once in batches of at most batch_size rows.
+        A batch does not span shards.
+
+        Args:
+            batch_size (int): rows per batch
+            shuffle (bool, optional): visit the shards and the batches of a shard
+            in random order. The rows are shuffled within the shards when written.
+            Defaults to True.
+            rng (np.random.Generator, optional): generator for the order. Defaults
+            to None, a new unseeded generator.
+
+        Yields:
+            dict: field -> array view of the batch rows
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        slices = [(shard, start) for shard in self.shards
+                  for start in range(0, len(shard['action']), batch_size)]
+        order = rng.permutation(len(slices)) if shuffle else range(len(slices))
+        for position in order:
+            shard, start = slices[position]
+            yield {field: array[start:start + batch_size] for field, array in shard.items()}
+
+def teacher_actions(policy, env: GolfVecEnv) -> np.ndarray:
+    """Actions of a BatchPolicy in seat 0 of all games of a GolfVecEnv, in the
+    action encoding of GolfTrainEnv
+
+    Args:
+        policy (BatchPolicy): the teacher
+        env (GolfVecEnv): environments
+
+    Returns:
+        np.ndarray: (num_envs,) actions
+    """
+    actions = np.zeros(env.num_envs, dtype=np.int64)
+    drawing = np.flatnonzero(env.phase == 1)
+    placing = np.flatnonzero(env.phase == 2)
+    if len(drawing):
+        actions[drawing] = policy.draw_action(env.sim, drawing, 0)
+    if len(placing):
+        slots = policy.play_action(env.sim, placing, 0, env.hand[placing])
+        actions[placing] = np.where(slots == DISCARD, _DISCARD_ACTION, slots)
+    return actions
+
+def generate_chunk(path: str, prefix: str, num_games: int, seed, teacher: str = "advanced",
+                   opponent: str = "advanced", num_envs: int = 1024, shard_size: int = 1 << 20,
+                   max_turns: int = 100) -> dict:
+    """Plays num_games games of a teacher policy against an opponent in a GolfVecEnv
+    and writes every step of the teacher to shards. Runs in a worker process.
+
+    Each environment plays its share of the games to the end, so short games are
+    not favoured. Games truncated at max_turns are left out.
+
+    Args:
+        path (str): dataset directory
+        prefix (str): name prefix of the shards of this chunk
+        num_games (int): number of games
+        seed (int | np.random.SeedSequence): seed of the games
+        teacher (str, optional): batch policy of the recorded seat. Defaults to
+        "advanced".
+        opponent (str, optional): batch policy of the other seat. Defaults to
+        "advanced".
+        num_envs (int, optional): games played at once. Defaults to 1024.
+        shard_size (int, optional): rows per shard. Defaults to 1 << 20.
+        max_turns (int, optional): turns of the teacher at most. Defaults to 100.
+
+    Returns:
+        dict: 'shards', 'games', 'truncated' and 'return_sum', the sum of the
+        returns of the recorded games
+    """
+    num_envs = max(1, min(num_envs, num_games))
+    seed = np.random.SeedSequence(seed) if not isinstance(seed, np.random.SeedSequence) else seed
+    game_seed, shuffle_seed = seed.spawn(2)
+    env = GolfVecEnv(num_envs, opponent=opponent, seed=game_seed, max_turns=max_turns)
+    policy = POLICIES[teacher]()
+    writer = ShardWriter(path, prefix, shard_size, np.random.default_rng(shuffle_seed))
+
+    # Games per environment
+    quota = np.full(num_envs, num_games // num_envs)
+    quota[:num_games % num_envs] += 1
+    played = np.zeros(num_envs, dtype=np.int64)
+    # Steps of the current game of every environment
+    steps = 2 * max_turns
+    trajectory = {field: np.zeros((num_envs, steps) + shape, dtype=dtype)
+                  for field, (dtype, shape) in FIELDS.items()}
+    rewards = np.zeros((num_envs, steps), dtype=np.float32)
+    length = np.zeros(num_envs, dtype=np.int64)
+    resetting = np.zeros(num_envs, dtype=bool)
+    truncated_games = 0
+    return_sum = 0.0
+
+    obs, _ = env.reset()
+    while (played < quota).any():
+        actions = teacher_actions(policy, env)
+        # The step of a game being reset is ignored by the environment
+        recording = np.flatnonzero((played < quota) & ~resetting)
+        at = length[recording]
+        trajectory['obs'][recording, at] = obs[recording]
+        trajectory['phase'][recording, at] = env.phase[recording]
+        trajectory['action'][recording, at] = actions[recording]
+        obs, step_rewards, terminations, truncations, _ = env.step(actions)
+        rewards[recording, at] = step_rewards[recording]
+        length[recording] += 1
+
+        finished = np.flatnonzero((terminations | truncations) & (played < quota))
+        if len(finished):
+            complete = finished[terminations[finished]]
+            truncated_games += len(finished) - len(complete)
+            if len(complete):
+                returns = np.cumsum(rewards[complete, ::-1], axis=1)[:, ::-1]
+                rows = np.arange(steps) < length[complete, None]
+                trajectory['return'][complete] = returns
+                writer.add({field: array[complete][rows] for field, array in trajectory.items()})
+                return_sum += float(returns[:, 0].sum())
+            played[finished] += 1
+            rewards[finished] = 0
+            length[finished] = 0
+        resetting = terminations | truncations
+    return {'shards': writer.close(), 'games': int(quota.sum()) - truncated_games,
+            'truncated': truncated_games, 'return_sum': return_sum}
+
+def generate_dataset(path: str, num_games: int, teacher: str = "advanced", opponent: str = "advanced",
+                     workers: int = None, chunk_size: int = None, num_envs: int = 1024,
+                     shard_size: int = 1 << 20, seed: int = None, max_turns: int = 100) -> dict:
+    """Plays num_games heuristic games over a process pool and writes every step
+    of the teacher seat, the GolfTrainEnv observation, the phase, the action and
+    the return from that step on, to memory mappable .npy shards in path. The
+    index of the shards is written to path/index.json.
+
+    Args:
+        path (str): dataset directory, created if missing
+        num_games (int): number of games
+        teacher (str, optional): 'stupid' or 'advanced', the recorded policy.
+        Defaults to "advanced".
+        opponent (str, optional): 'stupid' or 'advanced'. Defaults to "advanced".
+        workers (int, optional): worker processes, 1 plays in this process.
+        Defaults to None, the number of cores.
+        chunk_size (int, optional): games per task. Defaults to None, a few tasks
+        per worker.
+        num_envs (int, optional): games played at once by a task. Defaults to 1024.
+        shard_size (int, optional): rows per shard. Defaults to 1 << 20.
+        seed (int, optional): seed for a reproducible dataset, which does not
+        depend on the number of workers. Defaults to None.
+        max_turns (int, optional): games longer than this are left out. Defaults
+        to 100.
+
+    Raises:
+        ValueError: unknown policy or nonpositive sizes
+
+    Returns:
+        dict: the index
+    """
+    unknown = {teacher, opponent} - set(POLICIES)
+    if unknown:
+        raise ValueError(f'Unknown policies: {", ".join(sorted(unknown))}')
+    if num_games < 1 or shard_size < 1 or num_envs < 1:
+        raise ValueError('num_games, shard_size and num_envs must be positive')
+    os.makedirs(path, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(100_000, -(-num_games // (workers * 4))))
+    counts = [min(chunk_size, num_games - first) for first in range(0, num_games, chunk_size)]
+    prefixes = [f"shard-{chunk:05d}" for chunk in range(len(counts))]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+    arguments = (repeat(path), prefixes, counts, seeds, repeat(teacher), repeat(opponent),
+                 repeat(num_envs), repeat(shard_size), repeat(max_turns))
+    if workers == 1:
+        results = list(map(generate_chunk, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(generate_chunk, *arguments))
+
+    shards = [shard for result in results for shard in result['shards']]
+    games = sum(result['games'] for result in results)
+    index = {
+        'format': 1,
+        'fields': {field: [np.dtype(dtype).name, list(shape)] for field, (dtype, shape) in FIELDS.items()},
+        'teacher': teacher,
+        'opponent': opponent,
+        'seed': seed,
+        'games': games,
+        'truncated': sum(result['truncated'] for result in results),
+        'rows': sum(shard['rows'] for shard in shards),
+        'mean_return': sum(result['return_sum'] for result in results) / max(1, games),
+        'shard_size': shard_size,
+        'shards': shards,
+    }
+    with open(os.path.join(path, INDEX_FILE), "w", encoding="utf-8") as file:
+        json.dump(index, file, indent=1)
+    return index
+
+def main(argv: list = None) -> None:
+    """Command line: python -m src.player.heuristic_dataset DIR --games N"""
+    parser = argparse.ArgumentParser(description="Record heuristic Golf games for behavior cloning")
+    parser.add_argument("path", help="dataset directory")
+    parser.add_argument("--games", type=int, default=100_000, help="number of games")
+    parser.add_argument("--teacher", default="advanced", choices=sorted(POLICIES),
+                        help="policy of the recorded seat")
+    parser.add_argument("--opponent", default="advanced", choices=sorted(POLICIES))
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, default all cores")
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per task")
+    parser.add_argument("--shard-size", type=int, default=1 << 20, help="rows per shard")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible dataset")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = generate_dataset(args.path, args.games, args.teacher, args.opponent, args.workers,
+                             args.chunk_size, shard_size=args.shard_size, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Recorded {index['games']} games, {index['rows']} steps in {len(index['shards'])} shards "
+          f"in {elapsed:.2f} s ({index['games'] / elapsed:.0f} games/s)")
+    print(f"Mean return of the teacher: {index['mean_return']:.2f}, truncated games: {index['truncated']}")
+
+if __name__ == '__main__':
+    main()
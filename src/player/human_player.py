@@ -1,5 +1,6 @@
 '''submodule for human player'''
 
+from src.game.status import as_game_status
 from .player import Player
 
 class HumanPlayer(Player):
@@ -63,7 +64,7 @@ class HumanPlayer(Player):
                 try:
                     row, column = [int(x.strip()) for x in answer.split(",")]
                     # print("After split: ", row, column)
-                    if row in range(1, len(game_status['player'])+1) and column in range(1,4):
+                    if row in range(1, as_game_status(game_status).row_count+1) and column in range(1,4):
                         return (row, column)
                 except:
                     print("Invalid input")
@@ -0,0 +1,153 @@
+'''Batched inference of one model for many concurrent games'''
+
+import asyncio
+import queue
+import threading
+from array import array
+from concurrent.futures import Future
+from time import perf_counter
+
+import numpy as np
+
+class InferenceBroker():
+    """Collects observations from many games and evaluates them in one batched
+    forward pass. Players submit an observation and get a future of the action;
+    a worker thread flushes a batch when it has max_batch_size observations or
+    when the oldest one has waited max_delay seconds.
+
+    Works with games in threads (predict() blocks the calling thread) and with
+    asyncio (await predict_async()). Batching pays off when many games wait for
+    a decision at the same time, a single game only gets the added delay.
+
+    The size of each batch, the time from the first submit of the batch to its
+    results and the time of the forward pass are kept for stats().
+    """
+    def __init__(self, model, max_batch_size: int = 64, max_delay: float = 0.002) -> None:
+        """Starts the worker thread
+
+        Args:
+            model (stable_baselines3.DQN | NumpyQNetwork): model with predict() of
+            a batch of observations, see model_cache.get_model
+            max_batch_size (int, optional): observations per forward pass at most.
+            Defaults to 64.
+            max_delay (float, optional): seconds an observation waits for others at
+            most. Defaults to 0.002.
+
+        Raises:
+            ValueError: max_batch_size below 1 or a negative max_delay
+        """
+        if max_batch_size < 1 or max_delay < 0:
+            raise ValueError('max_batch_size must be positive and max_delay non-negative')
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batch_sizes = array('H')
+        self.batch_latency = array('d')
+        self.forward_time = array('d')
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='InferenceBroker', daemon=True)
+        self._worker.start()
+
+    def submit(self, observation) -> Future:
+        """Queues an observation for the next batch
+
+        Args:
+            observation (np.ndarray): one encoded observation
+
+        Raises:
+            ValueError: the broker is closed
+
+        Returns:
+            Future: resolves to the greedy action as an int
+        """
+        if self._closed:
+            raise ValueError('InferenceBroker is closed')
+        future = Future()
+        self._queue.put((observation, future, perf_counter()))
+        return future
+
+    def predict(self, observation) -> int:
+        """Greedy action of one observation, blocks until its batch is evaluated"""
+        return self.submit(observation).result()
+
+    async def predict_async(self, observation) -> int:
+        """Greedy action of one observation, awaits its batch without blocking
+        the event loop"""
+        return await asyncio.wrap_future(self.submit(observation))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = item[2] + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - perf_counter()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._evaluate(batch)
+            if stop:
+                return
+
+    def _evaluate(self, batch: list) -> None:
+        start = perf_counter()
+        try:
+            actions, _ = self.model.predict(np.stack([observation for observation, _, _ in batch]),
+                                            deterministic=True)
+        except Exception as error:  # pylint: disable=broad-except
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        end = perf_counter()
+        for (_, future, _), action in zip(batch, actions):
+            future.set_result(int(action))
+        self.batch_sizes.append(len(batch))
+        self.batch_latency.append(end - batch[0][2])
+        self.forward_time.append(end - start)
+
+    def stats(self) -> dict:
+        """Batch statistics so far
+
+        Returns:
+            dict: 'batches', 'requests', 'mean_batch_size', 'max_batch_size', and
+            the mean and 99th percentile of the batch latency and forward pass time
+            in microseconds
+        """
+        if not self.batch_sizes:
+            return {'batches': 0, 'requests': 0}
+        # Copies, the worker thread may append to the arrays
+        latency = np.array(self.batch_latency) * 1e6
+        forward = np.array(self.forward_time) * 1e6
+        sizes = np.array(self.batch_sizes)
+        return {
+            'batches': len(sizes),
+            'requests': int(sizes.sum()),
+            'mean_batch_size': float(sizes.mean()),
+            'max_batch_size': int(sizes.max()),
+            'mean_latency_us': float(latency.mean()),
+            'p99_latency_us': float(np.quantile(latency, 0.99)),
+            'mean_forward_us': float(forward.mean()),
+            'p99_forward_us': float(np.quantile(forward, 0.99)),
+        }
+
+    def close(self) -> None:
+        """Evaluates the queued observations and stops the worker thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def __enter__(self) -> 'InferenceBroker':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,285 @@
+'''Information set Monte Carlo tree search player'''
+
+import math
+import time
+from array import array
+from random import Random
+
+from src.card import CARD_VALUES, VALUES_PER_SUIT
+from src.game.engine import COLUMNS, TABLE_SIZE, DRAW_DECK, DRAW_PLAYED, DISCARD
+from src.game.rollout import search_engine, best_place, greedy_draw, finish_turn, playout, margin
+from src.game.status import as_game_status
+from .player import Player
+
+# Node kinds. A turn of the searching player is three tree levels: the draw
+# (deck or played deck), the value of the drawn card, which the player sees,
+# and the place (played deck or a slot). The other players play their turns
+# with the default policy between the place and the next draw.
+DRAW_NODE = 0
+CHANCE_NODE = 1
+PLACE_NODE = 2
+# Children per node kind and the kind of the children
+_BRANCHING = (2, VALUES_PER_SUIT, 1 + TABLE_SIZE)
+_CHILD_KIND = (CHANCE_NODE, PLACE_NODE, DRAW_NODE)
+# Final margins are divided by this, so the rewards are mostly within [-1, 1]
+REWARD_SCALE = 20
+# Nodes are allocated in blocks of this many
+_GROWTH = 1 << 14
+
+class SearchTree():
+    """Nodes of a search tree in parallel arrays: visits, availability counts,
+    reward sums, index of the first child and kind. The children of a node are
+    allocated together as one block when it is expanded, so a child is
+    first_child[node] + action and no per node objects are created.
+    """
+    def __init__(self, max_nodes: int) -> None:
+        """
+        Args:
+            max_nodes (int): nodes at most, the tree is not expanded further
+        """
+        self.max_nodes = max_nodes
+        self.size = 0
+        self.visits = array('i')
+        self.avail = array('i')
+        self.total = array('d')
+        self.first_child = array('i')
+        self.kind = array('b')
+
+    def add(self, kind: int, count: int = 1) -> int:
+        """Allocates count nodes of a kind
+
+        Returns:
+            int: index of the first one, -1 if the tree is full
+        """
+        start = self.size
+        if start + count > self.max_nodes:
+            return -1
+        if start + count > len(self.kind):
+            grow = max(count, _GROWTH)
+            for column in (self.visits, self.avail, self.total):
+                column.frombytes(bytes(grow * column.itemsize))
+            self.first_child.extend([-1] * grow)
+            self.kind.frombytes(bytes(grow))
+        for index in range(start, start + count):
+            self.kind[index] = kind
+        self.size = start + count
+        return start
+
+    def expand(self, node: int) -> int:
+        """Index of the first child of a node, allocating the children if needed
+
+        Returns:
+            int: the index, -1 if the tree is full
+        """
+        first = self.first_child[node]
+        if first < 0:
+            kind = self.kind[node]
+            first = self.add(_CHILD_KIND[kind], _BRANCHING[kind])
+            self.first_child[node] = first
+        return first
+
+    def compact(self, root: int) -> int:
+        """Drops all nodes outside the subtree of root, keeping the statistics of
+        the subtree
+
+        Returns:
+            int: new index of root, 0
+        """
+        tree = SearchTree(self.max_nodes)
+        stack = [(root, tree.add(self.kind[root]))]
+        while stack:
+            old, new = stack.pop()
+            tree.visits[new] = self.visits[old]
+            tree.avail[new] = self.avail[old]
+            tree.total[new] = self.total[old]
+            first = self.first_child[old]
+            if first >= 0:
+                kind = self.kind[old]
+                block = tree.add(_CHILD_KIND[kind], _BRANCHING[kind])
+                tree.first_child[new] = block
+                stack.extend((first + offset, block + offset) for offset in range(_BRANCHING[kind]))
+        self.size = tree.size
+        self.visits, self.avail, self.total = tree.visits, tree.avail, tree.total
+        self.first_child, self.kind = tree.first_child, tree.kind
+        return 0
+
+class ISMCTSPlayer(Player):
+    """Single observer information set MCTS. Every iteration deals the cards the
+    player can not see again (GolfEngine.resample_hidden) and walks the tree of
+    the own decisions in that deal, choosing among the actions legal in it with
+    UCB1 over their availability counts. Other players are played by the default
+    policy of src.game.rollout, and below the tree the game is played out with it.
+
+    The search is anytime: each decision runs until time_limit or iterations is
+    reached and answers the most visited action. The subtree of the chosen
+    action is kept for the next decision of the same game.
+    """
+    def __init__(self, time_limit: float = 0.2, iterations: int = None, exploration: float = 0.7,
+                 max_nodes: int = 1 << 20, seed: int = None) -> None:
+        """
+        Args:
+            time_limit (float, optional): seconds per decision. Defaults to 0.2.
+            None for no limit, then iterations is required.
+            iterations (int, optional): iterations per decision at most. Defaults
+            to None, no limit.
+            exploration (float, optional): UCB1 exploration constant. Defaults to 0.7.
+            max_nodes (int, optional): tree size at most. Defaults to 1 << 20.
+            seed (int, optional): seed of the deals and choices. Defaults to None.
+
+        Raises:
+            ValueError: no budget or a nonpositive one
+        """
+        if time_limit is None and iterations is None:
+            raise ValueError('ISMCTSPlayer needs time_limit or iterations')
+        if (time_limit is not None and time_limit <= 0) or (iterations is not None and iterations < 1):
+            raise ValueError('time_limit and iterations must be positive')
+        self._rng = Random(seed)
+        super().__init__()
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.exploration = exploration
+        self.tree = SearchTree(max_nodes)
+        self._world = None
+        # Engine of the game and the node the next decision starts from
+        self._game_engine = None
+        self._next = -1
+        # Iterations of the last decision
+        self.last_iterations = 0
+
+    def get_player_name(self) -> str:
+        return f"ISMCTS {self._rng.randint(1, 10000)}"
+
+    def get_draw_action(self, game_status) -> str:
+        game_status = as_game_status(game_status)
+        engine = search_engine(game_status)
+        seat = game_status.seat
+        root = self._root(engine, self._next, DRAW_NODE)
+        self._search(engine, seat, root, None)
+        legal = [0, 1] if engine.deck.top_played_id() >= 0 else [0]
+        action = self._best(root, legal)
+        self._next = self.tree.first_child[root] + action if self.tree.first_child[root] >= 0 else -1
+        return "d" if action == 0 else "p"
+
+    def get_play_action(self, game_status) -> tuple:
+        game_status = as_game_status(game_status)
+        engine = search_engine(game_status)
+        seat = game_status.seat
+        hand_id = game_status.hand_card.id
+        chance = self._next if self._game_engine is engine else -1
+        place = -1
+        if chance >= 0 and self.tree.first_child[chance] >= 0:
+            place = self.tree.first_child[chance] + CARD_VALUES[hand_id]
+        root = self._root(engine, place, PLACE_NODE)
+        self._search(engine, seat, root, hand_id)
+        action = self._best(root, range(1 + engine.row_count[seat] * COLUMNS))
+        self._next = self.tree.first_child[root] + action if self.tree.first_child[root] >= 0 else -1
+        if action == 0:
+            return ("p", None)
+        row, column = divmod(action - 1, COLUMNS)
+        return (row + 1, column + 1)
+
+    def _root(self, engine, node: int, kind: int) -> int:
+        """Root of the next search: the kept node of the same game, or a new tree"""
+        if self._game_engine is engine and node >= 0:
+            if self.tree.size > self.tree.max_nodes // 2:
+                node = self.tree.compact(node)
+            return node
+        self._game_engine = engine
+        self.tree = SearchTree(self.tree.max_nodes)
+        return self.tree.add(kind)
+
+    def _best(self, root: int, legal) -> int:
+        """Most visited legal action of the root"""
+        first = self.tree.first_child[root]
+        if first < 0:
+            return 0
+        visits = self.tree.visits
+        return max(legal, key=lambda action: visits[first + action])
+
+    def _search(self, engine, seat: int, root: int, hand_id: int) -> None:
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        state = engine.snapshot()
+        if self._world is None or self._world.num_players != engine.num_players:
+            self._world = engine.clone(self._rng)
+        world = self._world
+        done = 0
+        # At least one iteration, even if the time is up
+        while done == 0 or ((self.iterations is None or done < self.iterations)
+                            and (deadline is None or time.perf_counter() < deadline)):
+            world.restore(state)
+            world.resample_hidden(self._rng)
+            self._iterate(world, seat, root, hand_id)
+            done += 1
+        self.last_iterations = done
+
+    def _iterate(self, world, seat: int, root: int, card_id: int) -> None:
+        """One iteration in a determinized world: selection and expansion down
+        the tree, a playout from the first new node and backpropagation"""
+        tree = self.tree
+        kinds = tree.kind
+        node = root
+        path = [root]
+        ended = False
+        while node == root or tree.visits[node] > 0:
+            first = tree.expand(node)
+            if first < 0:
+                break
+            kind = kinds[node]
+            if kind == CHANCE_NODE:
+                node = first + CARD_VALUES[card_id]
+            elif kind == DRAW_NODE:
+                action = self._select(first, (0, 1) if world.deck.top_played_id() >= 0 else (0,))
+                node = first + action
+                card_id = world.draw(DRAW_DECK if action == 0 else DRAW_PLAYED)
+            else:
+                action = self._select(first, range(1 + world.row_count[seat] * COLUMNS))
+                node = first + action
+                ended = finish_turn(world, seat, card_id, DISCARD if action == 0 else action - 1)
+                card_id = None
+                while not ended and world.to_move != seat:
+                    other = world.to_move
+                    drawn = world.draw(greedy_draw(world, other))
+                    ended = finish_turn(world, other, drawn, best_place(world, other, CARD_VALUES[drawn])[0])
+            path.append(node)
+            if ended:
+                break
+        if not ended:
+            if card_id is not None:
+                ended = finish_turn(world, seat, card_id, best_place(world, seat, CARD_VALUES[card_id])[0])
+            if not ended:
+                playout(world)
+        reward = -margin(world, seat) / REWARD_SCALE
+        visits = tree.visits
+        total = tree.total
+        for node in path:
+            visits[node] += 1
+            total[node] += reward
+
+    def _select(self, first: int, legal) -> int:
+        """UCB1 action among the legal ones, unvisited ones first"""
+        tree = self.tree
+        visits, avail, total = tree.visits, tree.avail, tree.total
+        unvisited = []
+        for action in legal:
+            avail[first + action] += 1
+            if visits[first + action] == 0:
+                unvisited.append(action)
+        if unvisited:
+            return self._rng.choice(unvisited)
+        exploration = self.exploration
+        best_action = 0
+        best_score = -math.inf
+        for action in legal:
+            child = first + action
+            count = visits[child]
+            score = total[child] / count + exploration * math.sqrt(math.log(avail[child]) / count)
+            if score > best_score:
+                best_action = action
+                best_score = score
+        return best_action
+
+    def turn_initial_cards(self, initial_table_cards):
+        return [(row + 1, self._rng.randint(1, len(cards))) for row, cards in enumerate(initial_table_cards)]
+
+    def inform_game_result(self, win: bool, relative_score: int) -> None:
+        return None
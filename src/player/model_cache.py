@@ -0,0 +1,77 @@
+'''Process-wide cache of the trained RL models'''
+
+import os
+import threading
+
+# Model loaded by RLPlayer when no path is given
+DEFAULT_MODEL_PATH = "golf_agent_1000000ep_DQN.zip"
+# Environment variable overriding DEFAULT_MODEL_PATH
+MODEL_PATH_ENV = "GOLF_RL_MODEL"
+
+# (absolute path, device) -> loaded model
+_models = {}
+_lock = threading.Lock()
+_default_path = None
+
+def default_model_path() -> str:
+    """Model path used when none is given: the one set by set_default_model_path,
+    else the GOLF_RL_MODEL environment variable, else DEFAULT_MODEL_PATH"""
+    if _default_path is not None:
+        return _default_path
+    return os.environ.get(MODEL_PATH_ENV, DEFAULT_MODEL_PATH)
+
+def set_default_model_path(path: str = None) -> None:
+    """Sets the model path used when none is given
+
+    Args:
+        path (str, optional): saved model. Defaults to None, back to the environment
+        variable or DEFAULT_MODEL_PATH.
+    """
+    global _default_path
+    _default_path = path
+
+def _cache_key(path: str, device: str) -> tuple:
+    # DQN.load accepts the path with or without the .zip suffix
+    if not path.endswith(".zip") and not os.path.exists(path) and os.path.exists(path + ".zip"):
+        path += ".zip"
+    return os.path.abspath(path), device
+
+def get_model(path: str = None, device: str = "cpu"):
+    """Returns the model saved at path, loading it on the first call in this
+    process. All callers get the same model object.
+
+    Loading in the parent before a process pool forks its workers shares the
+    weights with the workers through copy-on-write pages, instead of each worker
+    reading and deserializing the file again.
+
+    Args:
+        path (str, optional): saved DQN model, or a .npz Q-network exported by
+        numpy_q_net for inference without torch. Defaults to None,
+        default_model_path().
+        device (str, optional): torch device of the model. Defaults to "cpu".
+
+    Returns:
+        stable_baselines3.DQN | NumpyQNetwork: the model
+    """
+    key = _cache_key(path or default_model_path(), device)
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = _load(*key)
+    return model
+
+def _load(path: str, device: str):
+    if path.endswith(".npz"):
+        # Exported Q-network, runs on NumPy whatever the device
+        from .numpy_q_net import NumpyQNetwork
+        return NumpyQNetwork.load(path)
+    # Imported here, importing stable_baselines3 and torch takes seconds
+    from stable_baselines3 import DQN
+    return DQN.load(path, device=device)
+
+def clear_model_cache() -> None:
+    """Drops the loaded models, the next get_model loads again"""
+    with _lock:
+        _models.clear()
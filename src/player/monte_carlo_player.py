@@ -0,0 +1,171 @@
+'''Monte Carlo player playing out determinized games for every option'''
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+
+from src.card import CARD_VALUES
+from src.game.engine import GolfEngine, COLUMNS, DRAW_DECK, DRAW_PLAYED, DISCARD
+from src.game.rollout import search_engine, place_targets, best_place, finish_turn, playout, margin
+from src.game.status import as_game_status
+from .player import Player
+
+class MonteCarloPlayer(Player):
+    """Flat Monte Carlo search. For every option of a decision the player deals
+    the cards it can not see again (GolfEngine.resample_hidden), plays the
+    option, plays the game to the end with the fast default policy of
+    src.game.rollout for all seats and picks the option with the lowest mean of
+    its final score minus the best other score.
+
+    The options of the draw are the drawing deck and the played deck top card
+    together with each place for it, so the place of a card taken from the
+    played deck is decided with the draw. The options of the place are the
+    slots in play and the played deck. All options of a round of rollouts share
+    the same deal, which keeps the comparison between them fair.
+
+    The budget is a number of rollouts, a time limit per decision or both.
+    With workers the rounds are spread over a process pool, which pays off for
+    budgets of tenths of a second and more.
+    """
+    def __init__(self, rollouts: int = 400, time_limit: float = None, workers: int = None,
+                 seed: int = None) -> None:
+        """
+        Args:
+            rollouts (int, optional): rollouts per decision, over all options.
+            Defaults to 400. None for no limit, then time_limit is required.
+            time_limit (float, optional): seconds per decision at most. Defaults to
+            None, no limit.
+            workers (int, optional): processes to spread the rollouts over, 0 for
+            all cores. Defaults to None, rollouts in this process.
+            seed (int, optional): seed of the deals and the choices of the player.
+            Defaults to None.
+
+        Raises:
+            ValueError: no budget or a nonpositive one
+        """
+        if rollouts is None and time_limit is None:
+            raise ValueError('MonteCarloPlayer needs rollouts or time_limit')
+        if (rollouts is not None and rollouts < 1) or (time_limit is not None and time_limit <= 0):
+            raise ValueError('rollouts and time_limit must be positive')
+        self._rng = Random(seed)
+        super().__init__()
+        self.rollouts = rollouts
+        self.time_limit = time_limit
+        self.workers = (os.cpu_count() or 1) if workers == 0 else workers
+        self._executor = None
+        self._planned_slot = None
+        # Mean margins of the options and rollouts of the last decision
+        self.last_values = []
+        self.last_rollouts = 0
+
+    def get_player_name(self) -> str:
+        return f"Monte Carlo {self._rng.randint(1, 10000)}"
+
+    def get_draw_action(self, game_status) -> str:
+        game_status = as_game_status(game_status)
+        engine = search_engine(game_status)
+        seat = game_status.seat
+        options = [(DRAW_DECK, None)]
+        if engine.deck.top_played_id() >= 0:
+            options.extend((DRAW_PLAYED, slot) for slot in place_targets(engine, seat))
+        source, slot = options[self._search(engine, seat, None, options)]
+        self._planned_slot = slot
+        return "d" if source == DRAW_DECK else "p"
+
+    def get_play_action(self, game_status) -> tuple:
+        game_status = as_game_status(game_status)
+        engine = search_engine(game_status)
+        seat = game_status.seat
+        slot, self._planned_slot = self._planned_slot, None
+        if slot is None:
+            options = [(None, slot) for slot in place_targets(engine, seat)]
+            slot = options[self._search(engine, seat, game_status.hand_card.id, options)][1]
+        if slot == DISCARD:
+            return ("p", None)
+        row, column = divmod(slot, COLUMNS)
+        return (row + 1, column + 1)
+
+    def _search(self, engine, seat: int, hand_id: int, options: list) -> int:
+        """Index of the option with the lowest mean margin"""
+        if len(options) == 1:
+            return 0
+        rounds = None if self.rollouts is None else max(1, self.rollouts // len(options))
+        state = engine.snapshot()
+        if not self.workers or self.workers == 1:
+            sums, done = evaluate_options(state, engine.num_players, seat, hand_id, options,
+                                          rounds, self.time_limit, self._rng.getrandbits(64))
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers)
+            shares = [None] * self.workers if rounds is None else \
+                [rounds // self.workers + (worker < rounds % self.workers) for worker in range(self.workers)]
+            futures = [self._executor.submit(evaluate_options, state, engine.num_players, seat, hand_id,
+                                             options, share, self.time_limit, self._rng.getrandbits(64))
+                       for share in shares if share != 0]
+            sums = [0.0] * len(options)
+            done = 0
+            for future in futures:
+                worker_sums, worker_done = future.result()
+                sums = [total + value for total, value in zip(sums, worker_sums)]
+                done += worker_done
+        self.last_values = [total / max(1, done) for total in sums]
+        self.last_rollouts = done * len(options)
+        return min(range(len(options)), key=self.last_values.__getitem__)
+
+    def turn_initial_cards(self, initial_table_cards):
+        return [(row + 1, self._rng.randint(1, len(cards))) for row, cards in enumerate(initial_table_cards)]
+
+    def inform_game_result(self, win: bool, relative_score: int) -> None:
+        return None
+
+    def close(self) -> None:
+        """Shuts down the process pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+def evaluate_options(state: tuple, num_players: int, seat: int, hand_id: int, options: list,
+                     rounds: int = None, time_limit: float = None, seed: int = None) -> tuple:
+    """Sums of the final margins of rollouts of each option. Every round deals
+    the unseen cards once and plays each option from that deal. Runs in worker
+    processes too.
+
+    Args:
+        state (tuple): GolfEngine.snapshot() at the decision, seat to move
+        num_players (int): number of players of the engine
+        seat (int): seat deciding
+        hand_id (int): id of the hand card, None in the draw phase
+        options (list): (source, slot) pairs. Source is DRAW_DECK or DRAW_PLAYED,
+        None in the place phase; slot is DISCARD or a slot, None to place with the
+        default policy.
+        rounds (int, optional): rounds to play. Defaults to None, until time_limit.
+        time_limit (float, optional): seconds to play at most. Defaults to None.
+        seed (int, optional): seed of the deals. Defaults to None.
+
+    Returns:
+        tuple: (list of margin sums, number of rounds played)
+    """
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    rng = Random(seed)
+    world = GolfEngine(num_players)
+    world.restore(state)
+    work = world.clone(rng)
+    sums = [0.0] * len(options)
+    done = 0
+    # At least one round, even if the time is up
+    while done == 0 or ((rounds is None or done < rounds)
+                        and (deadline is None or time.perf_counter() < deadline)):
+        world.restore(state)
+        world.resample_hidden(rng)
+        deal = world.snapshot()
+        for index, (source, slot) in enumerate(options):
+            work.restore(deal)
+            card_id = hand_id if source is None else work.draw(source)
+            if slot is None:
+                slot = best_place(work, seat, CARD_VALUES[card_id])[0]
+            if not finish_turn(work, seat, card_id, slot):
+                playout(work)
+            sums[index] += margin(work, seat)
+        done += 1
+    return sums, done
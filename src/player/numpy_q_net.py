@@ -0,0 +1,127 @@
+'''Torch-free inference of trained DQN golf agents with NumPy'''
+
+import argparse
+import os
+
+import numpy as np
+
+class NumpyQNetwork():
+    """Q-network of a DQN agent evaluated with NumPy: a MultiDiscrete observation,
+    one-hot encoded like stable_baselines3 does it, through an MLP of linear layers
+    with ReLU between them. Actions are the argmax of the Q-values, like
+    DQN.predict(obs, deterministic=True).
+
+    The one-hot input makes the first layer a sum of one weight column per
+    observation variable, so it is computed as a gather instead of a matmul.
+
+    Has the predict() of a stable_baselines3 model, so RLPlayer can use it in
+    place of the DQN. Load exported weights with load() or get it from
+    model_cache.get_model() with a .npz path.
+    """
+    def __init__(self, nvec, weights: list, biases: list) -> None:
+        """
+        Args:
+            nvec (array_like): number of values of each observation variable
+            weights (list): weight matrices of the linear layers, (out, in) like torch
+            biases (list): bias vectors of the linear layers
+        """
+        self.nvec = np.asarray(nvec, dtype=np.int64)
+        # Row of the first layer input weights for value 0 of each variable
+        self._offsets = np.concatenate(([0], np.cumsum(self.nvec)[:-1]))
+        first = np.asarray(weights[0], dtype=np.float32)
+        if first.shape[1] != self.nvec.sum():
+            raise ValueError('First layer does not match the observation space')
+        self._embedding = np.ascontiguousarray(first.T)
+        self._weights = [np.ascontiguousarray(np.asarray(weight, dtype=np.float32).T)
+                         for weight in weights[1:]]
+        self._biases = [np.asarray(bias, dtype=np.float32) for bias in biases]
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyQNetwork':
+        """Loads weights written by export_q_net
+
+        Args:
+            path (str): .npz file
+
+        Returns:
+            NumpyQNetwork: the network
+        """
+        with np.load(path) as data:
+            layers = int(data['layers'])
+            return cls(data['nvec'], [data[f'w{layer}'] for layer in range(layers)],
+                       [data[f'b{layer}'] for layer in range(layers)])
+
+    def q_values(self, observations) -> np.ndarray:
+        """Q-values of one observation (n_vars,) or a batch (N, n_vars)
+
+        Returns:
+            np.ndarray: (n_actions,) or (N, n_actions) float32
+        """
+        indices = np.asarray(observations, dtype=np.int64) + self._offsets
+        hidden = self._embedding[indices].sum(axis=-2, dtype=np.float32) + self._biases[0]
+        for weight, bias in zip(self._weights, self._biases[1:]):
+            np.maximum(hidden, 0, out=hidden)
+            hidden = hidden @ weight + bias
+        return hidden
+
+    def predict(self, observation, deterministic: bool = True):
+        """Greedy actions, same call as stable_baselines3 predict
+
+        Args:
+            observation (array_like): one observation (n_vars,) or a batch (N, n_vars)
+            deterministic (bool, optional): accepted for compatibility, actions are
+            always greedy. Defaults to True.
+
+        Returns:
+            tuple: action (int for one observation, (N,) array for a batch) and None
+        """
+        q_values = self.q_values(observation)
+        if q_values.ndim == 1:
+            return int(q_values.argmax()), None
+        return q_values.argmax(axis=1), None
+
+def export_q_net(model, path: str) -> None:
+    """Writes the Q-network weights of a DQN to a .npz file for NumpyQNetwork
+
+    Args:
+        model (stable_baselines3.DQN | str): the model or the path of a saved one
+        path (str): .npz file to write
+
+    Raises:
+        ValueError: the network is not a flattened MultiDiscrete observation through
+        linear layers and ReLUs
+    """
+    from gymnasium import spaces
+    from torch import nn
+    if isinstance(model, str):
+        from stable_baselines3 import DQN
+        model = DQN.load(model, device="cpu")
+    if not isinstance(model.observation_space, spaces.MultiDiscrete):
+        raise ValueError('Only MultiDiscrete observations are supported')
+    q_net = model.q_net
+    if type(q_net.features_extractor).__name__ != 'FlattenExtractor':
+        raise ValueError('Only the flatten features extractor is supported')
+    arrays = {'nvec': np.asarray(model.observation_space.nvec, dtype=np.int64)}
+    layers = 0
+    for index, module in enumerate(q_net.q_net):
+        if isinstance(module, nn.Linear):
+            arrays[f'w{layers}'] = module.weight.detach().cpu().numpy()
+            arrays[f'b{layers}'] = module.bias.detach().cpu().numpy()
+            layers += 1
+        elif not isinstance(module, nn.ReLU) or index == len(q_net.q_net) - 1:
+            raise ValueError(f'Unsupported layer {module}')
+    arrays['layers'] = np.array(layers)
+    np.savez(path, **arrays)
+
+def main(argv: list = None) -> None:
+    """Exports a saved DQN model to .npz"""
+    parser = argparse.ArgumentParser(description="Export the Q-network of a saved DQN golf agent for NumPy inference")
+    parser.add_argument("model", help="saved DQN model, .zip")
+    parser.add_argument("out", nargs="?", default=None, help="output .npz, default the model path with .npz")
+    args = parser.parse_args(argv)
+    out = args.out or os.path.splitext(args.model)[0] + ".npz"
+    export_q_net(args.model, out)
+    print(f"Wrote {out}")
+
+if __name__ == '__main__':
+    main()
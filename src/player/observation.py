@@ -0,0 +1,121 @@
+'''Observation encoding shared by the RL training environments and RLPlayer'''
+
+import numpy as np
+
+from src.card import CARD_VALUES
+from src.game.engine import TABLE_SIZE
+from src.game.status import as_game_status, HIDDEN
+
+# Hand card, played deck top card, own table and the table of the next player
+OBSERVATION_SIZE = 2 + 2 * TABLE_SIZE
+# The same followed by the phase of the turn, 0 draw and 1 place, for models
+# trained with action masking
+PHASE_OBSERVATION_SIZE = OBSERVATION_SIZE + 1
+# Value of a nonvisible card, a missing hand card or an empty played deck. The
+# encoded values are shifted by one, MultiDiscrete wants them positive: a king
+# is 1 and NO_CARD is 21.
+NO_CARD = 20
+# Encoded value of a slot of a removed row, a king
+_MISSING = 1
+_ENCODED_NO_CARD = NO_CARD + 1
+# Encoded value of each card id
+_ENCODED = tuple(value + 1 for value in CARD_VALUES)
+
+def encode_observation(engine, seat: int, hand_value: int = None, out: np.ndarray = None,
+                       phase: int = None) -> np.ndarray:
+    """Observation of a seat straight from the integer state of the engine: hand
+    card, played deck top card, own table and the table of the first other seat,
+    nonvisible cards as NO_CARD, all shifted by one, and the phase if given
+
+    Args:
+        engine (GolfEngine): engine of the game
+        seat (int): seat index of the player
+        hand_value (int, optional): value of the hand card. Defaults to None, no
+        hand card.
+        out (np.ndarray, optional): (20,) integer array to write to, (21,) with
+        the phase. Defaults to None, a new int32 array.
+        phase (int, optional): 1 draw or 2 place, added as 0 or 1 to the end.
+        Defaults to None, no phase.
+
+    Returns:
+        np.ndarray: out, or the new array
+    """
+    table = engine.table
+    visible = engine.visible
+    top_id = engine.deck.top_played_id()
+    values = [_ENCODED_NO_CARD if hand_value is None else hand_value + 1,
+              _ENCODED_NO_CARD if top_id < 0 else _ENCODED[top_id]]
+    for player in (seat, 1 if seat == 0 else 0):
+        base = player * TABLE_SIZE
+        end = base + engine.row_count[player] * 3
+        values.extend([_ENCODED[card_id] if is_visible else _ENCODED_NO_CARD
+                       for card_id, is_visible in zip(table[base:end], visible[base:end])])
+        # Removed rows, only outside of rl training mode
+        values.extend([_MISSING] * (base + TABLE_SIZE - end))
+    if phase is not None:
+        values.append(phase - 1)
+    if out is None:
+        return np.array(values, dtype=np.int32)
+    out[:] = values
+    return out
+
+def encode_status(game_status, out: np.ndarray = None, phase: int = None) -> np.ndarray:
+    """Observation of the player of a game status, see encode_observation
+
+    Args:
+        game_status (GameStatus | dict): status given to the player
+        out (np.ndarray, optional): (20,) integer array to write to, (21,) with
+        the phase. Defaults to None, a new int32 array.
+        phase (int, optional): 1 draw or 2 place. Defaults to None, no phase.
+
+    Returns:
+        np.ndarray: out, or the new array
+    """
+    game_status = as_game_status(game_status)
+    if game_status.engine is not None:
+        return encode_observation(game_status.engine, game_status.seat, game_status.hand_value, out,
+                                  phase)
+    # Old style dict status
+    hand_value = game_status.hand_value
+    top_value = game_status.top_value
+    values = [_ENCODED_NO_CARD if hand_value is None else hand_value + 1,
+              _ENCODED_NO_CARD if top_value is None else top_value + 1]
+    for table_values in (game_status.own_values, game_status.other_values[0]):
+        values.extend([_ENCODED_NO_CARD if value == HIDDEN else value + 1 for value in table_values])
+        values.extend([_MISSING] * (TABLE_SIZE - len(table_values)))
+    if phase is not None:
+        values.append(phase - 1)
+    if out is None:
+        return np.array(values, dtype=np.int32)
+    out[:] = values
+    return out
+
+def encode_batch(hand: np.ndarray, top: np.ndarray, values: np.ndarray, visible: np.ndarray,
+                 out: np.ndarray = None, phase: np.ndarray = None) -> np.ndarray:
+    """Observations of N games at once, the same encoding as encode_observation
+
+    Args:
+        hand (np.ndarray): (N,) values of the hand cards, HIDDEN for no hand card
+        top (np.ndarray): (N,) values of the played deck top cards, HIDDEN for an
+        empty played deck
+        values (np.ndarray): (N, 2, 9) or (N, 2, 3, 3) card values of the own table
+        and the table of the other seat, removed rows as kings
+        visible (np.ndarray): visibility flags in the shape of values
+        out (np.ndarray, optional): (N, 20) integer array to write to, (N, 21)
+        with the phase. Defaults to None, a new int32 array.
+        phase (np.ndarray, optional): (N,) phases, 1 draw or 2 place. Defaults to
+        None, no phase.
+
+    Returns:
+        np.ndarray: out, or the new array
+    """
+    if out is None:
+        size = OBSERVATION_SIZE if phase is None else PHASE_OBSERVATION_SIZE
+        out = np.empty((len(hand), size), dtype=np.int32)
+    out[:, 0] = np.where(hand == HIDDEN, NO_CARD, hand)
+    out[:, 1] = np.where(top == HIDDEN, NO_CARD, top)
+    out[:, 2:OBSERVATION_SIZE] = np.where(visible, values, NO_CARD).reshape(len(hand), 2 * TABLE_SIZE)
+    out[:, :OBSERVATION_SIZE] += 1
+    if phase is not None:
+        out[:, OBSERVATION_SIZE] = phase - 1
+    return out
@@ -4,13 +4,22 @@ from abc import ABC, abstractmethod
 
 class Player(ABC):
     """Abstract class to define different player subclasses to be instantiated.
-    Game status need to be passed to different actual subclasses. The data structture is:
+    Game status need to be passed to different actual subclasses. It is a
+    GameStatus with typed fields:
+    game_status.own_values = array of own table card values, HIDDEN if nonvisible
+    game_status.other_values = [table values 1, table values 2 ...]
+    game_status.row_count = number of own rows in play
+    game_status.top_value / played_top_card = played deck top card, or None
+    game_status.hand_value / hand_card = hand card, None when drawing
+
+    It can also be read like the old dict status:
     game_status = dict({
         'other_players' = [table_cards1, table_cards2 ...],
         'player' = [table_cards],
         'played_top_card' = Card,
         <'hand_card' = Card # if there is a hand card>
         })
+    Plain dicts of that form can be converted with as_game_status().
     """    
     def __init__(self) -> None:
         """Should not be instantiated!
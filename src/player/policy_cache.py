@@ -0,0 +1,136 @@
+'''Bounded LRU cache of the decisions of a deterministic policy'''
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Cache used by RLPlayers created without one
+_default_cache = None
+
+class PolicyCache():
+    """Least recently used cache of observation -> action. The key is the bytes
+    of the encoded observation, so it suits players whose action depends on the
+    observation only, like RLPlayer with a greedy model. get() and put() can be
+    called from several threads, for example games of an InferenceBroker.
+
+    Counts hits, misses and evictions. save() and load() keep the entries between
+    runs; the tag, for example the model path, guards against loading the
+    decisions of another model.
+    """
+    def __init__(self, maxsize: int = 1 << 16, tag: str = "") -> None:
+        """
+        Args:
+            maxsize (int, optional): entries at most. Defaults to 65536.
+            tag (str, optional): name of the policy, checked by load(). Defaults to "".
+
+        Raises:
+            ValueError: maxsize below 1
+        """
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        self.maxsize = maxsize
+        self.tag = tag
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, observation: np.ndarray):
+        """Cached action of an observation
+
+        Returns:
+            int: the action, None on a miss
+        """
+        key = observation.tobytes()
+        with self._lock:
+            action = self._entries.get(key)
+            if action is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return action
+
+    def put(self, observation: np.ndarray, action: int) -> None:
+        """Stores the action of an observation, evicting the least recently used
+        entry if the cache is full"""
+        key = observation.tobytes()
+        with self._lock:
+            self._entries[key] = int(action)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Counters and size
+
+        Returns:
+            dict: 'hits', 'misses', 'evictions', 'size' and 'hit_rate'
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._entries), 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def save(self, path: str) -> None:
+        """Writes the entries to a .npz file, least recently used first
+
+        Args:
+            path (str): file to write
+        """
+        keys = list(self._entries)
+        key_size = len(keys[0]) if keys else 0
+        if any(len(key) != key_size for key in keys):
+            raise ValueError('Observations of different sizes can not be saved')
+        np.savez(path,
+                 keys=np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(len(keys), key_size),
+                 actions=np.fromiter(self._entries.values(), dtype=np.int64, count=len(keys)),
+                 tag=np.array(self.tag))
+
+    def load(self, path: str) -> None:
+        """Adds the entries of a file written by save(), as the most recently used
+        ones. The counters are not changed.
+
+        Args:
+            path (str): .npz file
+
+        Raises:
+            ValueError: the file was saved with another tag
+        """
+        with np.load(path) as data:
+            if str(data['tag']) != self.tag:
+                raise ValueError(f'Policy cache {path} is for {str(data["tag"])!r}, not {self.tag!r}')
+            keys, actions = data['keys'], data['actions']
+        with self._lock:
+            for key, action in zip(keys, actions.tolist()):
+                self._entries[key.tobytes()] = action
+                self._entries.move_to_end(key.tobytes())
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+def get_default_cache(tag: str = None):
+    """Cache of RLPlayers created without one, None if not set
+
+    Args:
+        tag (str, optional): model path of the player. Defaults to None, any tag.
+
+    Returns:
+        PolicyCache: the cache, None if it is not set or is for another tag
+    """
+    if tag is not None and _default_cache is not None and _default_cache.tag != tag:
+        return None
+    return _default_cache
+
+def set_default_cache(cache: PolicyCache = None) -> None:
+    """Sets the cache of RLPlayers created without one, for example by the
+    tournament workers
+
+    Args:
+        cache (PolicyCache, optional): the cache. Defaults to None, no caching.
+    """
+    global _default_cache
+    _default_cache = cache
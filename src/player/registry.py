@@ -0,0 +1,59 @@
+'''Registry of player types by name, imported on first use'''
+
+from importlib import import_module
+
+# Player type name -> (module, class name). Modules are imported only when the
+# type is used, so heavy dependencies like stable_baselines3 are not loaded for
+# games without the player.
+_PLAYER_TYPES = {
+    "human": ("src.player.human_player", "HumanPlayer"),
+    "stupid": ("src.player.stupid_computer_player", "StupidComputerPlayer"),
+    "computer": ("src.player.computer_player", "ComputerPlayer"),
+    "advanced": ("src.player.advanced_computer_player", "AdvancedComputerPlayer"),
+    "rl": ("src.player.rl_player", "RLPlayer"),
+    "montecarlo": ("src.player.monte_carlo_player", "MonteCarloPlayer"),
+    "ismcts": ("src.player.ismcts_player", "ISMCTSPlayer"),
+    "endgame": ("src.player.endgame_player", "EndgamePlayer"),
+}
+
+def player_types() -> list:
+    """Names of the registered player types"""
+    return list(_PLAYER_TYPES)
+
+def register_player(name: str, module: str, class_name: str) -> None:
+    """Registers a player type. The module is imported on first use.
+
+    Args:
+        name (str): player type name, for example in Game seats
+        module (str): module of the Player subclass
+        class_name (str): name of the class in the module
+    """
+    _PLAYER_TYPES[name] = (module, class_name)
+
+def get_player_class(name: str) -> type:
+    """Returns the class of a player type, importing its module if needed
+
+    Args:
+        name (str): player type name
+
+    Raises:
+        ValueError: unknown player type
+
+    Returns:
+        type: the Player subclass
+    """
+    if name not in _PLAYER_TYPES:
+        raise ValueError(f'Unknown player type {name!r}, choose from {", ".join(_PLAYER_TYPES)}')
+    module, class_name = _PLAYER_TYPES[name]
+    return getattr(import_module(module), class_name)
+
+def create_player(name: str):
+    """Instantiates a player of a type
+
+    Args:
+        name (str): player type name
+
+    Returns:
+        Player: the new player
+    """
+    return get_player_class(name)()
@@ -1,18 +1,51 @@
 '''Reinforcement Learning Player for Golf'''
 
-import numpy as np
 from random import randint
-from stable_baselines3 import DQN
+
+import numpy as np
 # from gymnasium import spaces
+from .model_cache import default_model_path, get_model
+from .observation import encode_status, OBSERVATION_SIZE, PHASE_OBSERVATION_SIZE
+from .policy_cache import get_default_cache
 from .player import Player
 
 class RLPlayer(Player):
-    def __init__(self):
+    def __init__(self, model_path: str = None, device: str = "cpu", broker=None, cache=None):
+        """Creates a player using a trained DQN model. The model is loaded once per
+        process and shared by all RLPlayers, see model_cache.
+
+        Args:
+            model_path (str, optional): saved model. Defaults to None,
+            model_cache.default_model_path().
+            device (str, optional): torch device, cpu for compability. Defaults to "cpu".
+            broker (InferenceBroker, optional): evaluate the decisions in batches
+            with the decisions of other games through the broker, which also gives
+            the model. Defaults to None, one forward pass per decision.
+            cache (PolicyCache, optional): cache of the decisions of the model, it
+            must not be shared with players of other models. Defaults to None,
+            policy_cache.get_default_cache() if its tag is the model path. Players
+            with a broker only use a cache given here.
+
+        Raises:
+            ValueError: cache is tagged with another model path
+        """
         super().__init__()
-        # Load the trained RL model , use cpu for compability
-        self.model = DQN.load("golf_agent_1000000ep_DQN", device="cpu")
+        self.broker = broker
+        if broker is None:
+            path = model_path if model_path is not None else default_model_path()
+            if cache is None:
+                cache = get_default_cache(path)
+            elif cache.tag and cache.tag != path:
+                raise ValueError(f'Policy cache is for {cache.tag!r}, not {path!r}')
+        self.cache = cache
+        self.model = broker.model if broker is not None else get_model(model_path, device)
         self.internal_phase = 1  # keep track if you use a sub-step approach
         self.last_obs = None     # store the last observation from "phase 1"
+        # Models trained with action masking see the phase too
+        size = _observation_size(self.model)
+        self._phase_observation = size == PHASE_OBSERVATION_SIZE
+        # Observations are encoded into this buffer, the decisions copy what they keep
+        self._obs = np.zeros(size, dtype=np.int32)
 
     def get_player_name(self) -> str:
         return "RL Agent " + str(randint(1,10000))
@@ -27,7 +60,7 @@ class RLPlayer(Player):
         # We are in "draw" step => interpret the model's output accordingly.
         obs = self._encode_observation(game_status, phase=1)
         # print("[DEBUG]Next doing model predict draw, player:", self.name)
-        action, _ = self.model.predict(obs, deterministic=True)
+        action = self._predict(obs)
 
         # Decode the 'action' to "d" or "p" (depending on your training scheme)
         # For instance, if action==0 => "d", action==1 => "p"
@@ -35,7 +68,7 @@ class RLPlayer(Player):
 
         # Save any needed internal state if you do phase-based logic
         self.internal_phase = 2
-        self.last_obs = obs
+        self.last_obs = obs.copy()
 
         return draw_choice
 
@@ -47,7 +80,7 @@ class RLPlayer(Player):
         """
         obs = self._encode_observation(game_status, phase=2)
         # print("[DEBUG]Next doing model predict play, player:", self.name)
-        action, _ = self.model.predict(obs, deterministic=True)
+        action = self._predict(obs)
 
         # action -> either table position or discard
         if action == 9:
@@ -58,55 +91,34 @@ class RLPlayer(Player):
             play_choice = (row, col)
 
         self.internal_phase = 1
-        self.last_obs = obs
+        self.last_obs = obs.copy()
 
         return play_choice
 
+    def _predict(self, obs):
+        """Greedy action of the model, from the cache or through the broker if
+        there is one"""
+        if self.cache is not None:
+            action = self.cache.get(obs)
+            if action is not None:
+                return action
+        if self.broker is not None:
+            action = self.broker.predict(obs)
+        else:
+            action, _ = self.model.predict(obs, deterministic=True)
+        if self.cache is not None:
+            self.cache.put(obs, action)
+        return action
+
     def _encode_observation(self, game_status: dict, phase: int):
         """
-        Must replicate the EXACT same feature encoding you used
-        in your GolfTrainEnv during training. 
-        For example, turn the table cards + top discard + 'hand_card' if needed
-        into a numeric vector. 
-        If you used sub-step phases in training, incorporate that logic here.
+        Same feature encoding as the GolfTrainEnv used in training, see
+        observation.encode_observation. The phase shows in the hand card, which
+        is missing in the draw phase, and is added for models trained with
+        action masking.
         """
-        # e.g., create a numpy array of length 10 (or whatever shape).
-        def conv_value(card_str : str) -> int:
-            # Convert card string to numeric value.
-            if card_str[0] == "X":
-                return 20 # 20 is nonvisible card
-            else:
-                return int(card_str[1:])
-        def table_card_stack_to_list(table_cards : list) -> list:
-            # Convert table card stacks to a list of integers.
-            rows_missing = 3 - len(table_cards)
-            res = []
-            for row in table_cards:
-                # print(row)
-                res.extend([conv_value(card) for card in row])
-            for row in range(rows_missing):
-                res.extend([0,0,0]) # simulate removed row with kings
-            return res
-        observation_array = []
-        if "hand_card" in game_status:
-            observation_array.append(game_status['hand_card'].value)
-        else:
-            observation_array.append(20) # no hand card
-        
-        # 2) Top of discard (played_top_card)
-        top_card_value = 20 # Missing top card, can happen in some strange situations, when card is taken from played deck when it has only one and no other card has yet been placed to it.
-        if "played_top_card" in game_status and game_status['played_top_card'] is not None:
-            top_card_value = game_status['played_top_card'].value
-        observation_array.append(top_card_value)
-
-        observation_array.extend(table_card_stack_to_list(game_status['player']))
-        observation_array.extend(table_card_stack_to_list(game_status['other_players'][0]))
-        # It seems like multiDiscrete only accepts positive integers, so we need to shift the values by 1. (king = 0)
-        observation_array = [x+1 for x in observation_array]
-        # print("OBS ARRAY: ", observation_array)
-        return np.array(observation_array, dtype=np.int32)
-        # TODO: add Suit as a attribute to the observation
-        # For future use, missing third player can be ones?
+        return encode_status(game_status, out=self._obs,
+                             phase=phase if self._phase_observation else None)
 
     def inform_game_result(self, win: bool, relative_score: int) -> None:
         """
@@ -123,4 +135,12 @@ class RLPlayer(Player):
             flip_col = randint(1, len(row))
             result.append((r + 1, flip_col))
 
-        return result  
\ No newline at end of file
+        return result
+
+def _observation_size(model) -> int:
+    """Number of observation variables of a DQN or a NumpyQNetwork, the 20 of
+    GolfTrainEnv for models that do not tell"""
+    nvec = getattr(model, 'nvec', None)
+    if nvec is None:
+        nvec = getattr(getattr(model, 'observation_space', None), 'nvec', None)
+    return OBSERVATION_SIZE if nvec is None else len(nvec)
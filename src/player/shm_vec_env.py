@@ -0,0 +1,245 @@
+'''Multiprocess stable_baselines3 VecEnv exchanging steps through shared memory'''
+
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import pickle
+import traceback
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from .golf_train_env import GolfTrainEnv
+
+# First byte of the messages to the workers, a step is followed by the actions
+_STEP = b'S'
+_CONTROL = b'C'
+# First byte of the replies, an error is followed by the pickled traceback
+_OK = b'K'
+_ERROR = b'E'
+
+class ShmVecEnv(VecEnv):
+    """Steps num_envs environments in worker processes, each worker owning a
+    contiguous block of them. The workers write observations, rewards and done
+    flags straight into one shared memory block, and only the actions cross the
+    pipes, as raw bytes, so nothing is pickled per step. Finished episodes are
+    reset in the worker, like SubprocVecEnv does.
+
+    Per step infos of the environments are not passed on, only the
+    'terminal_observation' and 'TimeLimit.truncated' of finished episodes that
+    stable_baselines3 needs. reset, seed, get_attr, set_attr and env_method go
+    through the pipes pickled, like in SubprocVecEnv.
+    """
+    def __init__(self, num_envs: int, env_fn=GolfTrainEnv, workers: int = None,
+                 start_method: str = None, quiet: bool = True) -> None:
+        """Starts the workers
+
+        Args:
+            num_envs (int): number of environments
+            env_fn (callable, optional): picklable function creating one gymnasium
+            environment with a Discrete action space. Defaults to GolfTrainEnv.
+            workers (int, optional): number of worker processes. Defaults to None,
+            the number of cores, at most num_envs.
+            start_method (str, optional): multiprocessing start method. Defaults to
+            None, forkserver if available, else spawn.
+            quiet (bool, optional): discard the output of the environments, which
+            GolfTrainEnv prints at the end of every episode. Defaults to True.
+        """
+        probe = env_fn()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        workers = max(1, min(workers or os.cpu_count() or 1, num_envs))
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        context = mp.get_context(start_method)
+        if start_method == "forkserver":
+            # The server imports stable_baselines3 and torch once and the workers
+            # fork from it, instead of every worker importing them
+            context.set_forkserver_preload([__name__])
+
+        self._obs_shape = observation_space.shape
+        self._obs_dtype = observation_space.dtype
+        self._buffer = context.RawArray('b', _buffer_size(num_envs, self._obs_shape, self._obs_dtype))
+        self._obs, self._terminal_obs, self._rewards, self._dones, self._truncated = _views(
+            self._buffer, num_envs, self._obs_shape, self._obs_dtype)
+
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        self._slices = [slice(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+        self._remotes = []
+        self._processes = []
+        for block in self._slices:
+            remote, worker_remote = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(worker_remote, env_fn, self._buffer, num_envs, block,
+                                            self._obs_shape, self._obs_dtype, quiet))
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+        self.closed = False
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _control(self, command: str, data=None, workers=None) -> list:
+        """Sends a pickled command to the workers and returns their replies"""
+        workers = range(len(self._remotes)) if workers is None else workers
+        message = _CONTROL + pickle.dumps((command, data))
+        for worker in workers:
+            self._remotes[worker].send_bytes(message)
+        return [_reply(self._remotes[worker]) for worker in workers]
+
+    def reset(self):
+        seeds = [self._seeds[block] for block in self._slices]
+        options = [self._options[block] for block in self._slices]
+        replies = []
+        for worker, remote in enumerate(self._remotes):
+            remote.send_bytes(_CONTROL + pickle.dumps(("reset", (seeds[worker], options[worker]))))
+        for remote in self._remotes:
+            replies.extend(_reply(remote))
+        self.reset_infos = replies
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        actions = np.ascontiguousarray(actions, dtype=np.int64)
+        for remote, block in zip(self._remotes, self._slices):
+            remote.send_bytes(_STEP + actions[block].tobytes())
+
+    def step_wait(self):
+        for remote in self._remotes:
+            _reply(remote)
+        dones = self._dones.copy()
+        infos = [{} for _ in range(self.num_envs)]
+        for index in np.flatnonzero(dones):
+            infos[index] = {'terminal_observation': self._terminal_obs[index].copy(),
+                            'TimeLimit.truncated': bool(self._truncated[index])}
+        return self._obs.copy(), self._rewards.copy(), dones, infos
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        for remote in self._remotes:
+            remote.send_bytes(_CONTROL + pickle.dumps(("close", None)))
+        for process in self._processes:
+            process.join()
+        for remote in self._remotes:
+            remote.close()
+        self.closed = True
+
+    def _workers_of(self, indices) -> dict:
+        """Worker -> local indices of the environments"""
+        by_worker = {}
+        for index in self._get_indices(indices):
+            for worker, block in enumerate(self._slices):
+                if block.start <= index < block.stop:
+                    by_worker.setdefault(worker, []).append(index - block.start)
+        return by_worker
+
+    def _call(self, command: str, data, indices) -> list:
+        by_worker = self._workers_of(indices)
+        results = []
+        for worker, local in by_worker.items():
+            results.extend(self._control(command, (local, data), [worker])[0])
+        return results
+
+    def get_attr(self, attr_name: str, indices=None) -> list:
+        return self._call("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name: str, value, indices=None) -> None:
+        self._call("set_attr", (attr_name, value), indices)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> list:
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> list:
+        return self._call("is_wrapped", wrapper_class, indices)
+
+def _buffer_size(num_envs: int, obs_shape: tuple, obs_dtype) -> int:
+    obs_bytes = num_envs * int(np.prod(obs_shape)) * np.dtype(obs_dtype).itemsize
+    return 2 * obs_bytes + num_envs * (np.dtype(np.float32).itemsize + 2)
+
+def _views(buffer, num_envs: int, obs_shape: tuple, obs_dtype) -> tuple:
+    """Observations, terminal observations, rewards, done and truncated flags in
+    the shared buffer"""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    obs_bytes = num_envs * int(np.prod(obs_shape)) * np.dtype(obs_dtype).itemsize
+    offset = 0
+    views = []
+    for size, dtype, shape in ((obs_bytes, obs_dtype, (num_envs,) + obs_shape),
+                               (obs_bytes, obs_dtype, (num_envs,) + obs_shape),
+                               (4 * num_envs, np.float32, (num_envs,)),
+                               (num_envs, np.bool_, (num_envs,)),
+                               (num_envs, np.bool_, (num_envs,))):
+        views.append(data[offset:offset + size].view(dtype).reshape(shape))
+        offset += size
+    return tuple(views)
+
+def _reply(remote) -> list:
+    """Waits for the reply of a worker, raises the errors of the worker"""
+    message = remote.recv_bytes()
+    if message[:1] == _ERROR:
+        raise RuntimeError(f'ShmVecEnv worker failed:\n{pickle.loads(message[1:])}')
+    return pickle.loads(message[1:]) if len(message) > 1 else None
+
+def _worker(remote, env_fn, buffer, num_envs: int, block: slice, obs_shape: tuple, obs_dtype,
+            quiet: bool) -> None:
+    from stable_baselines3.common.env_util import is_wrapped
+    obs, terminal_obs, rewards, dones, truncated = (view[block] for view in _views(
+        buffer, num_envs, obs_shape, obs_dtype))
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext() as output:
+        envs = [env_fn() for _ in range(block.stop - block.start)]
+        while True:
+            try:
+                message = remote.recv_bytes()
+            except EOFError:
+                break
+            try:
+                if quiet:
+                    output.seek(0)
+                    output.truncate()
+                if message[:1] == _STEP:
+                    actions = np.frombuffer(message, dtype=np.int64, offset=1)
+                    for index, (env, action) in enumerate(zip(envs, actions)):
+                        observation, reward, terminated, was_truncated, _ = env.step(int(action))
+                        done = terminated or was_truncated
+                        if done:
+                            terminal_obs[index] = observation
+                            observation, _ = env.reset()
+                        obs[index] = observation
+                        rewards[index] = reward
+                        dones[index] = done
+                        truncated[index] = was_truncated and not terminated
+                    remote.send_bytes(_OK)
+                    continue
+                command, data = pickle.loads(message[1:])
+                if command == "close":
+                    for env in envs:
+                        env.close()
+                    remote.send_bytes(_OK)
+                    break
+                if command == "reset":
+                    seeds, options = data
+                    infos = []
+                    for index, (env, seed, env_options) in enumerate(zip(envs, seeds, options)):
+                        observation, info = env.reset(seed=seed, **({"options": env_options} if env_options else {}))
+                        obs[index] = observation
+                        infos.append(info)
+                    result = infos
+                else:
+                    local, data = data
+                    selected = [envs[index] for index in local]
+                    if command == "get_attr":
+                        result = [env.get_wrapper_attr(data) for env in selected]
+                    elif command == "set_attr":
+                        result = [setattr(env, data[0], data[1]) for env in selected]
+                    elif command == "env_method":
+                        name, args, kwargs = data
+                        result = [env.get_wrapper_attr(name)(*args, **kwargs) for env in selected]
+                    elif command == "is_wrapped":
+                        result = [is_wrapped(env, data) for env in selected]
+                    else:
+                        raise ValueError(f'Unknown command {command}')
+                remote.send_bytes(_OK + pickle.dumps(result))
+            except Exception:  # pylint: disable=broad-except
+                remote.send_bytes(_ERROR + pickle.dumps(traceback.format_exc()))
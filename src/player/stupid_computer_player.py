@@ -1,6 +1,7 @@
 '''Very stupid computer player class. In practice random choosing of action'''
 
 from random import choice, randint, random
+from src.game.status import as_game_status
 from .player import Player
 
 class StupidComputerPlayer(Player):
@@ -31,7 +32,7 @@ class StupidComputerPlayer(Player):
         at table cards.
         """
         choices = [("p", None)]
-        for row, _ in enumerate(range(1, len(game_status['player'])+1)):
+        for row in range(as_game_status(game_status).row_count):
             for column in range(1, 4):
                 choices.append((row, column))
         return choice(choices)
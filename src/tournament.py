@@ -0,0 +1,258 @@
+'''Tournament runner playing many Golf games on all cores'''
+
+import argparse
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from src.game import Game, GameRecorder, GameProfiler
+from src.game.game import MAX_TURNS
+from src.player.model_cache import get_model, default_model_path, set_default_model_path
+from src.player.policy_cache import PolicyCache, get_default_cache, set_default_cache
+from src.player.registry import player_types, create_player
+
+# Quantiles of game length reported in the summary
+TURN_QUANTILES = [0.25, 0.5, 0.75, 1.0]
+
+def play_chunk(seats: list, first_game: int, num_games: int, seed: int = None,
+               rotate: bool = False, record_path: str = None, profile: bool = False,
+               rl_model: str = None, rl_cache: int = None, max_turns: int = MAX_TURNS) -> dict:
+    """Plays games first_game ... first_game + num_games - 1 of a tournament. Runs
+    in a worker process.
+
+    Args:
+        seats (list): player type names, one per seat
+        first_game (int): index of the first game, used for seeds and rotation
+        num_games (int): number of games to play
+        seed (int, optional): tournament seed, each game gets its own seed from it.
+        Defaults to None, random.
+        rotate (bool, optional): rotate the seating order by the game index instead
+        of shuffling it. Defaults to False.
+        record_path (str, optional): file to append the game records to. Defaults
+        to None, no recording.
+        profile (bool, optional): time the phases of the games. Defaults to False.
+        rl_model (str, optional): model of the rl seats. Defaults to None, the
+        default model.
+        rl_cache (int, optional): size of the decision cache of the rl seats, kept
+        by the worker process between chunks. Defaults to None, no cache.
+        max_turns (int, optional): rounds after which a game is stopped unfinished.
+        Defaults to MAX_TURNS.
+
+    Returns:
+        dict: columns 'turns', 'winner' (index in seats), 'truncated' (1 for a game
+        stopped at max_turns) and 'scores' (one column per seat), 'profile', a
+        GameProfiler report, if profiled and 'policy_cache', [hits, misses] of the
+        chunk, with rl_cache
+    """
+    if rl_model is not None:
+        set_default_model_path(rl_model)
+    cache = None
+    if rl_cache:
+        cache = get_default_cache()
+        if cache is None or cache.maxsize != rl_cache or cache.tag != default_model_path():
+            cache = PolicyCache(rl_cache, tag=default_model_path())
+            set_default_cache(cache)
+        hits, misses = cache.hits, cache.misses
+    recorder = GameRecorder(record_path) if record_path is not None else None
+    profiler = GameProfiler() if profile else None
+    results = {
+        'turns': array('H'),
+        'winner': array('b'),
+        'truncated': array('b'),
+        'scores': [array('H') for _ in seats],
+    }
+    for game_index in range(first_game, first_game + num_games):
+        game_seed = None if seed is None else seed * 1_000_003 + game_index
+        if game_seed is not None:
+            # The heuristic players use the module-global random. Seeding per game
+            # keeps the results independent of the chunking
+            random.seed(game_seed)
+        players = [create_player(seat) for seat in seats]
+        seat_index = {id(player): index for index, player in enumerate(players)}
+        if rotate:
+            shift = game_index % len(players)
+            players = players[shift:] + players[:shift]
+        game = Game(len(players), players=players, shuffle_players=not rotate,
+                    silent_mode=True, seed=game_seed, recorder=recorder, profiler=profiler)
+        turns, _, _ = game.play_game(max_turns)
+        results['turns'].append(turns)
+        results['winner'].append(seat_index[id(game.players[game.engine.winner()])])
+        results['truncated'].append(game.truncated)
+        for seat, player in enumerate(game.players):
+            results['scores'][seat_index[id(player)]].append(game.engine.score(seat))
+    if recorder is not None:
+        recorder.close()
+    if profiler is not None:
+        results['profile'] = profiler.report()
+    if cache is not None:
+        results['policy_cache'] = [cache.hits - hits, cache.misses - misses]
+    return results
+
+def run_tournament(num_games: int, seats: list, workers: int = None, chunk_size: int = None,
+                   seed: int = None, rotate: bool = False, record_path: str = None,
+                   profiler: GameProfiler = None, rl_model: str = None,
+                   rl_cache: int = None, max_turns: int = MAX_TURNS) -> dict:
+    """Plays num_games games split in chunks over a process pool and collects the
+    results column-wise
+
+    Args:
+        num_games (int): number of games
+        seats (list): player type names, one per seat: 'stupid', 'computer',
+        'advanced' or 'rl'
+        workers (int, optional): number of worker processes, 1 plays in this
+        process. Defaults to None, the number of cores.
+        chunk_size (int, optional): games per task. Defaults to None, a few tasks
+        per worker.
+        seed (int, optional): seed for reproducible tournaments. Defaults to None.
+        rotate (bool, optional): rotate seats instead of shuffling. Defaults to False.
+        record_path (str, optional): file to append a record of every game to, see
+        GameRecorder. Defaults to None.
+        profiler (GameProfiler, optional): collects the phase timings of all games
+        from the workers. Defaults to None.
+        rl_model (str, optional): saved model of the rl seats. Defaults to None, the
+        default model of RLPlayer.
+        rl_cache (int, optional): entries of the decision cache of the rl seats in
+        each worker, see PolicyCache. Defaults to None, no cache.
+        max_turns (int, optional): rounds after which a game is stopped unfinished
+        and scored as it stands. Defaults to MAX_TURNS.
+
+    Raises:
+        ValueError: invalid seats
+
+    Returns:
+        dict: numpy arrays 'turns' (N,), 'winner' (N,), 'truncated' (N,) booleans
+        and 'scores' (N, seats), and with rl_cache 'policy_cache', {'hits',
+        'misses'} of all workers
+    """
+    if len(seats) < 2 or len(seats) > 3:
+        raise ValueError('Number of players must be 2-3')
+    # Human players would wait for input in the workers
+    unknown = set(seats) - (set(player_types()) - {"human"})
+    if unknown:
+        raise ValueError(f'Unknown player types: {", ".join(sorted(unknown))}')
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(1000, -(-num_games // (workers * 8))))
+    firsts = list(range(0, num_games, chunk_size))
+    counts = [min(chunk_size, num_games - first) for first in firsts]
+
+    if "rl" in seats:
+        # Loaded before the pool forks, the workers share the weights instead of
+        # each loading the model
+        get_model(rl_model)
+
+    columns = {'turns': array('H'), 'winner': array('b'), 'truncated': array('b'),
+               'scores': [array('H') for _ in seats], 'policy_cache': [0, 0]}
+    if workers == 1:
+        for first, count in zip(firsts, counts):
+            _merge_columns(columns, play_chunk(seats, first, count, seed, rotate, record_path,
+                                               profiler is not None, rl_model, rl_cache, max_turns),
+                           profiler)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(play_chunk, repeat(seats), firsts, counts,
+                                       repeat(seed), repeat(rotate), repeat(record_path),
+                                       repeat(profiler is not None), repeat(rl_model),
+                                       repeat(rl_cache), repeat(max_turns)):
+                _merge_columns(columns, result, profiler)
+    results = {
+        'turns': np.frombuffer(columns['turns'], dtype=np.uint16).astype(np.int64),
+        'winner': np.frombuffer(columns['winner'], dtype=np.int8).astype(np.int64),
+        'truncated': np.frombuffer(columns['truncated'], dtype=np.int8).astype(bool),
+        'scores': np.stack([np.frombuffer(column, dtype=np.uint16) for column in columns['scores']],
+                           axis=1).astype(np.int64),
+    }
+    if rl_cache:
+        results['policy_cache'] = dict(zip(('hits', 'misses'), columns['policy_cache']))
+    return results
+
+def _merge_columns(columns: dict, result: dict, profiler: GameProfiler = None) -> None:
+    if profiler is not None:
+        profiler.merge_report(result['profile'])
+    if 'policy_cache' in result:
+        columns['policy_cache'] = [total + count for total, count
+                                   in zip(columns['policy_cache'], result['policy_cache'])]
+    columns['turns'].extend(result['turns'])
+    columns['winner'].extend(result['winner'])
+    columns['truncated'].extend(result['truncated'])
+    for column, scores in zip(columns['scores'], result['scores']):
+        column.extend(scores)
+
+def _seat_label(seats: list, index: int) -> str:
+    seat = seats[index]
+    if seats.count(seat) == 1:
+        return seat.capitalize()
+    return f"{seat.capitalize()} (seat {index + 1})"
+
+def summarize(results: dict, seats: list) -> str:
+    """Text summary of a tournament: turn quartiles, winning percentages and the
+    number of games stopped unfinished, if any
+
+    Args:
+        results (dict): result of run_tournament
+        seats (list): player type names, one per seat
+
+    Returns:
+        str: the summary
+    """
+    lines = ["Turns quartiles:"]
+    for quantile, turns in zip(TURN_QUANTILES, np.quantile(results['turns'], TURN_QUANTILES)):
+        lines.append(f"{quantile:<6}{turns:>8}")
+    for index in range(len(seats)):
+        lines.append(f"{_seat_label(seats, index)} winning percentage: "
+                     f"{(results['winner'] == index).mean() * 100}")
+    for index in range(len(seats)):
+        lines.append(f"{_seat_label(seats, index)} mean score: {results['scores'][:, index].mean():.2f}")
+    truncated = int(results['truncated'].sum()) if 'truncated' in results else 0
+    if truncated:
+        lines.append(f"Unfinished games stopped at the turn limit: {truncated}")
+    return "\n".join(lines)
+
+def main(argv: list = None) -> None:
+    """Entry point of golf-tournament"""
+    parser = argparse.ArgumentParser(description="Play a tournament of Golf games on all cores")
+    parser.add_argument("--games", type=int, default=100, help="number of games")
+    parser.add_argument("--seats", nargs="+", default=["advanced", "stupid"],
+                        help="player types, one per seat: stupid, computer, advanced, rl")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, default all cores")
+    parser.add_argument("--chunk-size", type=int, default=None, help="games per task")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible tournament")
+    parser.add_argument("--rotate", action="store_true",
+                        help="rotate the seating order instead of shuffling it")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="append a replayable record of every game to this file")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="JSON",
+                        help="time the phases of the games, print a summary or write JSON to a file")
+    parser.add_argument("--rl-model", default=None, metavar="PATH",
+                        help="saved model of the rl seats, default $GOLF_RL_MODEL or the bundled model")
+    parser.add_argument("--rl-cache", type=int, default=None, metavar="SIZE",
+                        help="cache up to SIZE decisions of the rl seats per worker")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, metavar="N",
+                        help=f"stop games that have not ended after N rounds, default {MAX_TURNS}")
+    args = parser.parse_args(argv)
+
+    profiler = GameProfiler() if args.profile is not None else None
+    start = time.perf_counter()
+    results = run_tournament(args.games, args.seats, args.workers, args.chunk_size,
+                             args.seed, args.rotate, args.record, profiler, args.rl_model,
+                             args.rl_cache, args.max_turns)
+    elapsed = time.perf_counter() - start
+    print(f"Played {args.games} games in {elapsed:.2f} s ({args.games / elapsed:.0f} games/s)")
+    print(summarize(results, args.seats))
+    if 'policy_cache' in results:
+        hits, misses = results['policy_cache']['hits'], results['policy_cache']['misses']
+        print(f"RL decision cache hit rate: {hits / max(1, hits + misses):.1%} ({hits} of {hits + misses})")
+    if profiler is not None:
+        if args.profile == "-":
+            print(profiler.summary())
+        else:
+            with open(args.profile, "w", encoding="utf-8") as file:
+                file.write(profiler.to_json())
+
+if __name__ == '__main__':
+    main()
@@ -12,9 +12,9 @@ class View():
         self._silent_mode = silent_mode
 
     def _display_rows(self, row : list) -> None:
-        """Displays a row of cards"""
+        """Displays a row of cards, or of card strings like '♤10' and 'XX'"""
         if not self._silent_mode:
-            print(row)
+            print(f"[{', '.join(map(str, row))}]")
 
     def show_for_player(self, player) -> None:
         if self._silent_mode:
@@ -25,13 +25,13 @@ class View():
                 continue
             else:
                 print(f"{iter_players.name}:")
-                for row in iter_players.table_cards:
+                for row in self._game.table_cards_strs(iter_players):
                     self._display_rows(row)
         print("Player's cards: ")
-        for row in player.table_cards:
+        for row in self._game.table_cards_strs(player):
             self._display_rows(row)
-        print("last played card: ", self._game.deck.played_cards[-1])
-        print("Cards in dealing deck: ", len(self._game.deck.drawing_deck))
+        print("last played card: ", self._game.deck.get_last_played_card())
+        print("Cards in dealing deck: ", self._game.deck.drawing_count)
 
     def output(self, message : str) -> None:
         '''Output a message to the console respecting the silent mode'''
@@ -0,0 +1,96 @@
+'''Tests for the vectorized BatchSimulator'''
+
+import numpy as np
+import pytest
+
+from src.game.batch import BatchSimulator, AdvancedBatchPolicy, StupidBatchPolicy, DISCARD
+
+
+def card_counts(sim, game):
+    """Counts of each value in the tables, drawing deck and played deck of a game"""
+    values = list(sim.values[game].ravel())
+    values += list(sim.deck[game, sim.cursor[game]:])
+    values += list(sim.played[game, :sim.played_count[game]])
+    return np.bincount(values, minlength=13)
+
+
+def test_invalid_number_of_players():
+    with pytest.raises(ValueError):
+        BatchSimulator(10, ["stupid"])
+
+
+def test_deal():
+    sim = BatchSimulator(50, ["advanced", "stupid", "stupid"], seed=1)
+    assert (sim.visible.sum(axis=(2, 3)) == 3).all()
+    assert (sim.played_count == 1).all()
+    assert (sim.cursor == 28).all()
+    assert (card_counts(sim, 0) == 4).all()
+
+
+def test_run_completes_all_games():
+    sim = BatchSimulator(500, ["advanced", "stupid"], seed=2)
+    result = sim.run()
+    assert sim.done.all()
+    assert (result['turns'] > 0).all()
+    assert result['scores'].shape == (500, 2)
+    # Some player has all cards visible in every game
+    assert sim.finished.any(axis=1).all()
+    scores = result['scores']
+    assert (scores[np.arange(500), result['winner']] == scores.min(axis=1)).all()
+    for game in range(0, 500, 50):
+        assert (card_counts(sim, game) == 4).all()
+
+
+def test_seeded_runs_are_reproducible():
+    result1 = BatchSimulator(200, ["advanced", "advanced"], seed=3).run()
+    result2 = BatchSimulator(200, ["advanced", "advanced"], seed=3).run()
+    assert (result1['turns'] == result2['turns']).all()
+    assert (result1['scores'] == result2['scores']).all()
+
+
+def test_max_turns():
+    result = BatchSimulator(200, ["stupid", "stupid"], seed=4).run(max_turns=2)
+    assert (result['turns'] <= 2).all()
+
+
+def test_drawing_from_empty_decks():
+    sim = BatchSimulator(3, ["stupid", "stupid"], seed=6)
+    games = np.arange(3)
+    sim.played_count[1] = 0
+    with pytest.raises(ValueError):
+        sim.draw(games, np.ones(3, dtype=bool))
+    sim.cursor[1] = 52
+    with pytest.raises(ValueError):
+        sim.draw(games, np.zeros(3, dtype=bool))
+    # Nothing was drawn in the failed draws
+    assert list(sim.played_count) == [1, 0, 1]
+    assert list(sim.cursor) == [19, 52, 19]
+
+
+def test_advanced_completes_row():
+    sim = BatchSimulator(1, ["advanced", "stupid"], seed=5)
+    sim.values[0, 0] = [[4, 4, 9], [1, 2, 3], [5, 7, 8]]
+    sim.visible[0, 0] = True
+    slot = AdvancedBatchPolicy().play_action(sim, np.array([0]), 0, np.array([4], dtype=np.int8))
+    assert slot[0] == 2
+
+
+def test_stupid_plays_only_rows_in_play():
+    sim = BatchSimulator(1000, ["stupid", "stupid"], seed=6)
+    sim.alive[:, 0, 1] = False
+    slots = StupidBatchPolicy().play_action(sim, np.arange(1000), 0, np.zeros(1000, dtype=np.int8))
+    placed = slots[slots != DISCARD]
+    assert len(placed) > 0
+    assert not np.isin(placed // 3, [1]).any()
+
+
+def test_rl_training_mode_replaces_full_rows():
+    sim = BatchSimulator(1, ["stupid", "stupid"], seed=2, rl_training_mode=True)
+    sim.values[0, 0] = [[5, 5, 1], [7, 8, 9], [2, 3, 4]]
+    sim.visible[0, 0] = [[True, True, False], [True, True, True], [False, False, False]]
+    sim.place(np.array([0]), 0, np.array([5], dtype=np.int8), np.array([2]))
+    # The first row is removed, the others shift up and nonvisible kings fill the end
+    assert sim.values[0, 0].tolist() == [[7, 8, 9], [2, 3, 4], [0, 0, 0]]
+    assert sim.visible[0, 0, 2].tolist() == [False, False, False]
+    assert sim.alive[0, 0].all()
+    assert not sim.finished[0, 0]
@@ -0,0 +1,27 @@
+'''Tests for the behavior cloning pretrainer'''
+
+import numpy as np
+import pytest
+from stable_baselines3 import DQN
+
+from src.player.behavior_cloning import pretrain
+from src.player.golf_train_env import GolfTrainEnv
+from src.player.heuristic_dataset import generate_dataset, ShardDataset
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("dataset"))
+    generate_dataset(path, 300, workers=1, num_envs=64, shard_size=4096, seed=0)
+    return ShardDataset(path)
+
+
+@pytest.mark.parametrize("action_masking", [False, True])
+def test_pretrain_imitates_the_teacher(dataset, action_masking):
+    model = DQN("MlpPolicy", GolfTrainEnv(action_masking=action_masking), device="cpu", seed=0)
+    history = pretrain(model, dataset, epochs=3, batch_size=256, seed=0)
+    assert len(history) == 3
+    assert history[-1]['accuracy'] > history[0]['accuracy']
+    assert history[-1]['accuracy'] > 0.6
+    for online, target in zip(model.q_net.parameters(), model.q_net_target.parameters()):
+        assert np.array_equal(online.detach().numpy(), target.detach().numpy())
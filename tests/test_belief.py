@@ -0,0 +1,156 @@
+'''Tests for the card counting of the unseen cards'''
+
+import random
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from src.card import CARD_VALUES, Card, Suit
+from src.game import Game, HIDDEN
+from src.game.belief import BeliefTracker, DECK_MEAN
+from src.game.engine import TABLE_SIZE, COLUMNS
+from src.player.advanced_computer_player import AdvancedComputerPlayer
+from src.player.computer_player import ComputerPlayer
+
+
+def test_counts_and_mean():
+    tracker = BeliefTracker()
+    assert tracker.hidden_mean() == DECK_MEAN == 6
+    for value in (12, 12, 0):
+        tracker.reveal(value)
+    assert tracker.unseen_count == 49
+    assert tracker.hidden_mean() == pytest.approx((312 - 24) / 49)
+    assert tracker.probability(12) == pytest.approx(2 / 49)
+
+
+def test_reshuffled_cards_are_not_unseen():
+    tracker = BeliefTracker()
+    for value in (3, 7):
+        tracker.reveal(value)
+        tracker.discard(value)
+    tracker.take_played(7)
+    tracker.reshuffle()
+    assert tracker.reshuffled[3] == 1 and tracker.reshuffled_count == 1
+    assert tracker.played == [0] * 13
+    # The nonvisible table cards are not the reshuffled 3
+    assert tracker.unseen[3] == 3 and tracker.unseen_sum == 312 - 10
+    assert tracker.hidden_mean() == pytest.approx((312 - 10) / 50)
+    # but the drawing deck holds only it
+    assert tracker.probability(3) == 1
+    tracker.draw(3)
+    assert tracker.reshuffled_count == 0 and tracker.unseen[3] == 3
+    # Then the next card comes from the played deck, reshuffled again
+    assert tracker.probability(3) == 0
+    tracker.discard(3)
+    assert tracker.probability(3) == 1
+
+
+def test_cards_beyond_the_deck_are_ignored():
+    tracker = BeliefTracker()
+    for _ in range(5):
+        tracker.reveal(0)
+    assert tracker.unseen[0] == 0 and tracker.unseen_count == 48
+
+
+def test_row_completion():
+    tracker = BeliefTracker()
+    tracker.reveal(5)
+    tracker.reveal(5)
+    assert tracker.row_completion([5, 5, HIDDEN]) == pytest.approx(2 / 50)
+    assert tracker.row_completion([5, 9, 5]) == pytest.approx(2 / 50)
+    # Two nines are more likely to come than two fives
+    assert tracker.row_completion([5, 9, HIDDEN]) == pytest.approx(4 / 50 * 3 / 49)
+    assert tracker.row_completion([HIDDEN] * 3) == pytest.approx(
+        (2 * 1 * 0 + 12 * 4 * 3 * 2) / (50 * 49 * 48))
+    tracker.reveal(5)
+    tracker.reveal(5)
+    assert tracker.row_completion([5, 5, 1]) == 0
+    # After a reshuffle the deck holds only the reshuffled cards
+    for value in (5, 5, 9):
+        tracker.discard(value)
+    tracker.reshuffle()
+    assert tracker.row_completion([5, 5, 1]) == pytest.approx(2 / 3)
+    assert tracker.row_completion([5, 9, HIDDEN]) == pytest.approx(2 / 3 * 1 / 2)
+
+
+def unseen_cards(engine):
+    """Values of the drawing deck cards never dealt and the nonvisible table cards"""
+    drawing = engine.deck.drawing_ids()
+    values = [CARD_VALUES[card_id] for card_id in drawing[:len(drawing) - engine.deck.reshuffled_count]]
+    for seat in range(engine.num_players):
+        for index in range(seat * TABLE_SIZE, seat * TABLE_SIZE + engine.row_count[seat] * COLUMNS):
+            if not engine.visible[index]:
+                values.append(CARD_VALUES[engine.table[index]])
+    return Counter(values)
+
+
+def reshuffled_cards(engine):
+    """Values of the drawing deck cards that came from the played deck"""
+    drawing = engine.deck.drawing_ids()
+    return Counter(CARD_VALUES[card_id] for card_id in drawing[len(drawing) - engine.deck.reshuffled_count:])
+
+
+def test_game_keeps_the_trackers_up_to_date():
+    reshuffles = 0
+    for seed in range(30):
+        random.seed(seed)
+        players = [AdvancedComputerPlayer(), ComputerPlayer(), AdvancedComputerPlayer()]
+        game = Game(players=players, silent_mode=True, seed=seed)
+        engine = game.engine
+        game_ended = False
+        rounds = 0
+        # Heuristic players can get stuck in a game without an end
+        while not game_ended and rounds < 500:
+            rounds += 1
+            for player in game.players:
+                drawing_count = engine.deck.drawing_count
+                game.player_plays_turn(player)
+                reshuffles += engine.deck.drawing_count > drawing_count
+                truth = unseen_cards(engine)
+                reshuffled = reshuffled_cards(engine)
+                for tracker in (player.belief for player in players):
+                    assert tracker.unseen == [truth[value] for value in range(13)]
+                    assert tracker.reshuffled == [reshuffled[value] for value in range(13)]
+                    assert tracker.played == [Counter(card.value for card in engine.deck.played_cards)[value]
+                                              for value in range(13)]
+                game_ended = engine.end_turn()
+    assert reshuffles > 0
+
+
+def test_players_use_the_tracker():
+    player = AdvancedComputerPlayer()
+    assert player._parse_value(HIDDEN) == 6
+    player.belief.reveal(0)
+    assert player._parse_value(HIDDEN) == pytest.approx(312 / 51)
+    assert player._parse_value(3) == 3
+
+
+def test_hidden_cards_are_replaced_when_the_unseen_cards_are_low():
+    player = AdvancedComputerPlayer()
+    # Only a 2, a king and an ace are left unseen, their mean is 1
+    for value in range(13):
+        for _ in range(4 - (value in (0, 1, 2))):
+            player.belief.reveal(value)
+    assert player.belief.hidden_mean() == 1
+    status = {"player": [["♤6", "XX", "♤7"]], "other_players": [], "played_top_card": None,
+              "hand_card": Card(Suit.HEARTS, 5)}
+    with patch("src.player.advanced_computer_player.random", return_value=0):
+        assert player.get_play_action(status) == (1, 2)
+
+
+def test_advanced_players_finish_their_games():
+    # Seed 1804 after these games never ended when hidden cards were only
+    # replaced by hand cards below the mean of the unseen cards
+    random.seed(0)
+    for seed in range(1805):
+        game = Game(seats=["advanced", "advanced"], silent_mode=True, seed=seed)
+        engine = game.engine
+        game_ended = False
+        rounds = 0
+        while not game_ended and rounds < 1000:
+            rounds += 1
+            for player in game.players:
+                game.player_plays_turn(player)
+                game_ended = engine.end_turn()
+        assert game_ended, seed
@@ -0,0 +1,27 @@
+'''Tests for the benchmark comparison'''
+
+from benchmarks.__main__ import main
+from benchmarks.compare import compare
+
+
+def result(value, higher_is_better=True):
+    return {'value': value, 'unit': 'x', 'higher_is_better': higher_is_better}
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {'games': result(100.0), 'latency': result(10.0, False), 'env': result(50.0)}
+    current = {'games': result(85.0), 'latency': result(10.5, False), 'new': result(1.0)}
+    rows = {row[0]: row for row in compare(baseline, current, threshold=0.1)}
+    assert set(rows) == {'games', 'latency'}
+    assert rows['games'][4]
+    assert abs(rows['latency'][3] + 0.05) < 1e-9
+    assert not rows['latency'][4]
+
+
+def test_compare_command_exit_status(tmp_path):
+    baseline = tmp_path / "base.json"
+    current = tmp_path / "current.json"
+    baseline.write_text('{"results": {"games": {"value": 100, "unit": "games/s", "higher_is_better": true}}}')
+    current.write_text('{"results": {"games": {"value": 80, "unit": "games/s", "higher_is_better": true}}}')
+    assert main(["compare", str(baseline), str(current)]) == 1
+    assert main(["compare", str(baseline), str(current), "--threshold", "0.25"]) == 0
@@ -1,7 +1,9 @@
 '''Test card.py '''
 
+import pickle
+
 import pytest
-from src.card import Card, Suit
+from src.card import Card, Suit, CARDS, card_str
 
 
 def test_card_creation():
@@ -13,24 +15,62 @@ def test_card_creation():
 def test_card_string_representation():
     '''Test string representation of a card'''
     card = Card(Suit.HEARTS, 5)
-    card.visible = True
     assert str(card) == "♡5"
     assert repr(card) == "♡5"
 
-def test_card_string_representation_not_visible():
+def test_card_str_not_visible():
     '''Test that the str representation of nonvisible
     card is "XX" '''
     card = Card(Suit.HEARTS, 6)
-    card.visible = False
-    assert str(card) == "XX"
-    assert repr(card) == "XX"
+    assert card_str(card, False) == "XX"
+    assert card_str(card, True) == "♡6"
 
 def test_card_equality():
     '''Test card equality'''
     card1 = Card(Suit.CLUBS, 8)
     card2 = Card(Suit.DIAMONDS, 8)
-    assert card1 == card2
-    assert card1 != Card(Suit.HEARTS, 7)
+    assert card1 != card2
+    assert card1.value == card2.value
+    assert card1 == Card(Suit.CLUBS, 8)
+
+def test_cards_are_interned():
+    '''Test that every suit and value has exactly one Card instance'''
+    assert Card(Suit.SPADES, 3) is Card(Suit.SPADES, 3)
+    assert len(set(CARDS)) == 52
+    for card_id, card in enumerate(CARDS):
+        assert card.id == card_id
+        assert Card.from_id(card_id) is card
+        assert Card(card.suit, card.value) is card
+
+def test_card_id():
+    '''Test that card id is suit index * 13 + value'''
+    assert Card(Suit.SPADES, 0).id == 0
+    assert Card(Suit.HEARTS, 5).id == 18
+    assert Card(Suit.CLUBS, 12).id == 51
+
+def test_card_hashable():
+    '''Test that cards can be used in sets and as dict keys'''
+    cache = {Card(Suit.SPADES, 1): "a", Card(Suit.HEARTS, 1): "b"}
+    assert cache[Card(Suit.SPADES, 1)] == "a"
+    assert len({Card(Suit.CLUBS, 2), Card(Suit.CLUBS, 2)}) == 1
+
+def test_card_immutable():
+    '''Test that cards cannot be modified'''
+    card = Card(Suit.SPADES, 10)
+    with pytest.raises(AttributeError):
+        card.value = 3
+    with pytest.raises(AttributeError):
+        card.visible = True
+
+def test_card_pickle_keeps_interning():
+    '''Test that unpickled cards are the interned instances'''
+    card = Card(Suit.DIAMONDS, 7)
+    assert pickle.loads(pickle.dumps(card)) is card
+
+def test_invalid_value():
+    '''Test that invalid values raise ValueError'''
+    with pytest.raises(ValueError):
+        Card(Suit.SPADES, 13)
 
 def test_card_comparison():
     '''Test card comparison'''
@@ -1,5 +1,7 @@
 '''Tests for the CardDeck class.'''
 
+import random
+
 import pytest
 
 from src.card_deck import CardDeck, Card, Suit
@@ -70,4 +72,71 @@ def test_both_draw_from_played():
     deck.deal_first_card()  # Adds one card to played_cards
     last_card1 = deck.get_last_played_card()
     last_card2 = deck.draw_from_played()
-    assert last_card1 == last_card2, "both last card methods return the same Card"
\ No newline at end of file
+    assert last_card1 == last_card2, "both last card methods return the same Card"
+
+def test_seeded_decks_are_reproducible():
+    deck1 = CardDeck(rng=42)
+    deck2 = CardDeck(rng=42)
+    assert [deck1.draw_id() for _ in range(52)] == [deck2.draw_id() for _ in range(52)]
+
+
+def test_deck_uses_own_random_generator():
+    deck1 = CardDeck(rng=random.Random(7))
+    random.seed(0)
+    deck2 = CardDeck(rng=random.Random(7))
+    assert deck1.drawing_deck == deck2.drawing_deck
+
+
+def test_numpy_generator_deck():
+    np = pytest.importorskip("numpy")
+    deck1 = CardDeck(rng=np.random.default_rng(3))
+    deck2 = CardDeck(rng=np.random.default_rng(3))
+    assert deck1.drawing_deck == deck2.drawing_deck
+    assert sorted(card.id for card in deck1.drawing_deck) == list(range(52))
+
+
+def test_reshuffle_keeps_all_cards():
+    deck = CardDeck(rng=1)
+    drawn = [deck.draw_id() for _ in range(52)]
+    for card_id in drawn[:20]:
+        deck.add_id_to_played(card_id)
+    redrawn = [deck.draw_id() for _ in range(20)]
+    assert sorted(redrawn) == sorted(drawn[:20])
+    assert deck.played_count == 0
+    assert deck.drawing_count == 0
+
+
+def test_reshuffled_count():
+    deck = CardDeck(rng=1)
+    assert deck.reshuffled_count == 0
+    drawn = [deck.draw_id() for _ in range(52)]
+    for card_id in drawn[:10]:
+        deck.add_id_to_played(card_id)
+    first = deck.draw_id()
+    assert deck.reshuffled_count == 9
+    assert sorted([first] + deck.drawing_ids()) == sorted(drawn[:10])
+    state = deck.snapshot()
+    assert deck.copy().reshuffled_count == 9
+    deck.set_drawing_ids(deck.drawing_ids())
+    assert deck.reshuffled_count == 0
+    deck.restore(state)
+    assert deck.reshuffled_count == 9
+
+
+def test_top_played_id():
+    deck = CardDeck()
+    assert deck.top_played_id() == -1
+    deck.deal_first_card()
+    assert deck.top_played_id() == deck.get_last_played_card().id
+
+
+def test_snapshot_restore_and_copy():
+    deck = CardDeck(rng=3)
+    deck.deal_first_card()
+    state = deck.snapshot()
+    copy = deck.copy(rng=4)
+    drawn = [deck.draw_id() for _ in range(40)]
+    deck.restore(state)
+    assert deck.snapshot() == state
+    assert [copy.draw_id() for _ in range(10)] == drawn[:10]
+    assert deck.drawing_count == 51
@@ -0,0 +1,104 @@
+'''Tests for the last round solver'''
+
+import math
+from itertools import combinations
+
+import pytest
+
+from src.card import Card, Suit
+from src.game import GolfEngine
+from src.game.endgame import EndgameSolver, TranspositionTable, canonical_state, _sum_distribution
+
+
+def make_engine(row=(0, 1, 2), other_rows=None):
+    """Seat 0 has finished with 6 points, seat 1 moves last with two visible
+    fives and a hidden nine. The unseen cards are a king, three queens and the
+    nine, the played deck top card is a five."""
+    own = [Card(Suit.HEARTS, 5), Card(Suit.CLUBS, 5), Card(Suit.HEARTS, 9)]
+    engine = GolfEngine(2)
+    engine.set_table(0, [Card(Suit.CLUBS, value).id for value in (1, 2, 3)])
+    engine.set_table(1, [own[index].id for index in row], [index != 2 for index in row])
+    engine.deck.set_drawing_ids([Card(Suit.SPADES, 0).id] + [Card(suit, 12).id for suit in Suit][:3])
+    engine.deck.add_id_to_played(Card(Suit.DIAMONDS, 5).id)
+    engine.to_move = 1
+    engine.last_round = True
+    return engine
+
+
+def test_place_values_are_exact():
+    engine = make_engine()
+    # The nonvisible card counts as the mean of the unseen cards, 9
+    assert EndgameSolver().place_values(engine, Card(Suit.DIAMONDS, 5).id) == \
+        pytest.approx([13, 13, 13, -6])
+
+
+def test_draw_values_are_exact():
+    deck, played = EndgameSolver().draw_values(make_engine())
+    # A king completes the row, a queen is discarded and a nine ties
+    assert deck == pytest.approx((4 + 3 * 12.25 + 13) / 5)
+    assert played == pytest.approx(-6)
+
+
+def test_canonical_state_ignores_card_order():
+    solver = EndgameSolver()
+    assert canonical_state(make_engine()) == canonical_state(make_engine(row=(2, 0, 1)))
+    solver.draw_values(make_engine())
+    nodes = solver.nodes
+    solver.draw_values(make_engine(row=(2, 0, 1)))
+    assert solver.nodes == nodes
+    assert solver.stats()['hits'] > 0
+    values = solver.place_values(make_engine(row=(2, 0, 1)), Card(Suit.DIAMONDS, 5).id)
+    assert values == pytest.approx([13, -6, 13, 13])
+
+
+def test_only_the_last_round_is_solved():
+    solver = EndgameSolver()
+    engine = make_engine()
+    engine.last_round = False
+    assert not solver.solvable(engine)
+    with pytest.raises(ValueError):
+        solver.draw_values(engine)
+    engine = make_engine()
+    engine.deck.set_drawing_ids([])
+    assert not solver.solvable(engine)
+
+
+def test_three_players():
+    engine = GolfEngine(3)
+    engine.set_table(0, [Card(Suit.CLUBS, value).id for value in (1, 2, 3)])
+    engine.set_table(1, [Card(Suit.HEARTS, value).id for value in (5, 4, 9, 0, 8, 7)], [1, 1, 0, 1, 0, 0])
+    engine.set_table(2, [Card(Suit.DIAMONDS, value).id for value in (4, 1, 3)], [1, 0, 0])
+    engine.deck.set_drawing_ids([Card(Suit.SPADES, value).id for value in range(13)])
+    engine.deck.add_id_to_played(Card(Suit.CLUBS, 4).id)
+    engine.to_move = 1
+    engine.last_round = True
+    solver = EndgameSolver()
+    deck, played = solver.draw_values(engine)
+    values = solver.place_values(engine, Card(Suit.CLUBS, 4).id)
+    assert len(values) == 7
+    assert played == pytest.approx(min(values))
+    assert math.isfinite(deck) and math.isfinite(played)
+
+
+def test_sum_distribution_matches_enumeration():
+    counts = (2, 0, 1, 3, 0, 0, 0, 0, 0, 0, 0, 0, 2)
+    cards = [value for value, count in enumerate(counts) for _ in range(count)]
+    draws = 3
+    below, weighted = _sum_distribution(counts, draws)
+    hands = list(combinations(range(len(cards)), draws))
+    for bound in range(len(below)):
+        sums = [sum(cards[index] for index in hand) for hand in hands]
+        assert below[bound] == pytest.approx(sum(total <= bound for total in sums) / len(hands))
+        assert weighted[bound] == pytest.approx(sum(total for total in sums if total <= bound) / len(hands))
+
+
+def test_transposition_table_is_bounded():
+    table = TranspositionTable(2)
+    table.put('a', 1)
+    table.put('b', 2)
+    assert table.get('a') == 1
+    table.put('c', 3)
+    assert table.get('b') is None and table.get('a') == 1
+    assert table.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2, 'hit_rate': 2 / 3}
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
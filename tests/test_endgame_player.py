@@ -0,0 +1,74 @@
+'''Tests for the player solving the last round'''
+
+import random
+
+from src.card import Card, Suit
+from src.game import Game, GameStatus
+from src.player.advanced_computer_player import AdvancedComputerPlayer
+from src.player.endgame_player import EndgamePlayer, final_round_loss
+from src.player.registry import create_player
+from src.player.stupid_computer_player import StupidComputerPlayer
+from tests.test_endgame import make_engine
+
+
+def test_plays_the_last_round_exactly():
+    engine = make_engine()
+    player = EndgamePlayer()
+    assert player.get_draw_action(GameStatus(engine, 1)) == "p"
+    assert player.get_play_action(GameStatus(engine, 1, Card(Suit.DIAMONDS, 5))) == (1, 3)
+    assert player.final_round_decisions == 0
+
+
+def test_delegates_before_the_last_round():
+    engine = make_engine()
+    engine.last_round = False
+    player = EndgamePlayer(StupidComputerPlayer())
+    assert player.get_draw_action(GameStatus(engine, 1)) in ("d", "p")
+    assert player.solver.nodes == 0
+    assert player.name.endswith("+ endgame")
+
+
+def test_audit_counts_the_loss(monkeypatch):
+    engine = make_engine()
+    base = StupidComputerPlayer()
+    # Discarding the 5 keeps the hidden 9 instead of completing the row of 5s
+    monkeypatch.setattr(base, "get_play_action", lambda game_status: ("p", None))
+    player = EndgamePlayer(base, audit=True)
+    assert player.get_play_action(GameStatus(engine, 1, Card(Suit.DIAMONDS, 5))) == ("p", None)
+    assert player.final_round_decisions == 1
+    assert player.suboptimal_decisions == 1
+    assert player.final_round_loss == 19
+
+
+def test_audit_counts_no_loss_for_the_best_action(monkeypatch):
+    engine = make_engine()
+    base = StupidComputerPlayer()
+    monkeypatch.setattr(base, "get_play_action", lambda game_status: (1, 3))
+    player = EndgamePlayer(base, audit=True)
+    player.get_play_action(GameStatus(engine, 1, Card(Suit.DIAMONDS, 5)))
+    assert player.final_round_decisions == 1
+    assert player.suboptimal_decisions == 0
+    assert player.final_round_loss == 0
+
+
+def test_full_game():
+    random.seed(0)
+    game = Game(players=[EndgamePlayer(), AdvancedComputerPlayer()], silent_mode=True, seed=5)
+    turns, _, _ = game.play_game()
+    assert turns > 0
+
+
+def test_final_round_loss():
+    stats = final_round_loss(["advanced", "stupid"], 30, seed=0)
+    assert set(stats) == {"advanced", "stupid"}
+    for entry in stats.values():
+        assert entry['games'] == 30
+        assert entry['final_rounds'] <= entry['games']
+        assert 0 <= entry['suboptimal'] <= entry['decisions']
+        assert entry['loss'] >= 0
+        assert entry['loss_per_game'] == entry['loss'] / 30
+    assert sum(entry['decisions'] for entry in stats.values()) > 0
+
+
+def test_registered():
+    assert isinstance(create_player("endgame"), EndgamePlayer)
@@ -0,0 +1,248 @@
+'''Tests for the headless GolfEngine'''
+
+import random
+
+import pytest
+
+from src.card import Card, Suit, CARD_VALUES
+from src.card_deck import CardDeck
+from src.game.engine import GolfEngine, DRAW_DECK, DRAW_PLAYED, DISCARD, DUMMY_CARD_ID, HIDDEN
+
+
+def ids(values, suit=Suit.CLUBS):
+    return [Card(suit, value).id for value in values]
+
+
+def test_deal_gives_nine_hidden_cards():
+    engine = GolfEngine(2, CardDeck(rng=1))
+    engine.deal(0)
+    engine.deal(1)
+    assert engine.deck.drawing_count == 52 - 18
+    assert len(set(engine.table)) == 18
+    assert not any(engine.visible)
+    assert not engine.game_over()
+
+
+def test_place_to_table_discards_replaced_card():
+    engine = GolfEngine(2, CardDeck(rng=1))
+    engine.deal(0)
+    engine.deal_first_card()
+    hand = engine.draw(DRAW_DECK)
+    replaced = engine.table[4]
+    assert engine.place(0, hand, engine.slot(0, 1, 1)) == replaced
+    assert engine.table[4] == hand
+    assert engine.visible[4] == 1
+    assert engine.deck.top_played_id() == replaced
+
+
+def test_discard_and_draw_from_played():
+    engine = GolfEngine(2, CardDeck(rng=1))
+    engine.deal_first_card()
+    hand = engine.draw(DRAW_DECK)
+    engine.place(0, hand, DISCARD)
+    assert engine.draw(DRAW_PLAYED) == hand
+
+
+def test_full_row_is_removed_and_rows_shift():
+    engine = GolfEngine(2)
+    engine.set_table(0, ids([5, 5, 5]) + ids([1, 2, 3]) + ids([4, 6, 7]))
+    assert engine.check_full_rows(0) == 1
+    assert engine.row_count[0] == 2
+    assert [CARD_VALUES[card_id] for card_id, _ in engine.rows(0)[0]] == [1, 2, 3]
+    assert engine.score(0) == 1 + 2 + 3 + 4 + 6 + 7
+
+
+def test_full_row_needs_visible_cards():
+    engine = GolfEngine(2)
+    engine.set_table(0, ids([5, 5, 5]) + ids([1, 2, 3]) + ids([4, 6, 7]), [1, 1, 0] + [1] * 6)
+    assert engine.check_full_rows(0) == 0
+    assert engine.row_count[0] == 3
+
+
+def test_rl_training_mode_adds_dummy_row():
+    engine = GolfEngine(2, rl_training_mode=True)
+    engine.set_table(0, ids([5, 5, 5]) + ids([1, 2, 3]) + ids([4, 6, 7]))
+    assert engine.check_full_rows(0) == 1
+    assert engine.row_count[0] == 3
+    assert engine.rows(0)[2] == [(DUMMY_CARD_ID, False)] * 3
+    assert not engine.is_finished(0)
+
+
+def test_slot_uses_list_indexing_of_rows_in_play():
+    engine = GolfEngine(2)
+    engine.set_table(0, ids([1, 2, 3]) + ids([4, 6, 7]))
+    assert engine.slot(0, -1, 0) == 3
+    with pytest.raises(IndexError):
+        engine.slot(0, 2, 0)
+
+
+def test_game_over_and_winner():
+    engine = GolfEngine(2)
+    engine.set_table(0, ids([1, 2, 3]) * 3, [1] * 9)
+    engine.set_table(1, ids([0, 1, 2]) * 3, [0] * 9)
+    assert engine.is_finished(0)
+    assert engine.game_over()
+    assert engine.winner() == 1
+
+
+def test_empty_table_is_finished():
+    engine = GolfEngine(2)
+    engine.set_table(0, [])
+    assert engine.is_finished(0)
+    assert engine.score(0) == 0
+
+
+def recount(engine, player):
+    """Score and nonvisible count of a player summed over the table"""
+    rows = engine.rows(player)
+    score = sum(CARD_VALUES[card_id] for row in rows for card_id, _ in row)
+    hidden = sum(not visible for row in rows for _, visible in row)
+    return score, hidden
+
+
+def public_values(engine):
+    """Card values of the whole table array, HIDDEN for nonvisible cards"""
+    return [CARD_VALUES[card_id] if visible else HIDDEN
+            for card_id, visible in zip(engine.table, engine.visible)]
+
+
+def test_fresh_engine_is_not_game_over():
+    assert not GolfEngine(3).game_over()
+
+
+@pytest.mark.parametrize("rl_training_mode", [False, True])
+def test_running_totals_match_table(rl_training_mode):
+    rng = random.Random(7)
+    for game in range(30):
+        engine = GolfEngine(3, CardDeck(rng=game), rl_training_mode=rl_training_mode)
+        for player in range(3):
+            engine.deal(player)
+            for row in range(3):
+                engine.reveal(player, row * 3 + rng.randrange(3))
+        engine.deal_first_card()
+        turn = 0
+        while not engine.game_over() and turn < 300:
+            player = turn % 3
+            hand = engine.draw(rng.choice([DRAW_DECK, DRAW_PLAYED]))
+            if rng.random() < 0.2:
+                engine.place(player, hand, DISCARD)
+            else:
+                engine.place(player, hand, engine.slot(player, rng.randrange(engine.row_count[player]),
+                                                       rng.randrange(3)))
+            engine.check_full_rows(player)
+            for seat in range(3):
+                assert (engine.score(seat), engine.hidden_count[seat]) == recount(engine, seat)
+                assert engine.is_finished(seat) == (recount(engine, seat)[1] == 0)
+            assert engine.public_values.tolist() == public_values(engine)
+            turn += 1
+
+
+def test_row_removal_updates_totals():
+    engine = GolfEngine(2)
+    engine.set_table(0, ids([5, 5, 5]) + ids([1, 2, 3]) + ids([4, 6, 7]), [1] * 8 + [0])
+    assert engine.hidden_count[0] == 1
+    engine.check_full_rows(0)
+    assert engine.score(0) == 23
+    assert engine.hidden_count[0] == 1
+    assert engine.public_values[:6].tolist() == [1, 2, 3, 4, 6, HIDDEN]
+    engine.reveal(0, 5)
+    assert engine.is_finished(0)
+    assert engine.game_over()
+
+
+def play_random_turns(engine, rng, turns):
+    """Plays random turns, returns True if the game ended"""
+    for _ in range(turns):
+        player = engine.to_move
+        hand = engine.draw(rng.choice([DRAW_DECK, DRAW_PLAYED]) if engine.deck.played_count else DRAW_DECK)
+        slot = DISCARD if rng.random() < 0.2 else \
+            engine.slot(player, rng.randrange(engine.row_count[player]), rng.randrange(3))
+        engine.place(player, hand, slot)
+        engine.check_full_rows(player)
+        if engine.end_turn():
+            return True
+    return False
+
+
+def dealt_engine(seed, num_players=2):
+    engine = GolfEngine(num_players, CardDeck(rng=seed))
+    for player in range(num_players):
+        engine.deal(player)
+        for row in range(3):
+            engine.reveal(player, row * 3)
+    engine.deal_first_card()
+    return engine
+
+
+def test_end_turn_completes_the_last_round():
+    engine = GolfEngine(3)
+    engine.set_table(1, ids([1, 2, 3]), [1, 1, 1])
+    assert not engine.end_turn()
+    assert engine.last_round
+    assert not engine.end_turn()
+    assert engine.end_turn()
+    assert engine.to_move == 0
+
+
+def test_snapshot_and_restore():
+    engine = dealt_engine(1)
+    rng = random.Random(1)
+    play_random_turns(engine, rng, 5)
+    state = engine.snapshot()
+    tables = (engine.table.tobytes(), engine.visible.tobytes(), engine.deck.drawing_ids(),
+              engine.deck.played_cards, engine.score(0), engine.to_move)
+    play_random_turns(engine, rng, 20)
+    engine.restore(state)
+    assert tables == (engine.table.tobytes(), engine.visible.tobytes(), engine.deck.drawing_ids(),
+                      engine.deck.played_cards, engine.score(0), engine.to_move)
+    assert engine.snapshot() == state
+
+
+def test_clone_is_independent():
+    engine = dealt_engine(2)
+    state = engine.snapshot()
+    clone = engine.clone(rng=3)
+    assert clone.snapshot() == state
+    play_random_turns(clone, random.Random(4), 40)
+    assert engine.snapshot() == state
+    assert clone.deck.rng is not engine.deck.rng
+
+
+def test_resample_hidden_keeps_visible_cards():
+    engine = dealt_engine(5, num_players=3)
+    play_random_turns(engine, random.Random(5), 6)
+    clone = engine.clone(rng=6)
+    clone.resample_hidden()
+    assert clone.visible == engine.visible
+    for index, visible in enumerate(engine.visible):
+        if visible:
+            assert clone.table[index] == engine.table[index]
+    assert clone.deck.played_cards == engine.deck.played_cards
+    assert sorted(list(clone.table) + clone.deck.drawing_ids()) == \
+        sorted(list(engine.table) + engine.deck.drawing_ids())
+    for player in range(3):
+        assert (clone.score(player), clone.hidden_count[player]) == recount(clone, player)
+    assert clone.table != engine.table
+
+
+def test_resample_hidden_after_a_reshuffle():
+    engine = dealt_engine(7)
+    # Run the drawing deck out and reshuffle the played deck into it
+    while engine.deck.drawing_count:
+        engine.deck.add_id_to_played(engine.deck.draw_id())
+    engine.deck.add_id_to_played(engine.deck.draw_id())
+    reshuffled = engine.deck.drawing_ids()
+    assert engine.deck.reshuffled_count == len(reshuffled) > 0
+    hidden = sorted(card_id for card_id, visible in zip(engine.table, engine.visible) if not visible)
+    clone = engine.clone(rng=8)
+    clone.resample_hidden()
+    # The seen cards of the drawing deck can not go to a table
+    assert sorted(card_id for card_id, visible in zip(clone.table, clone.visible) if not visible) == hidden
+    assert sorted(clone.deck.drawing_ids()) == sorted(reshuffled)
+    assert clone.deck.drawing_ids() != reshuffled
+    assert clone.deck.reshuffled_count == len(reshuffled)
+
+
+def test_resample_hidden_not_in_rl_training_mode():
+    with pytest.raises(ValueError):
+        GolfEngine(2, rl_training_mode=True).resample_hidden()
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 from src.game import Game
 from src.card_deck import CardDeck, Card, Suit
 from src.player.computer_player import ComputerPlayer
+from src.player import AdvancedComputerPlayer, StupidComputerPlayer
 
 
 def test_game_initialization():
@@ -12,92 +13,68 @@ def test_game_initialization():
 
 def test_player_gets_card():
     """Test player_gets_card returns a card from the correct deck."""
-    mock_deck = MagicMock(spec=CardDeck)
-    mock_deck.draw_from_deck.return_value = Card(Suit.HEARTS, 1)
-    mock_deck.draw_from_played.return_value = Card(Suit.DIAMONDS, 2)
-
     mock_player = MagicMock(
         spec=ComputerPlayer,
         get_draw_action=MagicMock(side_effect=["d", "p"]),
-        table_cards=[]  # Ensure table_cards attribute is present
     )
     mock_player.name = "test"
 
-    with patch("src.card_deck.CardDeck", return_value=mock_deck):
-        game = Game(num_players=2, human_player=False)
+    game = Game(num_players=2, human_player=False)
+    game.players[0] = mock_player
 
-        # Test drawing from the played pile
-        card = game.player_gets_card(mock_player)
-        assert isinstance(card, Card)
+    # Test drawing from the deck
+    drawing_count = game.deck.drawing_count
+    card = game.player_gets_card(mock_player)
+    assert isinstance(card, Card)
+    assert game.deck.drawing_count == drawing_count - 1
 
-        # Test drawing from the deck
-        card = game.player_gets_card(mock_player)
-        assert isinstance(card, Card)
+    # Test drawing from the played pile
+    top_card = game.deck.get_last_played_card()
+    card = game.player_gets_card(mock_player)
+    assert card is top_card
 
 def test_game_status_player_own_cards():
     """Test that the player's own cards are correctly included."""
-    # Create mock player
-    player1 = MagicMock(spec=ComputerPlayer, table_cards=[
-        [Card(Suit.HEARTS, 1), Card(Suit.CLUBS, 2)],
-        [Card(Suit.DIAMONDS, 3), Card(Suit.SPADES, 4)],
-    ])
-    for row in player1.table_cards:
-        for card in row:
-            card.visible = True
-
-    # Mock game
     game = Game(num_players=2, human_player=False)
-    game.players = [player1]
+    player1 = game.players[0]
+    game.engine.set_table(0, [Card(Suit.HEARTS, 1).id, Card(Suit.CLUBS, 2).id, Card(Suit.CLUBS, 5).id,
+                              Card(Suit.DIAMONDS, 3).id, Card(Suit.SPADES, 4).id, Card(Suit.CLUBS, 6).id],
+                          [True, True, False, True, True, False])
 
     game_status = game.get_game_status_for_player(player1)
-    assert game_status["player"] == [['♡1', '♧2'], ['♢3', '♤4']],\
+    assert game_status["player"] == [['♡1', '♧2', 'XX'], ['♢3', '♤4', 'XX']],\
           "Player's own visible cards should match"
 
 
 def test_game_status_other_players_cards():
     """Test that other players' cards are correctly included."""
-    # Create mock players
-    player1 = MagicMock(spec=ComputerPlayer, table_cards=[])
-    player2 = MagicMock(spec=ComputerPlayer, table_cards=[
-        [Card(Suit.CLUBS, 5), Card(Suit.DIAMONDS, 6)],
-        [Card(Suit.SPADES, 7), Card(Suit.HEARTS, 8)],
-    ])
-    for row in player2.table_cards:
-        for card in row:
-            card.visible = True
-
     game = Game(num_players=2, human_player=False)
-    game.players = [player1, player2]
+    player1 = game.players[0]
+    game.engine.set_table(1, [Card(Suit.CLUBS, 5).id, Card(Suit.DIAMONDS, 6).id, Card(Suit.CLUBS, 1).id,
+                              Card(Suit.SPADES, 7).id, Card(Suit.HEARTS, 8).id, Card(Suit.CLUBS, 2).id],
+                          [True, True, False, True, True, False])
 
     game_status = game.get_game_status_for_player(player1)
     assert len(game_status["other_players"]) == 1
-    assert game_status["other_players"][0] == [['♧5', '♢6'], ['♤7', '♡8']], \
+    assert game_status["other_players"][0] == [['♧5', '♢6', 'XX'], ['♤7', '♡8', 'XX']], \
     "Other players' visible cards should match"
 
 
 def test_game_status_played_top_card():
     """Test that the top card of the played deck is included."""
-    # Create mock player
-    player1 = MagicMock(spec=ComputerPlayer, table_cards=[])
-
-    # Mock game and deck
-    with patch("src.card_deck.CardDeck") as mock_deck:
-        mock_deck.get_last_played_card.return_value = Card(Suit.DIAMONDS, 9)
-        game = Game(num_players=2, human_player=False)
-        game.deck.played_cards = [Card(Suit.DIAMONDS, 9)]
+    game = Game(num_players=2, human_player=False)
+    player1 = game.players[0]
+    game.deck.played_cards = [Card(Suit.DIAMONDS, 9)]
 
-        game_status = game.get_game_status_for_player(player1)
-        assert game_status["played_top_card"].suit == Suit.DIAMONDS
-        assert game_status["played_top_card"].value == 9
+    game_status = game.get_game_status_for_player(player1)
+    assert game_status["played_top_card"].suit == Suit.DIAMONDS
+    assert game_status["played_top_card"].value == 9
 
 
 def test_game_status_hand_card():
     """Test that the hand card is included if provided."""
-    # Create mock player
-    player1 = MagicMock(spec=ComputerPlayer, table_cards=[])
-
-    # Mock game
     game = Game(num_players=2, human_player=False)
+    player1 = game.players[0]
 
     # Test with a hand card
     hand_card = Card(Suit.CLUBS, 10)
@@ -107,11 +84,8 @@ def test_game_status_hand_card():
 
 def test_game_status_no_hand_card():
     """Test that hand card is excluded if not provided."""
-    # Create mock player
-    player1 = MagicMock(spec=ComputerPlayer, table_cards=[])
-
-    # Mock game
     game = Game(num_players=2, human_player=False)
+    player1 = game.players[0]
 
     # Test without a hand card
     game_status = game.get_game_status_for_player(player1)
@@ -120,11 +94,9 @@ def test_game_status_no_hand_card():
 def test_play_game_completes_properly():
     """Test that play_game completes once all conditions are met."""
     game = Game(num_players=2, human_player=False)
-    for player in game.players:
-        player.table_cards = [[Card(Suit.CLUBS, i) for i in range(1, 4)] for _ in range(3)]
-        for row in player.table_cards:
-            for card in row:
-                card.visible = True  # All cards visible to simulate game-end condition
+    for seat in range(len(game.players)):
+        # All cards visible to simulate game-end condition
+        game.engine.set_table(seat, [Card(Suit.CLUBS, i).id for i in range(1, 4)] * 3)
 
     result = game.play_game()
     assert result[0] > 0, "Game should play at least one turn"
@@ -133,22 +105,18 @@ def test_play_game_completes_properly():
 def test_play_game_tied_scores():
     """Test play_game handles tied scores correctly."""
     game = Game(num_players=2, human_player=False)
-    for player in game.players:
-        player.table_cards = [[Card(Suit.SPADES, _) for _ in range(3)] for _ in range(3)]
-        for row in player.table_cards:
-            for card in row:
-                card.visible = True  # All cards visible to simulate game-end condition
+    for seat in range(len(game.players)):
+        # All cards visible to simulate game-end condition
+        game.engine.set_table(seat, [Card(Suit.SPADES, i).id for i in range(3)] * 3)
 
     assert game.player_score(game.players[0]) ==  game.player_score(game.players[1]), "Scores should be tied"
 
 def test_play_game_max_players():
     """Test play_game works with the maximum number of players."""
     game = Game(num_players=3, human_player=False)
-    for player in game.players:
-        player.table_cards = [[Card(Suit.DIAMONDS, i) for i in range(1, 4)] for _ in range(3)]
-        for row in player.table_cards:
-            for card in row:
-                card.visible = True  # All cards visible to simulate game-end condition
+    for seat in range(len(game.players)):
+        # All cards visible to simulate game-end condition
+        game.engine.set_table(seat, [Card(Suit.DIAMONDS, i).id for i in range(1, 4)] * 3)
 
     result = game.play_game()
     assert result[0] > 0, "Game should play at least one turn"
@@ -158,11 +126,9 @@ def test_play_game_max_players():
 def test_play_game_min_players():
     """Test play_game works with the minimum number of players."""
     game = Game(num_players=2, human_player=False)
-    for player in game.players:
-        player.table_cards = [[Card(Suit.HEARTS, i) for i in range(1, 4)] for _ in range(3)]
-        for row in player.table_cards:
-            for card in row:
-                card.visible = True  # All cards visible to simulate game-end condition
+    for seat in range(len(game.players)):
+        # All cards visible to simulate game-end condition
+        game.engine.set_table(seat, [Card(Suit.HEARTS, i).id for i in range(1, 4)] * 3)
 
     result = game.play_game()
     assert result[0] > 0, "Game should play at least one turn"
@@ -176,3 +142,40 @@ def test_play_game_returns_tuple():
     result = game.play_game()
 
     assert isinstance(result, tuple), "play_game should return a tuple"
+
+def test_seeded_games_deal_the_same_cards():
+    """Test that a seed makes the deal reproducible."""
+    game1 = Game(num_players=2, human_player=False, silent_mode=True, seed=5)
+    game2 = Game(num_players=2, human_player=False, silent_mode=True, seed=5)
+    assert game1.deck.drawing_deck == game2.deck.drawing_deck
+    assert game1.engine.table == game2.engine.table
+
+def test_game_with_given_players():
+    """Test that given players are seated in order when not shuffled."""
+    players = [StupidComputerPlayer(), AdvancedComputerPlayer(), StupidComputerPlayer()]
+    game = Game(3, players=players, shuffle_players=False, silent_mode=True)
+    assert game.players == players
+    turns, scores, winner = game.play_game()
+    assert winner in scores
+
+def test_play_game_stops_games_that_do_not_end():
+    """Test that a game whose players never finish is stopped at max_turns."""
+    class DiscardingPlayer(StupidComputerPlayer):
+        def get_draw_action(self, game_status):
+            return "d"
+
+        def get_play_action(self, game_status):
+            return ("p", None)
+
+    game = Game(players=[DiscardingPlayer(), DiscardingPlayer()], silent_mode=True, seed=1)
+    assert not game.truncated
+    turns, scores, winner = game.play_game(max_turns=50)
+    assert turns == 50
+    assert game.truncated
+    assert winner in scores
+
+def test_finished_game_is_not_truncated():
+    """Test that a game that ends is not reported as truncated."""
+    game = Game(players=[AdvancedComputerPlayer(), StupidComputerPlayer()], silent_mode=True, seed=2)
+    game.play_game()
+    assert not game.truncated
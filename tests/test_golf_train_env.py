@@ -0,0 +1,48 @@
+'''Tests for the GolfTrainEnv training environment'''
+
+import numpy as np
+import pytest
+
+from src.player.golf_train_env import GolfTrainEnv
+
+
+def test_default_observation():
+    env = GolfTrainEnv()
+    obs, _ = env.reset(seed=0)
+    assert obs.shape == (20,)
+    assert obs in env.observation_space
+
+
+def test_action_masks():
+    env = GolfTrainEnv()
+    env.reset(seed=0)
+    # The initial card is in the played deck
+    assert env.action_masks().tolist() == [True, True] + [False] * 8
+    env.step(0)
+    assert env.action_masks().all()
+    env.step(9)
+    env.game.engine.deck.played_cards = []
+    assert env.action_masks().tolist() == [True] + [False] * 9
+
+
+def test_action_masking():
+    env = GolfTrainEnv(action_masking=True)
+    obs, _ = env.reset(seed=0)
+    assert obs.shape == (21,) and obs[20] == 0
+    assert obs in env.observation_space
+    with pytest.raises(ValueError):
+        env.step(5)
+    obs, *_ = env.step(1)
+    assert obs[20] == 1
+    assert obs in env.observation_space
+
+
+def test_random_masked_episode():
+    env = GolfTrainEnv(action_masking=True)
+    env.reset(seed=1)
+    rng = np.random.default_rng(1)
+    done = False
+    while not done:
+        mask = env.action_masks()
+        obs, _, done, _, _ = env.step(int(rng.choice(np.flatnonzero(mask))))
+        assert obs in env.observation_space
@@ -0,0 +1,92 @@
+'''Tests for the vectorized GolfVecEnv'''
+
+import numpy as np
+import pytest
+
+from src.player.golf_vec_env import GolfVecEnv
+
+
+def test_reset_observations():
+    env = GolfVecEnv(64, seed=0)
+    obs, info = env.reset()
+    assert obs.shape == (64, 20)
+    assert obs in env.observation_space
+    # No hand card, three visible cards on each table
+    assert (obs[:, 0] == 21).all()
+    assert ((obs[:, 2:11] != 21).sum(axis=1) == 3).all()
+    assert ((obs[:, 11:] != 21).sum(axis=1) == 3).all()
+    assert info == {}
+
+
+def test_two_phases():
+    env = GolfVecEnv(32, seed=1)
+    env.reset()
+    obs, rewards, terminations, truncations, _ = env.step(np.zeros(32, dtype=np.int64))
+    assert (obs[:, 0] != 21).all()
+    assert (rewards == 0).all() and not terminations.any() and not truncations.any()
+    hand = obs[:, 0].copy()
+    obs, _, terminations, _, _ = env.step(np.zeros(32, dtype=np.int64))
+    # The hand card went to the first position of the own table
+    assert (obs[~terminations, 2] == hand[~terminations]).all()
+    assert (obs[~terminations, 0] == 21).all()
+
+
+def test_terminal_reward_and_autoreset():
+    env = GolfVecEnv(256, seed=2)
+    env.reset()
+    rng = np.random.default_rng(0)
+    while True:
+        before = env._scores(np.arange(256), 0)
+        placing = env.phase == 2
+        _, rewards, terminations, _, _ = env.step(rng.integers(0, 10, size=256))
+        if terminations.any():
+            break
+    game = np.flatnonzero(terminations)[0]
+    assert placing[game]
+    own, other = env._scores(np.array([game]), 0)[0], env._scores(np.array([game]), 1)[0]
+    assert np.isclose(rewards[game], (own - before[game]) / 10 + other - own)
+    assert env.sim.finished[game].any()
+
+    obs, rewards, terminations, _, _ = env.step(np.zeros(256, dtype=np.int64))
+    assert rewards[game] == 0 and not terminations[game]
+    assert obs[game, 0] == 21
+    assert (obs[game, 2:] != 21).sum() == 6
+
+
+def test_truncation():
+    env = GolfVecEnv(16, seed=3, max_turns=2)
+    env.reset()
+    truncated = np.zeros(16, dtype=bool)
+    for _ in range(4):
+        _, _, terminations, truncations, _ = env.step(np.full(16, 9))
+        truncated |= truncations
+        assert not (terminations & truncations).any()
+    assert (truncated | (env.agent_turns < 2)).all()
+
+
+def test_seeded_runs_are_equal():
+    runs = []
+    for _ in range(2):
+        env = GolfVecEnv(16, opponent="advanced", seed=4)
+        observations = [env.reset()[0]]
+        for step in range(60):
+            observations.append(env.step(np.full(16, step % 10))[0])
+        runs.append(np.stack(observations))
+    assert np.array_equal(runs[0], runs[1])
+
+
+def test_action_masking():
+    env = GolfVecEnv(64, seed=3, action_masking=True)
+    obs, _ = env.reset()
+    assert obs.shape == (64, 21) and (obs[:, 20] == 0).all()
+    masks = env.action_masks()
+    assert masks[:, :2].all() and not masks[:, 2:].any()
+    with pytest.raises(ValueError):
+        env.step(np.full(64, 5))
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        masks = env.action_masks()
+        actions = np.array([rng.choice(np.flatnonzero(mask)) for mask in masks])
+        obs, _, terminations, _, _ = env.step(actions)
+        assert obs in env.observation_space
+        assert (obs[~terminations, 20] == env.phase[~terminations] - 1).all()
@@ -0,0 +1,83 @@
+'''Tests for the heuristic play dataset generator'''
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.player.heuristic_dataset import generate_dataset, ShardDataset, INDEX_FILE
+
+
+@pytest.fixture(scope="module")
+def dataset_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("dataset"))
+    generate_dataset(path, 100, workers=1, chunk_size=50, num_envs=16, shard_size=500, seed=0)
+    return path
+
+
+def test_index_and_shards(dataset_path):
+    dataset = ShardDataset(dataset_path)
+    index = dataset.index
+    assert index['games'] + index['truncated'] == 100
+    assert len(dataset) == index['rows'] == sum(shard['rows'] for shard in index['shards'])
+    # Two chunks, all shards full except the last one of each chunk
+    names = [shard['name'] for shard in index['shards']]
+    assert {name.split('-')[1] for name in names} == {'00000', '00001'}
+    for shard, following in zip(index['shards'], names[1:] + ['']):
+        if following.split('-')[:2] == shard['name'].split('-')[:2]:
+            assert shard['rows'] == 500
+
+
+def test_rows_follow_the_env_encoding(dataset_path):
+    dataset = ShardDataset(dataset_path)
+    for shard in dataset.shards:
+        drawing = shard['phase'] == 1
+        assert set(np.unique(shard['phase'])) == {1, 2}
+        assert (shard['action'][drawing] <= 1).all() and (shard['action'] <= 9).all()
+        # The hand card is there only in the place phase
+        assert (shard['obs'][drawing, 0] == 21).all()
+        assert (shard['obs'][~drawing, 0] != 21).all()
+        assert shard['obs'].min() >= 1 and shard['obs'].max() <= 21
+
+
+def test_batches(dataset_path):
+    dataset = ShardDataset(dataset_path)
+    batches = list(dataset.batches(128, rng=np.random.default_rng(0)))
+    assert sum(len(batch['action']) for batch in batches) == len(dataset)
+    assert all(len(batch['obs']) <= 128 for batch in batches)
+    # Views of the memory mapped shards, not copies
+    assert all(isinstance(batch['obs'], np.memmap) for batch in batches)
+
+
+def test_single_game_return(tmp_path):
+    index = generate_dataset(str(tmp_path), 1, workers=1, seed=3, shard_size=1000)
+    shard = ShardDataset(str(tmp_path)).shards[0]
+    assert len(shard['action']) % 2 == 0
+    # The return of the first step is the return of the game
+    assert np.isclose(shard['return'], index['mean_return'], atol=1e-4).any()
+
+
+def test_reproducible(dataset_path, tmp_path):
+    generate_dataset(str(tmp_path), 100, workers=1, chunk_size=50, num_envs=16, shard_size=500, seed=0)
+    for first, second in zip(ShardDataset(dataset_path).shards, ShardDataset(str(tmp_path)).shards):
+        for field in first:
+            assert np.array_equal(first[field], second[field])
+
+
+def test_shard_mismatch(tmp_path):
+    generate_dataset(str(tmp_path), 10, workers=1, seed=1)
+    with open(os.path.join(tmp_path, INDEX_FILE), encoding="utf-8") as file:
+        index = json.load(file)
+    index['shards'][0]['rows'] += 1
+    with open(os.path.join(tmp_path, INDEX_FILE), "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    with pytest.raises(ValueError):
+        ShardDataset(str(tmp_path))
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        generate_dataset(str(tmp_path), 10, teacher="human")
+    with pytest.raises(ValueError):
+        generate_dataset(str(tmp_path), 0)
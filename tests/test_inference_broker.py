@@ -0,0 +1,94 @@
+'''Tests for the batched InferenceBroker'''
+
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.game import Game
+from src.player.inference_broker import InferenceBroker
+from src.player.rl_player import RLPlayer
+from src.player.stupid_computer_player import StupidComputerPlayer
+
+
+class SumModel():
+    """Action is the sum of the observation modulo 10, records the batch shapes"""
+    def __init__(self):
+        self.shapes = []
+
+    def predict(self, observations, deterministic=True):
+        self.shapes.append(observations.shape)
+        return observations.sum(axis=1) % 10, None
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        InferenceBroker(SumModel(), max_batch_size=0)
+
+
+def test_threads_are_batched():
+    model = SumModel()
+    results = {}
+    # The batches are flushed when full, not on the deadline, however slowly
+    # the threads start
+    with InferenceBroker(model, max_batch_size=8, max_delay=10) as broker:
+        def worker(index):
+            results[index] = broker.predict(np.array([index, 1], dtype=np.int32))
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = broker.stats()
+    assert results == {index: (index + 1) % 10 for index in range(16)}
+    assert stats['requests'] == 16
+    assert stats['max_batch_size'] == 8
+    assert stats['batches'] == 2
+    assert all(shape[1] == 2 for shape in model.shapes)
+
+
+def test_asyncio():
+    async def run(broker):
+        return await asyncio.gather(*(broker.predict_async(np.array([index])) for index in range(20)))
+    # The batch is flushed when full, not on the deadline
+    with InferenceBroker(SumModel(), max_batch_size=20, max_delay=10) as broker:
+        actions = asyncio.run(run(broker))
+        assert broker.stats()['batches'] == 1
+    assert actions == [index % 10 for index in range(20)]
+
+
+def test_errors_reach_the_futures():
+    class Broken():
+        def predict(self, observations, deterministic=True):
+            raise RuntimeError("broken")
+    with InferenceBroker(Broken()) as broker:
+        with pytest.raises(RuntimeError):
+            broker.predict(np.zeros(3))
+
+
+def test_closed():
+    broker = InferenceBroker(SumModel())
+    future = broker.submit(np.ones(2))
+    broker.close()
+    assert future.result(timeout=1) == 2
+    with pytest.raises(ValueError):
+        broker.submit(np.ones(2))
+
+
+def test_rl_players_in_threads():
+    with InferenceBroker(SumModel(), max_batch_size=4) as broker:
+        errors = []
+        def play(seed):
+            try:
+                Game(players=[RLPlayer(broker=broker), StupidComputerPlayer()],
+                     silent_mode=True, seed=seed).play_game()
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+        threads = [threading.Thread(target=play, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert broker.stats()['requests'] > 0
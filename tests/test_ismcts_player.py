@@ -0,0 +1,92 @@
+'''Tests for the information set MCTS player'''
+
+import random
+import time
+
+import pytest
+
+from src.card import Card, Suit
+from src.game import Game, GameStatus
+from src.player.advanced_computer_player import AdvancedComputerPlayer
+from src.player.ismcts_player import ISMCTSPlayer, SearchTree, DRAW_NODE, CHANCE_NODE, PLACE_NODE
+from src.player.registry import create_player
+from tests.test_monte_carlo_player import make_engine
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        ISMCTSPlayer(time_limit=None)
+    with pytest.raises(ValueError):
+        ISMCTSPlayer(iterations=0)
+
+
+def test_search_tree_blocks_and_compaction():
+    tree = SearchTree(100)
+    root = tree.add(DRAW_NODE)
+    chance = tree.expand(root)
+    assert tree.size == 3 and tree.kind[chance] == CHANCE_NODE
+    assert tree.expand(root) == chance
+    place = tree.expand(chance + 1)
+    assert tree.kind[place] == PLACE_NODE and tree.size == 16
+    tree.visits[place + 4] = 7
+    tree.total[place + 4] = -1.5
+    grandchild = tree.expand(place + 4)
+    tree.visits[grandchild] = 3
+
+    new_chance = tree.compact(chance + 1)
+    assert new_chance == 0 and tree.size == 1 + 13 + 10
+    new_place = tree.first_child[new_chance]
+    assert tree.visits[new_place + 4] == 7 and tree.total[new_place + 4] == -1.5
+    assert tree.visits[tree.first_child[new_place + 4]] == 3
+
+    small = SearchTree(10)
+    chance = small.add(CHANCE_NODE)
+    assert small.expand(chance) == -1 and small.first_child[chance] == -1
+
+
+def test_completes_a_row():
+    player = ISMCTSPlayer(time_limit=None, iterations=1000, seed=0)
+    assert player.get_play_action(GameStatus(make_engine(), 0, Card(Suit.SPADES, 5))) == (1, 3)
+    assert player.last_iterations == 1000
+
+
+def test_draws_the_five():
+    player = ISMCTSPlayer(time_limit=None, iterations=500, seed=0)
+    assert player.get_draw_action(GameStatus(make_engine(), 0)) == "p"
+
+
+def test_anytime_budget():
+    player = ISMCTSPlayer(time_limit=0.05, seed=0)
+    start = time.perf_counter()
+    player.get_play_action(GameStatus(make_engine(), 0, Card(Suit.SPADES, 5)))
+    assert time.perf_counter() - start < 0.5
+    assert player.last_iterations >= 10
+
+
+def test_tree_is_reused_between_moves():
+    random.seed(0)
+    player = ISMCTSPlayer(time_limit=None, iterations=300, seed=0)
+    opponent = AdvancedComputerPlayer()
+    game = Game(players=[player, opponent], shuffle_players=False, silent_mode=True, seed=4)
+    game.player_plays_turn(player)
+    game.engine.end_turn()
+    game.player_plays_turn(opponent)
+    game.engine.end_turn()
+    # The draw node below the chosen place has the visits of the last search
+    node = player._next
+    visits = player.tree.visits[node]
+    assert visits > 0
+    game.player_plays_turn(player)
+    assert player.tree.visits[node] >= visits + 300
+
+
+def test_full_game():
+    random.seed(0)
+    player = ISMCTSPlayer(time_limit=None, iterations=30, seed=0)
+    game = Game(players=[player, AdvancedComputerPlayer()], silent_mode=True, seed=3)
+    turns, scores, _ = game.play_game()
+    assert turns > 0 and player.name in scores
+
+
+def test_registered():
+    assert isinstance(create_player("ismcts"), ISMCTSPlayer)
@@ -0,0 +1,55 @@
+'''Tests for the process-wide RL model cache'''
+
+from unittest.mock import patch
+
+import pytest
+
+from src.player import model_cache
+from src.player.model_cache import (get_model, clear_model_cache, default_model_path,
+                                    set_default_model_path, MODEL_PATH_ENV, DEFAULT_MODEL_PATH)
+
+
+@pytest.fixture
+def fake_load():
+    clear_model_cache()
+    with patch.object(model_cache, "_load", side_effect=lambda path, device: object()) as load:
+        yield load
+    clear_model_cache()
+    set_default_model_path(None)
+
+
+def test_loads_once_per_path_and_device(fake_load, tmp_path):
+    path = str(tmp_path / "model.zip")
+    model = get_model(path)
+    assert get_model(path) is model
+    assert get_model(path, device="cuda") is not model
+    assert fake_load.call_count == 2
+
+
+def test_path_without_suffix_shares_the_model(fake_load, tmp_path):
+    path = tmp_path / "model.zip"
+    path.write_bytes(b"")
+    assert get_model(str(path)) is get_model(str(tmp_path / "model"))
+    assert fake_load.call_count == 1
+
+
+def test_clear(fake_load):
+    model = get_model("a.zip")
+    clear_model_cache()
+    assert get_model("a.zip") is not model
+
+
+def test_default_path(fake_load, monkeypatch):
+    monkeypatch.delenv(MODEL_PATH_ENV, raising=False)
+    assert default_model_path() == DEFAULT_MODEL_PATH
+    monkeypatch.setenv(MODEL_PATH_ENV, "env.zip")
+    assert default_model_path() == "env.zip"
+    set_default_model_path("set.zip")
+    assert default_model_path() == "set.zip"
+    get_model()
+    assert fake_load.call_args[0][0].endswith("set.zip")
+
+
+def test_rl_players_share_the_model():
+    from src.player.rl_player import RLPlayer
+    assert RLPlayer().model is RLPlayer().model
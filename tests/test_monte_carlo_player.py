@@ -0,0 +1,89 @@
+'''Tests for the Monte Carlo rollout player'''
+
+import random
+import time
+
+import pytest
+
+from src.card import Card, Suit
+from src.game import Game, GolfEngine, GameStatus
+from src.player.advanced_computer_player import AdvancedComputerPlayer
+from src.player.monte_carlo_player import MonteCarloPlayer
+from src.player.registry import create_player
+
+
+def make_engine():
+    """Seat 0 has two visible fives in the first row, the played deck a five"""
+    own = [Card(Suit.HEARTS, 5), Card(Suit.CLUBS, 5), Card(Suit.HEARTS, 9),
+           Card(Suit.HEARTS, 2), Card(Suit.HEARTS, 10), Card(Suit.HEARTS, 11),
+           Card(Suit.CLUBS, 1), Card(Suit.CLUBS, 7), Card(Suit.CLUBS, 12)]
+    other = [Card(Suit.SPADES, value) for value in range(1, 10)]
+    top = Card(Suit.DIAMONDS, 5)
+    engine = GolfEngine(2)
+    engine.set_table(0, [card.id for card in own], [1, 1, 0, 1, 0, 0, 1, 0, 0])
+    engine.set_table(1, [card.id for card in other], [1, 0, 0, 1, 0, 0, 1, 0, 0])
+    used = {card.id for card in own + other + [top, Card(Suit.SPADES, 5)]}
+    engine.deck.set_drawing_ids([card_id for card_id in range(52) if card_id not in used])
+    engine.deck.add_id_to_played(top.id)
+    return engine
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        MonteCarloPlayer(rollouts=None)
+    with pytest.raises(ValueError):
+        MonteCarloPlayer(rollouts=0)
+
+
+def test_needs_the_engine():
+    player = MonteCarloPlayer(rollouts=10)
+    with pytest.raises(ValueError):
+        player.get_draw_action({"other_players": [], "player": [], "played_top_card": None})
+
+
+def test_completes_a_row():
+    engine = make_engine()
+    player = MonteCarloPlayer(rollouts=400, seed=0)
+    assert player.get_play_action(GameStatus(engine, 0, Card(Suit.SPADES, 5))) == (1, 3)
+    assert len(player.last_values) == 10
+    assert player.last_rollouts == 400
+
+
+def test_draws_the_five_and_plays_it_to_the_row():
+    engine = make_engine()
+    player = MonteCarloPlayer(rollouts=400, seed=0)
+    assert player.get_draw_action(GameStatus(engine, 0)) == "p"
+    # The place was decided with the draw
+    assert player.get_play_action(GameStatus(engine, 0, Card(Suit.DIAMONDS, 5))) == (1, 3)
+    assert player.last_rollouts == 396
+
+
+def test_time_limit():
+    engine = make_engine()
+    player = MonteCarloPlayer(rollouts=None, time_limit=0.05, seed=0)
+    start = time.perf_counter()
+    player.get_play_action(GameStatus(engine, 0, Card(Suit.SPADES, 5)))
+    assert time.perf_counter() - start < 0.5
+    assert player.last_rollouts >= 10
+
+
+def test_process_pool():
+    engine = make_engine()
+    player = MonteCarloPlayer(rollouts=200, workers=2, seed=0)
+    try:
+        assert player.get_play_action(GameStatus(engine, 0, Card(Suit.SPADES, 5))) == (1, 3)
+        assert player.last_rollouts == 200
+    finally:
+        player.close()
+
+
+def test_full_game():
+    random.seed(0)
+    player = MonteCarloPlayer(rollouts=20, seed=0)
+    game = Game(players=[player, AdvancedComputerPlayer()], silent_mode=True, seed=3)
+    turns, scores, _ = game.play_game()
+    assert turns > 0 and player.name in scores
+
+
+def test_registered():
+    assert isinstance(create_player("montecarlo"), MonteCarloPlayer)
@@ -0,0 +1,46 @@
+'''Tests for the NumPy inference of exported DQN agents'''
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.player.model_cache import get_model
+from src.player.numpy_q_net import NumpyQNetwork, export_q_net
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("model") / "agent.npz")
+    export_q_net(get_model(), path)
+    return path
+
+
+def test_matches_dqn_predict(exported):
+    model = get_model()
+    network = NumpyQNetwork.load(exported)
+    observations = np.random.default_rng(0).integers(1, 22, size=(2000, 20)).astype(np.int32)
+    expected, _ = model.predict(observations, deterministic=True)
+    actions, _ = network.predict(observations)
+    assert actions.shape == (2000,)
+    assert np.array_equal(actions, expected)
+    for observation in observations[:50]:
+        action, _ = network.predict(observation)
+        assert isinstance(action, int)
+        assert action == model.predict(observation, deterministic=True)[0]
+
+
+def test_observation_space_mismatch():
+    with pytest.raises(ValueError):
+        NumpyQNetwork([22] * 20, [np.zeros((8, 100)), np.zeros((2, 8))], [np.zeros(8), np.zeros(2)])
+
+
+def test_rl_player_without_torch(exported):
+    code = ("import sys; from src.game import Game; from src.player.rl_player import RLPlayer; "
+            "from src.player.stupid_computer_player import StupidComputerPlayer; "
+            f"players = [RLPlayer({exported!r}), StupidComputerPlayer()]; "
+            "Game(players=players, silent_mode=True, seed=1).play_game(); "
+            "print('torch' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
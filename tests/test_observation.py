@@ -0,0 +1,61 @@
+'''Tests for the shared observation encoder'''
+
+import numpy as np
+
+from src.card import CARDS, CARD_VALUES
+from src.game import GolfEngine, GameStatus
+from src.game.status import HIDDEN
+from src.player.observation import encode_observation, encode_status, encode_batch, OBSERVATION_SIZE
+
+
+def make_engine():
+    engine = GolfEngine(2)
+    engine.set_table(0, [0, 13, 26, 5, 6, 7], [1, 0, 1, 1, 1, 0])
+    engine.set_table(1, list(range(40, 49)), [0] * 8 + [1])
+    engine.deck.add_id_to_played(12)
+    return engine
+
+
+def test_encode_observation():
+    engine = make_engine()
+    obs = encode_observation(engine, 0, hand_value=4)
+    assert obs.dtype == np.int32
+    # Hand, top, own table with the removed row as kings, other table
+    assert obs.tolist() == [5, 13, 1, 21, 1, 6, 7, 21, 1, 1, 1] + [21] * 8 + [CARD_VALUES[48] + 1]
+    obs = encode_observation(engine, 1)
+    assert obs[0] == 21
+    assert obs[2:11].tolist() == [21] * 8 + [CARD_VALUES[48] + 1]
+
+
+def test_out_buffer():
+    engine = make_engine()
+    out = np.zeros(OBSERVATION_SIZE, dtype=np.int64)
+    assert encode_observation(engine, 0, out=out) is out
+    assert (out == encode_observation(engine, 0)).all()
+
+
+def test_status_and_dict_status_agree():
+    engine = make_engine()
+    status = GameStatus(engine, 1, CARDS[7])
+    assert (encode_status(status) == encode_observation(engine, 1, 7)).all()
+    assert (encode_status(dict(status)) == encode_status(status)).all()
+
+
+def test_batch_matches_single():
+    engine = make_engine()
+    engine.set_table(0, list(range(9)), [1, 0, 1, 0, 1, 0, 1, 0, 1])
+    values = np.array([[CARD_VALUES[card_id] for card_id in engine.table]]).reshape(1, 2, 9)
+    visible = np.array(engine.visible, dtype=bool).reshape(1, 2, 9)
+    batch = encode_batch(np.array([HIDDEN]), np.array([CARD_VALUES[12]]), values, visible)
+    assert batch.shape == (1, OBSERVATION_SIZE)
+    assert (batch[0] == encode_observation(engine, 0)).all()
+
+
+def test_phase():
+    engine = make_engine()
+    obs = encode_observation(engine, 0, 4, phase=2)
+    assert obs.shape == (21,) and obs[20] == 1
+    assert (obs[:20] == encode_observation(engine, 0, 4)).all()
+    status = GameStatus(engine, 0)
+    assert encode_status(status, phase=1)[20] == 0
+    assert encode_status(dict(status), phase=1).tolist() == encode_status(status, phase=1).tolist()
@@ -0,0 +1,113 @@
+'''Tests for the LRU PolicyCache'''
+
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from src.game import Game
+from src.player.model_cache import default_model_path
+from src.player.policy_cache import PolicyCache, set_default_cache
+from src.player.rl_player import RLPlayer
+from src.player.stupid_computer_player import StupidComputerPlayer
+
+
+def obs(*values):
+    return np.array(values, dtype=np.int32)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        PolicyCache(0)
+
+
+def test_lru_eviction_and_counters():
+    cache = PolicyCache(2)
+    assert cache.get(obs(1)) is None
+    cache.put(obs(1), 1)
+    cache.put(obs(2), 2)
+    assert cache.get(obs(1)) == 1
+    # 2 is now the least recently used
+    cache.put(obs(3), 3)
+    assert cache.get(obs(2)) is None
+    assert cache.get(obs(3)) == 3
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'evictions': 1, 'size': 2, 'hit_rate': 0.5}
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.npz")
+    cache = PolicyCache(10, tag="model")
+    for value in range(5):
+        cache.put(obs(value, 20), value % 3)
+    cache.save(path)
+
+    loaded = PolicyCache(3, tag="model")
+    loaded.load(path)
+    assert len(loaded) == 3
+    assert loaded.get(obs(4, 20)) == 1
+    assert loaded.get(obs(1, 20)) is None
+
+    with pytest.raises(ValueError):
+        PolicyCache(tag="other").load(path)
+
+
+def test_rl_player_skips_cached_forward_passes():
+    class CountingModel():
+        def __init__(self, model):
+            self.model = model
+            self.calls = 0
+
+        def predict(self, observation, deterministic=True):
+            self.calls += 1
+            return self.model.predict(observation, deterministic=deterministic)
+
+    cache = PolicyCache()
+    player = RLPlayer(cache=cache)
+    player.model = CountingModel(player.model)
+    calls = []
+    for _ in range(2):
+        # The same game twice, decisions of the second one are all cached
+        random.seed(0)
+        Game(players=[player, StupidComputerPlayer()], silent_mode=True, seed=5,
+             shuffle_players=False).play_game()
+        calls.append(player.model.calls)
+    assert calls[0] == calls[1] == cache.misses
+    assert cache.hits > 0
+
+
+def test_default_cache_of_another_model_is_not_used():
+    other = PolicyCache(tag="other_model.zip")
+    own = PolicyCache(tag=default_model_path())
+    try:
+        set_default_cache(other)
+        assert RLPlayer().cache is None
+        set_default_cache(own)
+        assert RLPlayer().cache is own
+    finally:
+        set_default_cache(None)
+    with pytest.raises(ValueError):
+        RLPlayer(cache=other)
+
+
+def test_concurrent_gets_and_puts():
+    cache = PolicyCache(64)
+    errors = []
+
+    def work(offset):
+        try:
+            for value in range(2000):
+                key = obs((value * 7 + offset) % 100)
+                if cache.get(key) is None:
+                    cache.put(key, value)
+        except Exception as error:  # pylint: disable=broad-except
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(cache) == 64
+    assert cache.hits + cache.misses == 8 * 2000
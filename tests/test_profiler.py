@@ -0,0 +1,64 @@
+'''Tests for the opt-in GameProfiler'''
+
+import json
+import random
+
+from src.game import Game, GameProfiler
+from src.player import AdvancedComputerPlayer, StupidComputerPlayer
+from src.tournament import run_tournament
+
+
+def profiled_game(profiler, seed):
+    game = Game(2, players=[AdvancedComputerPlayer(), StupidComputerPlayer()], silent_mode=True,
+                seed=seed, profiler=profiler)
+    game.play_game()
+    return game
+
+
+def test_counters_and_phases():
+    profiler = GameProfiler()
+    games = [profiled_game(profiler, seed) for seed in range(5)]
+    report = profiler.report()
+    counters = report['counters']
+    assert counters['games'] == 5
+    assert counters['rounds'] == sum(game.turn for game in games)
+    assert counters['turns'] == 2 * counters['rounds']
+    phases = {(entry['phase'], entry['player']): entry['calls'] for entry in report['timings']}
+    assert phases[('get_draw_action', 'AdvancedComputerPlayer')] == counters['rounds']
+    assert phases[('get_game_status_for_player', 'StupidComputerPlayer')] == 2 * counters['rounds']
+    assert phases[('check_full_rows', 'StupidComputerPlayer')] == counters['rounds']
+    assert ('check_game_over', 'all') in phases
+
+
+def test_profiling_does_not_change_the_game():
+    # The heuristic players use the global random
+    random.seed(3)
+    plain = Game(2, players=[AdvancedComputerPlayer(), StupidComputerPlayer()], silent_mode=True, seed=3)
+    plain_result = plain.play_game()
+    random.seed(3)
+    profiled = profiled_game(GameProfiler(), 3)
+    assert profiled.engine.snapshot() == plain.engine.snapshot()
+    assert profiled.turn == plain_result[0]
+
+
+def test_unprofiled_game_is_not_wrapped():
+    game = Game(2, players=[AdvancedComputerPlayer(), StupidComputerPlayer()], silent_mode=True)
+    assert 'get_game_status_for_player' not in vars(game)
+    assert 'check_full_rows' not in vars(game.engine)
+    assert 'get_draw_action' not in vars(game.players[0])
+
+
+def test_json_report_and_summary():
+    profiler = GameProfiler()
+    profiled_game(profiler, 1)
+    report = json.loads(profiler.to_json())
+    assert report['counters']['games'] == 1
+    assert 'get_play_action' in profiler.summary()
+
+
+def test_tournament_merges_worker_reports():
+    profiler = GameProfiler()
+    results = run_tournament(12, ["advanced", "stupid"], workers=1, chunk_size=5, seed=2,
+                             profiler=profiler)
+    assert profiler.counters['games'] == 12
+    assert profiler.counters['rounds'] == results['turns'].sum()
@@ -0,0 +1,115 @@
+'''Tests for game records and replay'''
+
+import random
+
+import pytest
+
+from src.game import Game, GameRecord, GameRecorder, read_records, replay
+from src.player import AdvancedComputerPlayer, StupidComputerPlayer
+from src.tournament import run_tournament
+
+
+def play_recorded(path, num_games, **kwargs):
+    """Plays recorded games and returns their final tables and turns"""
+    results = []
+    with GameRecorder(path) as recorder:
+        for game_index in range(num_games):
+            players = [AdvancedComputerPlayer(), StupidComputerPlayer()]
+            game = Game(2, players=players, silent_mode=True, recorder=recorder,
+                        seed=game_index, **kwargs)
+            game.play_game()
+            results.append((game.engine.table.tobytes(), bytes(game.engine.visible),
+                            list(game.engine.row_count), game.turn))
+    return results
+
+
+@pytest.mark.parametrize("rl_training_mode", [False, True])
+def test_replay_rebuilds_games(tmp_path, rl_training_mode):
+    path = tmp_path / "games.rec"
+    results = play_recorded(path, 50, rl_training_mode=rl_training_mode)
+    records = list(read_records(path))
+    assert len(records) == 50
+    for record, (table, visible, row_count, turns) in zip(records, results):
+        engine = replay(record)
+        assert engine.table.tobytes() == table
+        assert bytes(engine.visible) == visible
+        assert list(engine.row_count) == row_count
+        assert record.turns == turns
+        assert engine.game_over()
+
+
+def test_records_are_small(tmp_path):
+    path = tmp_path / "games.rec"
+    play_recorded(path, 100)
+    assert path.stat().st_size / 100 < 100
+
+
+def test_files_are_appended(tmp_path):
+    path = tmp_path / "games.rec"
+    play_recorded(path, 3)
+    play_recorded(path, 2)
+    assert len(list(read_records(path))) == 5
+
+
+def test_short_writes_are_completed(tmp_path):
+    class ShortWriter():
+        """Unbuffered file that writes at most 7 bytes at a time"""
+        def __init__(self, file):
+            self.file = file
+            self.writes = 0
+
+        def write(self, data):
+            self.writes += 1
+            return self.file.write(bytes(data[:7]))
+
+        def close(self):
+            self.file.close()
+
+    path = tmp_path / "games.rec"
+    expected = tmp_path / "expected.rec"
+    random.seed(0)
+    play_recorded(expected, 5)
+    random.seed(0)
+    with GameRecorder(path) as recorder:
+        recorder._file = ShortWriter(recorder._file)
+        for game_index in range(5):
+            Game(2, players=[AdvancedComputerPlayer(), StupidComputerPlayer()], silent_mode=True,
+                 recorder=recorder, seed=game_index).play_game()
+        recorder.flush()
+        assert recorder._file.writes > 1
+    assert path.read_bytes() == expected.read_bytes()
+    assert len(list(read_records(path))) == 5
+
+
+def test_replay_partial_and_encoding_roundtrip(tmp_path):
+    path = tmp_path / "games.rec"
+    play_recorded(path, 1)
+    record = next(read_records(path))
+    assert GameRecord.from_bytes(record.to_bytes()) == record
+    engine = replay(record, player_turns=0)
+    assert sum(engine.visible) == 6
+
+
+def test_wrong_seed_is_detected(tmp_path):
+    path = tmp_path / "games.rec"
+    play_recorded(path, 1)
+    record = next(read_records(path))
+    with pytest.raises(ValueError):
+        replay(record._replace(seed=record.seed + 1))
+
+
+def test_truncated_file(tmp_path):
+    path = tmp_path / "games.rec"
+    play_recorded(path, 2)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    with pytest.raises(ValueError):
+        list(read_records(path))
+
+
+def test_tournament_records_every_game(tmp_path):
+    path = tmp_path / "games.rec"
+    results = run_tournament(20, ["advanced", "stupid"], workers=1, chunk_size=7, seed=1,
+                             record_path=str(path))
+    records = list(read_records(path))
+    assert [record.turns for record in records] == list(results['turns'])
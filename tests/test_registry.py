@@ -0,0 +1,41 @@
+'''Tests for the player type registry'''
+
+import subprocess
+import sys
+
+import pytest
+
+from src.game import Game
+from src.player import AdvancedComputerPlayer, StupidComputerPlayer, Player
+from src.player.registry import get_player_class, create_player, register_player, player_types
+
+
+def test_known_types():
+    assert get_player_class("advanced") is AdvancedComputerPlayer
+    assert isinstance(create_player("stupid"), StupidComputerPlayer)
+    assert {"human", "stupid", "computer", "advanced", "rl"} <= set(player_types())
+
+
+def test_unknown_type():
+    with pytest.raises(ValueError):
+        get_player_class("grandmaster")
+
+
+def test_register_player():
+    register_player("test-stupid", "src.player.stupid_computer_player", "StupidComputerPlayer")
+    assert issubclass(get_player_class("test-stupid"), Player)
+
+
+def test_game_with_seat_names():
+    game = Game(seats=["advanced", "stupid", "stupid"], silent_mode=True, shuffle_players=False)
+    assert len(game.players) == 3
+    assert isinstance(game.players[0], AdvancedComputerPlayer)
+    game.play_game()
+
+
+def test_game_import_does_not_load_torch():
+    code = ("import sys; from src.game import Game; from src.player import Player; "
+            "Game(seats=['advanced', 'stupid'], silent_mode=True).play_game(); "
+            "print('torch' in sys.modules or 'stable_baselines3' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
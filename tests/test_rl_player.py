@@ -24,3 +24,30 @@ def test_turn_initial_cards():
         for r, c in result:
             assert 1 <= r <= len(initial_table_cards)
             assert 1 <= c <= len(initial_table_cards[0])
+
+
+def test_phase_observation_model(tmp_path):
+    """Models trained with action masking get the phase after the 20 values."""
+    import numpy as np
+    from src.card import CARDS
+    from src.game import GolfEngine, GameStatus
+
+    nvec = [22] * 20 + [2]
+    weights = np.zeros((10, sum(nvec)))
+    # Draw from the deck in the draw phase, discard in the place phase
+    weights[0, 440] = weights[9, 441] = 1
+    path = tmp_path / "phase.npz"
+    np.savez(path, nvec=nvec, w0=weights, b0=np.zeros(10), layers=1)
+
+    engine = GolfEngine(2)
+    engine.set_table(0, list(range(9)), [0] * 9)
+    engine.set_table(1, list(range(9, 18)), [0] * 9)
+    engine.deck.add_id_to_played(20)
+    player = RLPlayer(str(path))
+    assert player.get_draw_action(GameStatus(engine, 0)) == "d"
+    assert player.last_obs.shape == (21,) and player.last_obs[20] == 0
+    draw_obs = player.last_obs
+    assert player.get_play_action(GameStatus(engine, 0, CARDS[30])) == ("p", None)
+    assert player.last_obs[20] == 1
+    # The kept observations are copies of the encoding buffer
+    assert draw_obs[20] == 0
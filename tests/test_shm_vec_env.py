@@ -0,0 +1,64 @@
+'''Tests for the shared memory ShmVecEnv'''
+
+import numpy as np
+import pytest
+
+from src.player.shm_vec_env import ShmVecEnv
+
+
+@pytest.fixture(scope="module")
+def env():
+    vec_env = ShmVecEnv(5, workers=2)
+    yield vec_env
+    vec_env.close()
+
+
+def test_reset_and_step(env):
+    obs = env.reset()
+    assert obs.shape == (5, 20)
+    assert (obs[:, 0] == 21).all()
+    obs, rewards, dones, infos = env.step(np.zeros(5, dtype=np.int64))
+    assert obs.shape == (5, 20) and rewards.shape == (5,) and dones.shape == (5,)
+    # After the draw the agent holds a card
+    assert (obs[:, 0] != 21).all()
+    assert len(infos) == 5
+
+
+def test_episodes_reset_in_the_workers(env):
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        obs, _, dones, infos = env.step(rng.integers(0, 10, size=5))
+        if dones.any():
+            break
+    index = np.flatnonzero(dones)[0]
+    assert infos[index]['terminal_observation'].shape == (20,)
+    assert infos[index]['TimeLimit.truncated'] is False
+    # The observation is the first one of the next episode
+    assert obs[index, 0] == 21
+
+
+def test_attributes_and_methods(env):
+    env.reset()
+    assert env.get_attr("phase") == [1] * 5
+    env.set_attr("num_players", 2, indices=[3])
+    assert env.get_attr("num_players", indices=[3, 4]) == [2, 2]
+    assert env.env_method("_get_observation", indices=2)[0].shape == (20,)
+    assert env.env_is_wrapped(object) == [False] * 5
+
+
+def test_worker_errors_are_raised(env):
+    env.reset()
+    env.step(np.zeros(5, dtype=np.int64))
+    with pytest.raises(RuntimeError):
+        env.step(np.full(5, 12))
+
+
+def test_stable_baselines3_training():
+    from stable_baselines3 import DQN
+    vec_env = ShmVecEnv(4, workers=2)
+    try:
+        model = DQN("MlpPolicy", vec_env, learning_starts=20, train_freq=4, buffer_size=1000)
+        model.learn(200)
+    finally:
+        vec_env.close()
@@ -0,0 +1,70 @@
+'''Tests for the typed GameStatus view'''
+
+import pytest
+
+from src.card import Card, Suit
+from src.card_deck import CardDeck
+from src.game import GolfEngine, GameStatus, HIDDEN
+from src.game.status import as_game_status
+from src.player.golf_train_env import game_status_to_multidiscrete
+
+
+def make_engine():
+    engine = GolfEngine(3, CardDeck(rng=3))
+    engine.set_table(0, [Card(Suit.HEARTS, v).id for v in [1, 2, 3, 4, 5, 6]], [1, 0, 1, 1, 1, 0])
+    engine.set_table(1, [Card(Suit.CLUBS, v).id for v in [7, 8, 9]], [0, 1, 0])
+    engine.set_table(2, [Card(Suit.SPADES, v).id for v in range(9)], [1] * 9)
+    engine.deck.add_to_played(Card(Suit.DIAMONDS, 11))
+    return engine
+
+
+def test_typed_fields():
+    status = GameStatus(make_engine(), 0, Card(Suit.CLUBS, 12))
+    assert list(status.own_values) == [1, HIDDEN, 3, 4, 5, HIDDEN]
+    assert status.row_count == 2
+    assert [list(values) for values in status.other_values] == [[HIDDEN, 8, HIDDEN], list(range(9))]
+    assert status.top_value == 11
+    assert status.played_top_card == Card(Suit.DIAMONDS, 11)
+    assert status.hand_value == 12
+
+
+def test_fields_are_read_on_first_access():
+    engine = make_engine()
+    status = GameStatus(engine, 0)
+    assert status.own_values[1] == HIDDEN
+    engine.reveal(0, 1)
+    assert status.own_values[1] == HIDDEN
+    assert GameStatus(engine, 0).own_values[1] == 2
+
+
+def test_dict_shim():
+    status = GameStatus(make_engine(), 1)
+    assert status['player'] == [['XX', '♧8', 'XX']]
+    assert status['other_players'][0] == [['♡1', 'XX', '♡3'], ['♡4', '♡5', 'XX']]
+    assert 'hand_card' not in status
+    assert set(status) == {'player', 'other_players', 'played_top_card'}
+    with pytest.raises(KeyError):
+        status['hand_card']
+    with pytest.raises(TypeError):
+        status['player'] = []
+
+
+def test_from_dict_parses_card_strings():
+    status = as_game_status({
+        'player': [['XX', '♧11', '♤3']],
+        'other_players': [[['♢10', 'XX', 'XX']]],
+        'played_top_card': None,
+    })
+    assert list(status.own_values) == [HIDDEN, 11, 3]
+    assert list(status.other_values[0]) == [10, HIDDEN, HIDDEN]
+    assert status.top_value is None
+    assert status.hand_value is None
+    assert as_game_status(status) is status
+
+
+def test_observation_is_same_for_status_and_dict():
+    engine = make_engine()
+    engine.set_table(0, [Card(Suit.HEARTS, v).id for v in range(9)], [0, 1] * 4 + [1])
+    status = GameStatus(engine, 0, Card(Suit.CLUBS, 4))
+    legacy = dict(status)
+    assert (game_status_to_multidiscrete(status) == game_status_to_multidiscrete(legacy)).all()
@@ -0,0 +1,60 @@
+'''Tests for the tournament runner'''
+
+import pytest
+
+from src.tournament import run_tournament, summarize, play_chunk
+
+
+def test_run_tournament_columns():
+    results = run_tournament(20, ["advanced", "stupid"], workers=1, seed=1)
+    assert len(results['turns']) == 20
+    assert results['scores'].shape == (20, 2)
+    assert set(results['winner']) <= {0, 1}
+    assert (results['turns'] > 0).all()
+
+
+def test_tournament_is_reproducible_across_workers():
+    seats = ["advanced", "computer", "stupid"]
+    serial = run_tournament(12, seats, workers=1, chunk_size=12, seed=3)
+    pooled = run_tournament(12, seats, workers=2, chunk_size=5, seed=3)
+    assert (serial['turns'] == pooled['turns']).all()
+    assert (serial['scores'] == pooled['scores']).all()
+    assert (serial['winner'] == pooled['winner']).all()
+
+
+def test_rotate_changes_starting_seat():
+    results = play_chunk(["advanced", "stupid"], 0, 4, seed=2, rotate=True)
+    assert len(results['turns']) == 4
+    assert len(results['scores'][0]) == len(results['scores'][1]) == 4
+
+
+def test_invalid_seats():
+    with pytest.raises(ValueError):
+        run_tournament(10, ["advanced"], workers=1)
+    with pytest.raises(ValueError):
+        run_tournament(10, ["advanced", "grandmaster"], workers=1)
+
+
+def test_summarize():
+    seats = ["advanced", "advanced"]
+    results = run_tournament(10, seats, workers=1, seed=4)
+    summary = summarize(results, seats)
+    assert "Turns quartiles:" in summary
+    assert "Advanced (seat 1) winning percentage" in summary
+    assert "Advanced (seat 2) winning percentage" in summary
+
+
+def test_rl_decision_cache():
+    plain = run_tournament(6, ["rl", "stupid"], workers=1, seed=4)
+    cached = run_tournament(6, ["rl", "stupid"], workers=1, seed=4, rl_cache=10000)
+    assert (plain['scores'] == cached['scores']).all()
+    assert cached['policy_cache']['misses'] > 0
+
+
+def test_turn_limit_truncates_games():
+    seats = ["stupid", "stupid"]
+    results = run_tournament(5, seats, workers=1, seed=1, max_turns=2)
+    assert results['truncated'].all()
+    assert (results['turns'] == 2).all()
+    assert "Unfinished games stopped at the turn limit: 5" in summarize(results, seats)
+    assert not run_tournament(5, seats, workers=1, seed=1)['truncated'].any()
@@ -17,8 +17,6 @@ def test_view_display_rows(capsys):
     mock_game = MagicMock(spec=Game)
     view = View(mock_game)
     cards = [Card(Suit.HEARTS, 1), Card(Suit.CLUBS, 2), Card(Suit.CLUBS, 3)]
-    for card in cards:
-        card.visible = True
     view._display_rows(cards)
 
     captured = capsys.readouterr()
@@ -26,6 +24,16 @@ def test_view_display_rows(capsys):
     assert "♧2" in captured.out
 
 
+def test_view_display_rows_card_strings(capsys):
+    """Test that _display_rows shows rows of card strings as seen by players."""
+    mock_game = MagicMock(spec=Game)
+    view = View(mock_game)
+    view._display_rows(["♡1", "XX", "♧3"])
+
+    captured = capsys.readouterr()
+    assert "[♡1, XX, ♧3]" in captured.out
+
+
 def test_view_show_for_player_own_cards(capsys):
     """Test that show_for_player displays the player's own cards."""
     mock_game = MagicMock(spec=Game(2, human_player=False))